@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from PIL import Image, ImageTk
+import io
 import os
 import sys
 from datetime import datetime
@@ -43,12 +44,16 @@ try:
     print("✅ StegoService zaimportowany")
 except ImportError as e:
     print(f"❌ StegoService error: {e}")
+    # 'e' znika po bloku except - metody zastępcze używają kopii komunikatu
+    _service_error = f"StegoService nie załadowany: {e}"
     # Dummy service
     class StegoService:
         def hide_message(self, *args, **kwargs):
-            raise Exception(f"StegoService nie załadowany: {e}")
+            raise Exception(_service_error)
         def reveal_message(self, *args, **kwargs):
-            raise Exception(f"StegoService nie załadowany: {e}")
+            raise Exception(_service_error)
+        def capacity(self, *args, **kwargs):
+            raise Exception(_service_error)
     print("⚠ Używam dummy StegoService")
 try:
     from utilities.crypto import AESCipher, SimpleAESCipher
@@ -695,8 +700,12 @@ Instrukcje szyfrowania:
                 noise_ratio=noise_ratio
             )
             
-            # Zakoduj wiadomość
-            result_path = backend.encode(self.current_image_path, message_to_hide, output_file)
+            # Zakoduj wiadomość w pamięci - te same bajty zapisujemy, wyświetlamy
+            # i weryfikujemy, bez ponownego otwierania pliku wynikowego
+            encoded_data = backend.encode(self.current_image_path, message_to_hide, None)
+            with open(output_file, "wb") as f:
+                f.write(encoded_data)
+            result_path = output_file
             
             self.encoded_image_path = result_path
             self.update_status("Wiadomość zakodowana pomyślnie!")
@@ -706,7 +715,7 @@ Instrukcje szyfrowania:
             self.log(f"SUKCES: Wiadomość zakodowana{noise_info} do: {os.path.basename(result_path)}")
             
             try:
-                self.processed_image = Image.open(result_path)
+                self.processed_image = Image.open(io.BytesIO(encoded_data))
                 self.display_image(self.processed_image)
                 self.image_info_label.config(text=f"Zakodowany obraz: {os.path.basename(result_path)}")
             except Exception as e:
@@ -721,7 +730,7 @@ Instrukcje szyfrowania:
                             f"Format: {fmt.value.upper()}{noise_text}")
             
             if self.verify_message_var.get():
-                self.verify_after_encode(message, result_path, encryption_key)
+                self.verify_after_encode(message, encoded_data, encryption_key, fmt)
             
             self._update_statistic("Wiadomości Zakodowane:", "+1")
                     
@@ -833,25 +842,11 @@ Instrukcje szyfrowania:
             return
         
         try:
-            from PIL import Image
-            
             self.update_status("Obliczanie pojemności...")
             
-            img = Image.open(self.current_image_path)
-            width, height = img.size
-            
-            if img.mode in ("RGB", "RGBA"):
-                channels = 3
-            elif img.mode == "L":
-                channels = 1
-            else:
-                channels = 3
-            
-            bits_capacity = width * height * channels
-            bytes_capacity = bits_capacity // 8
-            usable_bytes = bytes_capacity - 4
-            if usable_bytes < 0:
-                usable_bytes = 0
+            # Pojemność liczy backend danego formatu z samego nagłówka pliku
+            # (dla JPEG to liczba współczynników DCT, nie pikseli)
+            usable_bytes = self.stego_service.capacity(self.current_image_path).bytes
             
             self.image_capacity = usable_bytes
             
@@ -968,13 +963,14 @@ Instrukcje szyfrowania:
             self.verify_label.config(text="✗ Weryfikacja NIE POWIODŁA SIĘ", foreground="red")
             self.log(f"BŁĄD weryfikacji: {str(e)}")
     
-    def verify_after_encode(self, original_message, encoded_image_path, encryption_key=None):
+    def verify_after_encode(self, original_message, encoded_image, encryption_key=None, fmt=None):
         self.log("Rozpoczynanie weryfikacji po kodowaniu...")
         
         try:
-            fmt = ImageFormat.from_path(encoded_image_path)
+            if fmt is None:
+                fmt = ImageFormat.from_path(encoded_image)
             extracted = self.stego_service.reveal_message(
-                image_path=encoded_image_path,
+                image_path=encoded_image,
                 image_format=fmt
             )
             
@@ -6,10 +6,17 @@ import hashlib
 
 from imagesteganography.core.StegoService import StegoService
 from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.config import get_config
+from imagesteganography.utilities.cover_index import CoverIndex
+from imagesteganography.utilities.image_header import read_header
 
 class GUIBackendBridge:
-    def __init__(self):
+    def __init__(self, cover_index: Optional[CoverIndex] = None):
         self.stego_service = StegoService()
+        # trwały indeks okładek tylko na życzenie ([INDEX] GUI w config.toml);
+        # pojedyncze pliki wystarczy opisać z nagłówka, bez bazy na dysku
+        self._cover_index = cover_index
+        self._use_index = cover_index is not None or bool(get_config().get("INDEX", "GUI", False))
         self.stats = {
             "images_processed": 0,
             "messages_encoded": 0,
@@ -17,6 +24,28 @@ class GUIBackendBridge:
             "successful_tests": 0
         }
     
+    @property
+    def cover_index(self) -> Optional[CoverIndex]:
+        """Indeks okładek, tworzony przy pierwszym użyciu; None, gdy wyłączony."""
+        if self._cover_index is None and self._use_index:
+            self._cover_index = CoverIndex(service=self.stego_service)
+        return self._cover_index
+
+    def _describe(self, image_path: str) -> Dict[str, Any]:
+        """Format, wymiary, tryb i pojemność obrazu - z indeksu albo z nagłówka pliku."""
+        if self.cover_index is not None:
+            return self.cover_index.lookup(image_path)
+        header = read_header(image_path)
+        with Image.open(image_path) as img:  # leniwie - tylko nagłówek
+            mode = img.mode
+        return {
+            "format": header.format.value,
+            "width": header.width,
+            "height": header.height,
+            "mode": mode,
+            "capacity_bytes": self.stego_service.capacity(image_path, header.format).bytes,
+        }
+
     def encode_message(self, image_path: str, message: str, output_path: Optional[str] = None) -> Tuple[bool, str, str]:
         try:
             if not os.path.exists(image_path):
@@ -80,17 +109,11 @@ class GUIBackendBridge:
             if not os.path.exists(image_path):
                 return False, 0, f"Obraz nie istnieje: {image_path}"
             
-            img = Image.open(image_path)
-            width, height = img.size
-            
-            capacity_bits = width * height * 3
-            capacity_bytes = capacity_bits // 8
-            capacity_bytes -= 4
-            
-            if capacity_bytes < 0:
-                capacity_bytes = 0
+            # dla JPEG pojemność = liczba współczynników DCT
+            entry = self._describe(image_path)
+            capacity_bytes = entry["capacity_bytes"]
             
-            return True, capacity_bytes, f"Pojemność obliczona dla obrazu {width}x{height}"
+            return True, capacity_bytes, f"Pojemność obliczona dla obrazu {entry['width']}x{entry['height']}"
             
         except Exception as e:
             return False, 0, f"Obliczanie pojemności nie powiodło się: {str(e)}"
@@ -125,15 +148,16 @@ class GUIBackendBridge:
             if not os.path.exists(image_path):
                 return {"error": f"Obraz nie istnieje: {image_path}"}
             
-            img = Image.open(image_path)
+            entry = self._describe(image_path)
             
             return {
                 "filename": os.path.basename(image_path),
-                "size": img.size,
-                "format": img.format,
-                "mode": img.mode,
-                "width": img.width,
-                "height": img.height
+                "size": (entry["width"], entry["height"]),
+                "format": entry["format"].upper(),
+                "mode": entry["mode"],
+                "width": entry["width"],
+                "height": entry["height"],
+                "capacity_bytes": entry["capacity_bytes"]
             }
         except Exception as e:
             return {"error": str(e)}
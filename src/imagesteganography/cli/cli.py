@@ -1,30 +1,494 @@
+import json
 import os
+import time
 import typer
+from imagesteganography.core.StegoBatch import HideJob, RevealJob
 from imagesteganography.core.StegoService import StegoService
 from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities import manifest
+
+# serwer, benchmark, loadtest, planer i indeks importujemy w swoich
+# komendach - encode/decode nie płacą za ich importy przy starcie
 
 app = typer.Typer(help="Image steganography (LSB) CLI")
 
 service = StegoService()
 
+index_app = typer.Typer(help="Indeks nośników (SQLite): pojemność, wymiary, tryb")
+app.add_typer(index_app, name="index")
+
+DB_HELP = "Plik bazy indeksu (domyślnie [INDEX] DB z config.toml)"
+
+JSTEG_HELP = "JPEG: tylko niezerowe współczynniki AC (inne niż 0 i 1)"
+
+OPTIMIZE_HELP = "PNG/TIFF: zmniejsz wynik, próbując kilku bezstratnych kodowań (równolegle)"
+
+STDIO = "-"  # stdin/stdout zamiast ścieżki
+
+
+def _stdin_bytes() -> bytes:
+    return typer.get_binary_stream("stdin").read()
+
+
+def _cover(image: str, image_format: str | None):
+    """Źródło obrazu (ścieżka albo bajty ze stdin) i jego format."""
+    if image_format:
+        fmt_enum = ImageFormat(image_format.lower())
+    if image != STDIO:
+        return image, fmt_enum if image_format else ImageFormat.from_path(image)
+    data = _stdin_bytes()
+    return data, fmt_enum if image_format else ImageFormat.from_bytes(data)
+
+
 @app.command()
-def encode(image: str, message: str, output: str = None):
+def encode(
+    image: str = typer.Argument(..., help="Obraz-nośnik albo '-' (stdin)"),
+    args: list[str] = typer.Argument(None, metavar="[MESSAGE] [OUTPUT]", help="Wiadomość (bez --payload-file) i plik wynikowy"),
+    output: str = typer.Option(None, "--output", "-o", help="Plik wynikowy albo '-' (stdout)"),
+    payload_file: str = typer.Option(None, "--payload-file", "-p", help="Dane do ukrycia (binarnie) z pliku albo '-' (stdin)"),
+    image_format: str = typer.Option(None, "--format", "-f", help="Format obrazu (domyślnie z rozszerzenia albo sygnatury)"),
+    jsteg: bool = typer.Option(False, "--jsteg", help=JSTEG_HELP),
+    in_place: bool = typer.Option(False, "--in-place", help="Zapis w samym nośniku, tylko BMP (zmienione bajty, bez kopii)"),
+    optimize: bool = typer.Option(False, "--optimize", help=OPTIMIZE_HELP),
+):
     """
     Ukrywa wiadomość w obrazie i zapisuje wynik w pliku wyjściowym.
+
+    Przykład potoku bez plików tymczasowych:
+    curl ... | stego encode - --payload-file dane.bin - | upload
     """
-    fmt_enum = ImageFormat.from_path(image)
-    result = service.hide_message(image, message, fmt_enum, output)
+    args = list(args or [])
+    message = None if payload_file is not None else (args.pop(0) if args else None)
+    if message is None and payload_file is None:
+        raise typer.BadParameter("Podaj wiadomość albo --payload-file.")
+    if len(args) > 1 or (args and output is not None):
+        raise typer.BadParameter("Za dużo argumentów: plik wynikowy podaj raz.")
+    output = args[0] if args else output
+    if in_place:
+        if output is not None or image == STDIO:
+            raise typer.BadParameter("--in-place wymaga nośnika z pliku i wyklucza plik wynikowy.")
+        output = image
+    if image == STDIO and payload_file == STDIO:
+        raise typer.BadParameter("Obraz i dane nie mogą jednocześnie pochodzić ze stdin.")
+    if optimize and (output == STDIO or (output is None and image == STDIO)):
+        raise typer.BadParameter("--optimize wymaga wyniku zapisanego w pliku.")
+
+    cover, fmt_enum = _cover(image, image_format)
+    if in_place and fmt_enum is not ImageFormat.BMP:
+        # inne formaty i tak zapisują cały plik od nowa - bez kopii nośnika
+        raise typer.BadParameter(f"--in-place obsługuje tylko BMP (nie {fmt_enum.value}).")
+    if output is None and image == STDIO:
+        output = STDIO
+    target = typer.get_binary_stream("stdout") if output == STDIO else output
+
+    if payload_file is None:
+        result = service.hide_message(cover, message, fmt_enum, target, jsteg=jsteg)
+    else:
+        if payload_file == STDIO:
+            payload = _stdin_bytes()
+        else:
+            with open(payload_file, "rb") as f:
+                payload = f.read()
+        result = service.hide_bytes(cover, payload, fmt_enum, target, jsteg=jsteg)
+
+    if output == STDIO:
+        typer.get_binary_stream("stdout").flush()
+        return
     typer.echo(f"Zapisano: {result}")
+    if optimize:
+        typer.echo(_optimization_note(service.optimize_output(result, fmt_enum)))
+
+
+def _optimization_note(opt) -> str:
+    if opt.strategy is None:
+        return "Optymalizacja: bez zmian (żadne kodowanie nie dało mniejszego pliku)"
+    return f"Optymalizacja: -{opt.saved} B ({opt.original_size} -> {opt.size} B, {opt.strategy})"
 
 
 @app.command()
-def decode(image: str):
+def decode(
+    image: str = typer.Argument(..., help="Obraz z ukrytą wiadomością albo '-' (stdin)"),
+    output: str = typer.Option(None, "--output", "-o", help="Zapis surowych bajtów do pliku albo '-' (stdout)"),
+    image_format: str = typer.Option(None, "--format", "-f", help="Format obrazu (domyślnie z rozszerzenia albo sygnatury)"),
+    jsteg: bool = typer.Option(False, "--jsteg", help=JSTEG_HELP),
+    offset: int = typer.Option(0, "--offset", min=0, help="Odczyt od tego bajtu danych"),
+    length: int = typer.Option(None, "--length", min=0, help="Liczba bajtów do odczytu (domyślnie do końca)"),
+):
     """
-    Odczytuje wiadomość ukrytą w obrazie IMAGE.
+    Odczytuje wiadomość ukrytą w obrazie IMAGE. Z --output dane są
+    zapisywane binarnie, bez dekodowania UTF-8. --offset/--length
+    odczytują tylko fragment danych.
     """
-    fmt_enum = ImageFormat.from_path(image)
-    msg = service.reveal_message(image, fmt_enum)
-    typer.echo(msg)
+    cover, fmt_enum = _cover(image, image_format)
+    ranged = offset or length is not None
+    if output is None and not ranged:
+        typer.echo(service.reveal_message(cover, fmt_enum, jsteg=jsteg))
+        return
+
+    try:
+        if ranged:
+            payload = service.read_range(cover, fmt_enum, offset, length, jsteg=jsteg)
+        else:
+            payload = service.reveal_bytes(cover, fmt_enum, jsteg=jsteg)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    if output is None:
+        typer.echo(payload.decode("utf-8", errors="replace"))
+        return
+    if output == STDIO:
+        stdout = typer.get_binary_stream("stdout")
+        stdout.write(payload)
+        stdout.flush()
+    else:
+        with open(output, "wb") as f:
+            f.write(payload)
+
+
+def _batch_job(row: dict, message, payload_file, output_dir, reveal: bool, jsteg: bool, optimize: bool = False):
+    fmt = row.get("format")
+    fmt_enum = ImageFormat(fmt.lower()) if fmt else None
+    if reveal:
+        return RevealJob(row["image"], fmt_enum, jsteg=jsteg, tag=row)
+
+    output = row.get("output") or None
+    if output is None and output_dir:
+        output = os.path.join(output_dir, os.path.basename(row["image"]))
+    if row.get("message"):
+        return HideJob(row["image"], row["message"], output, fmt_enum, jsteg=jsteg, tag=row, optimize=optimize)
+    return HideJob(
+        row["image"], message, output, fmt_enum, jsteg=jsteg, tag=row,
+        payload_file=row.get("payload") or payload_file, optimize=optimize,
+    )
+
+
+@app.command()
+def batch(
+    source: str = typer.Argument(..., help="Wzorzec glob (np. 'covers/*.png') albo manifest .csv/.jsonl"),
+    message: str = typer.Option(None, "--message", "-m", help="Wiadomość dla obrazów bez własnej"),
+    payload_file: str = typer.Option(None, "--payload-file", help="Plik z danymi dla obrazów bez własnych"),
+    output_dir: str = typer.Option(None, "--output-dir", help="Katalog wyników (domyślnie *_stego obok wejścia)"),
+    results: str = typer.Option("stego_results.jsonl", "--results", help="Manifest wyników (JSONL), pozwala wznowić przerwany przebieg"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Liczba procesów (0 = liczba rdzeni)"),
+    reveal: bool = typer.Option(False, "--reveal", help="Odczyt wiadomości zamiast ukrywania"),
+    jsteg: bool = typer.Option(False, "--jsteg", help=JSTEG_HELP),
+    optimize: bool = typer.Option(False, "--optimize", help=OPTIMIZE_HELP),
+):
+    """
+    Przetwarza wiele obrazów w puli procesów. Postęp trafia na stderr,
+    a wynik każdego zadania od razu do manifestu wyników; ponowne
+    uruchomienie pomija zadania zakończone sukcesem.
+    """
+    rows = manifest.pending_rows(manifest.load_rows(source), manifest.load_results(results))
+    if not reveal and message is None and payload_file is None:
+        missing = [r["image"] for r in rows if not r.get("message") and not r.get("payload")]
+        if missing:
+            raise typer.BadParameter(f"Brak wiadomości dla {len(missing)} obrazów (--message albo --payload-file).")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    total, done, failed, saved = len(rows), 0, 0, 0
+    typer.echo(f"Zadań do wykonania: {total}", err=True)
+    jobs = (_batch_job(row, message, payload_file, output_dir, reveal, jsteg, optimize) for row in rows)
+    run = service.reveal_many if reveal else service.hide_many
+    start = time.perf_counter()
+
+    with open(results, "a", encoding="utf-8") as out:
+        for result in run(jobs, workers=workers or None):
+            row = result.job.tag
+            extra = {"message": result.value} if reveal and result.ok else {}
+            if result.optimization is not None:
+                extra["saved_bytes"] = result.optimization.saved
+                saved += result.optimization.saved
+            output = None if reveal or not result.ok else os.fspath(result.value)
+            out.write(manifest.result_record(row, result.ok, output, result.error, result.elapsed, **extra))
+            out.flush()
+
+            done += 1
+            failed += not result.ok
+            rate = done / (time.perf_counter() - start)
+            eta = (total - done) / rate
+            status = "OK " if result.ok else "ERR"
+            typer.echo(f"[{done}/{total}] {status} {row['image']} | {rate:.1f} obr./s, ETA {eta:.0f} s", err=True)
+            if not result.ok:
+                typer.echo(f"    {result.error}", err=True)
+
+    typer.echo(f"Gotowe: {done - failed} OK, {failed} błędów, {time.perf_counter() - start:.1f} s", err=True)
+    if optimize:
+        typer.echo(f"Optymalizacja: zaoszczędzono {saved} B", err=True)
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _csv_list(value: str, cast):
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+@app.command()
+def bench(
+    sizes: str = typer.Option("1,12,24,50", "--sizes", help="Rozmiary nośników w MP, po przecinku"),
+    formats: str = typer.Option(",".join(f.value for f in ImageFormat), "--formats", help="Formaty, po przecinku"),
+    payloads: str = typer.Option("1024,65536,1048576", "--payloads", help="Rozmiary danych w bajtach"),
+    repeat: int = typer.Option(3, "--repeat", help="Liczba powtórzeń (liczy się najlepszy czas)"),
+    output: str = typer.Option("bench.json", "--output", "-o", help="Plik JSON z wynikami"),
+    baseline: str = typer.Option(None, "--baseline", help="Plik bazowy do porównania"),
+    threshold: float = typer.Option(0.2, "--threshold", help="Dopuszczalny wzrost czasu (0.2 = 20%)"),
+    memory: bool = typer.Option(True, "--memory/--no-memory", help="Szczytowe RSS każdego przypadku (osobny proces na przypadek)"),
+):
+    """
+    Mierzy wydajność backendów na syntetycznych nośnikach i opcjonalnie
+    porównuje wynik z plikiem bazowym (kod wyjścia 1 przy regresji).
+    """
+    from imagesteganography.utilities import benchmark
+
+    def progress(r: dict) -> None:
+        rate = f"{r['mb_per_s']:.2f} MB/s" if r["mb_per_s"] is not None else f"{r['pixels_per_s'] / 1e6:.1f} Mpx/s"
+        typer.echo(
+            f"{r['format']:>5} {r['megapixels']:>5} MP {r['op']:<13} {r['payload_bytes']:>8} B "
+            f"{r['seconds'] * 1000:9.1f} ms  {rate}  RSS {r['peak_rss_mb']} MB",
+            err=True,
+        )
+
+    report = benchmark.run_benchmark(
+        megapixels=_csv_list(sizes, float),
+        formats=_csv_list(formats, lambda v: ImageFormat(v.strip().lower())),
+        payload_sizes=_csv_list(payloads, int),
+        repeat=repeat,
+        progress=progress,
+        measure_memory=memory,
+    )
+    benchmark.save_report(report, output)
+    typer.echo(f"Zapisano: {output}")
+
+    if baseline:
+        regressions = benchmark.compare(report, benchmark.load_report(baseline), threshold)
+        for r in regressions:
+            typer.echo(
+                f"REGRESJA {r['format']} {r['megapixels']} MP {r['op']} {r['payload_bytes']} B: "
+                f"{r['baseline_seconds'] * 1000:.1f} -> {r['seconds'] * 1000:.1f} ms (x{r['ratio']})"
+            )
+        if regressions:
+            raise typer.Exit(code=1)
+        typer.echo(f"Brak regresji powyżej {threshold:.0%} względem {baseline}")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(8765, "--port"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Liczba procesów (0 = liczba rdzeni)"),
+    queue_size: int = typer.Option(0, "--queue-size", help="Maks. liczba zadań w toku (0 = 2 * workers); nadmiar dostaje 503"),
+):
+    """
+    Uruchamia lokalny serwer HTTP (POST /encode, /decode, /capacity)
+    z rozgrzaną pulą procesów roboczych.
+    """
+    from imagesteganography.core.StegoServer import StegoServer
+
+    server = StegoServer(host, port, workers or None, queue_size or None)
+    server.warm_up()
+    host, port = server.address
+    typer.echo(f"Nasłuch na http://{host}:{port} ({server.workers} procesów, kolejka {server.queue_size})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+@app.command("loadtest")
+def load_test(
+    url: str = typer.Option(None, "--url", help="Adres 'stego serve' (domyślnie StegoService w tym procesie)"),
+    formats: str = typer.Option("png,jpeg", "--formats", help="Formaty nośników, po przecinku"),
+    sizes: str = typer.Option("0.3", "--sizes", help="Rozmiary nośników w MP, po przecinku"),
+    payloads: str = typer.Option("256,4096", "--payloads", help="Rozmiary danych w bajtach"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="Liczba równoległych klientów"),
+    rate: float = typer.Option(None, "--rate", help="Docelowe tempo (żądań/s); bez tego pętla zamknięta"),
+    duration: float = typer.Option(10.0, "--duration", help="Czas trwania w sekundach"),
+    requests: int = typer.Option(None, "--requests", "-n", help="Liczba żądań (zamiast --duration)"),
+    decode_ratio: float = typer.Option(0.5, "--decode-ratio", help="Udział żądań decode"),
+    output: str = typer.Option(None, "--output", "-o", help="Plik JSON z raportem (domyślnie stdout)"),
+):
+    """
+    Generator obciążenia: mierzy p50/p95/p99, odsetek błędów i przepustowość
+    na syntetycznych nośnikach, bez dostępu do sieci zewnętrznej.
+    """
+    from imagesteganography.utilities import loadtest
+
+    cases = loadtest.build_cases(
+        _csv_list(formats, lambda v: ImageFormat(v.strip().lower())),
+        _csv_list(sizes, float),
+        _csv_list(payloads, int),
+    )
+    target = loadtest.HttpTarget(url) if url else loadtest.ServiceTarget(service)
+    report = loadtest.run_load(
+        target, cases,
+        concurrency=concurrency,
+        rate=rate,
+        duration=None if requests is not None else duration,
+        requests=requests,
+        decode_ratio=decode_ratio,
+    )
+    report["target"] = url or "in-process"
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(loadtest.dumps(report) + "\n")
+        typer.echo(f"Zapisano: {output}")
+    else:
+        typer.echo(loadtest.dumps(report))
+
+
+@index_app.command("scan")
+def index_scan(
+    sources: list[str] = typer.Argument(..., help="Katalogi, wzorce glob albo pliki"),
+    db: str = typer.Option(None, "--db", help=DB_HELP),
+    jsteg: bool = typer.Option(False, "--jsteg", help="Licz też pojemność jsteg (pełny odczyt JPEG)"),
+    prune: bool = typer.Option(True, "--prune/--no-prune", help="Usuń wpisy plików, których już nie ma"),
+):
+    """
+    Dodaje nowe i odświeża zmienione pliki; niezmienione są pomijane.
+    """
+    from imagesteganography.utilities.cover_index import CoverIndex
+
+    start = time.perf_counter()
+    with CoverIndex(db, service) as index:
+        counts = index.scan(sources, jsteg=jsteg, prune=prune)
+    summary = ", ".join(f"{key}: {value}" for key, value in counts.items())
+    typer.echo(f"{summary} ({time.perf_counter() - start:.1f} s)")
+
+
+@index_app.command("find")
+def index_find(
+    size: int = typer.Argument(..., help="Rozmiar danych w bajtach"),
+    image_format: str = typer.Option(None, "--format", "-f", help="Tylko nośniki w tym formacie"),
+    jsteg: bool = typer.Option(False, "--jsteg", help=JSTEG_HELP),
+    limit: int = typer.Option(10, "--limit", "-n"),
+    db: str = typer.Option(None, "--db", help=DB_HELP),
+):
+    """
+    Wypisuje nośniki, w których zmieszczą się dane - od najlepiej dopasowanego.
+    """
+    from imagesteganography.utilities.cover_index import CoverIndex
+
+    fmt_enum = ImageFormat(image_format.lower()) if image_format else None
+    with CoverIndex(db, service) as index:
+        entries = index.find(size, fmt_enum, jsteg=jsteg, limit=limit or None)
+    column = "capacity_jsteg_bytes" if jsteg else "capacity_bytes"
+    for entry in entries:
+        typer.echo(f"{entry[column]:>12} B  {entry['width']}x{entry['height']} {entry['mode']:<5} {entry['path']}")
+    if not entries:
+        raise typer.Exit(code=1)
+
+
+@index_app.command("show")
+def index_show(
+    path: str,
+    db: str = typer.Option(None, "--db", help=DB_HELP),
+):
+    """
+    Wpis indeksu dla pliku (indeksuje go, jeśli wpis jest nieaktualny).
+    """
+    from imagesteganography.utilities.cover_index import CoverIndex
+
+    with CoverIndex(db, service) as index:
+        typer.echo(json.dumps(index.lookup(path), indent=2, ensure_ascii=False))
+
+
+@app.command()
+def plan(
+    payloads: list[str] = typer.Argument(..., help="Pliki z danymi do ukrycia"),
+    covers: list[str] = typer.Option(None, "--covers", "-c", help="Katalogi/wzorce nośników do (prze)indeksowania"),
+    image_format: str = typer.Option(None, "--format", "-f", help="Tylko nośniki w tym formacie"),
+    strategy: str = typer.Option("tight", "--strategy", help="tight: najmniejszy pasujący nośnik; balanced: minimalne maks. zapełnienie"),
+    output_dir: str = typer.Option(None, "--output-dir", help="Katalog wyników (domyślnie *_stego obok nośnika)"),
+    plan_file: str = typer.Option("stego_plan.jsonl", "--plan-file", help="Zapis planu i wyników (JSONL)"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Liczba procesów (0 = liczba rdzeni)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Tylko plan, bez osadzania"),
+    jsteg: bool = typer.Option(False, "--jsteg", help=JSTEG_HELP),
+    db: str = typer.Option(None, "--db", help=DB_HELP),
+):
+    """
+    Dobiera nośniki z indeksu do plików z danymi (jedne dane na nośnik)
+    i osadza je równolegle - bez prób na ślepo i błędów pojemności.
+    """
+    from imagesteganography.utilities import planner
+    from imagesteganography.utilities.cover_index import CoverIndex
+
+    fmt_enum = ImageFormat(image_format.lower()) if image_format else None
+    with CoverIndex(db, service) as index:
+        if covers:
+            index.scan(covers, jsteg=jsteg, prune=False)
+        assignments, unplaced = planner.plan_from_index(payloads, index, fmt_enum, jsteg, strategy)
+    planner.assign_outputs(assignments, output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    for name in unplaced:
+        typer.echo(f"Brak nośnika dla: {name}", err=True)
+    if assignments:
+        worst = max(a.fill for a in assignments)
+        typer.echo(f"Plan: {len(assignments)} przydziałów, maks. zapełnienie {worst:.1%}", err=True)
+
+    with open(plan_file, "w", encoding="utf-8") as out:
+        if dry_run:
+            for a in assignments:
+                out.write(json.dumps(a.as_dict(), ensure_ascii=False) + "\n")
+        else:
+            failed = 0
+            for result in planner.embed(service, assignments, jsteg=jsteg, workers=workers or None):
+                record = dict(result.job.tag.as_dict(), ok=result.ok, error=result.error)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                failed += not result.ok
+                typer.echo(f"{'OK ' if result.ok else 'ERR'} {record['payload']} -> {record['output']}", err=True)
+            if failed:
+                unplaced.append(f"{failed} błędów osadzania")
+    typer.echo(f"Zapisano plan: {plan_file}")
+    if unplaced:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def split(
+    payload: str = typer.Argument(..., help="Plik z danymi"),
+    covers: list[str] = typer.Argument(..., help="Nośniki, zapełniane po kolei"),
+    output_dir: str = typer.Option(None, "--output-dir", help="Katalog woluminów (domyślnie obok nośników)"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Liczba procesów (0 = liczba rdzeni)"),
+    jsteg: bool = typer.Option(False, "--jsteg", help=JSTEG_HELP),
+):
+    """
+    Dzieli dane na woluminy ukryte w kolejnych nośnikach (gdy nie mieszczą się w jednym).
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    failed = 0
+    try:
+        for result in service.hide_volumes(payload, covers, output_dir=output_dir, jsteg=jsteg, workers=workers or None):
+            failed += not result.ok
+            typer.echo(f"wolumin {result.job.tag + 1}: {result.value if result.ok else result.error}")
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def join(
+    images: list[str] = typer.Argument(..., help="Woluminy zestawu, w dowolnej kolejności"),
+    output: str = typer.Option(..., "--output", "-o", help="Plik wynikowy"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Liczba procesów (0 = liczba rdzeni)"),
+    jsteg: bool = typer.Option(False, "--jsteg", help=JSTEG_HELP),
+):
+    """
+    Odczytuje woluminy równolegle i składa z nich dane.
+    """
+    try:
+        info = service.reveal_volumes(images, output, jsteg=jsteg, workers=workers or None)
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Zapisano: {output} ({info.total_size} B z {info.count} woluminów)")
+
 
 def main() -> None:
     """
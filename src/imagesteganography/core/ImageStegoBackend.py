@@ -1,20 +1,87 @@
+import os
 from abc import ABC, abstractmethod
+from typing import Optional
+
+from imagesteganography.utilities.image_io import ImageSource, ImageTarget, StegoResult
+from imagesteganography.utilities.size_optimizer import OptimizeResult
+
+def payload_range(size: int, offset: int, length: Optional[int]) -> int:
+    """
+    Sprawdza zakres [offset, offset + length) w danych o długości 'size'
+    i zwraca długość (None = do końca danych).
+    """
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError("Przesunięcie i długość nie mogą być ujemne.")
+    if length is None:
+        length = max(0, size - offset)
+    if offset + length > size:
+        raise ValueError(f"Zakres {offset}+{length} B wykracza poza ukryte dane ({size} B).")
+    return length
+
 
 class ImageStegoBackend(ABC):
-    """Interfejs dla konkretnych implementacji steganografii obrazowej."""
+    """
+    Interfejs dla konkretnych implementacji steganografii obrazowej.
+
+    Wejściem może być ścieżka, bytes, obiekt plikowy, obraz PIL albo tablica
+    NumPy. Wynik trafia do 'output_path' (ścieżka albo obiekt plikowy), a gdy
+    jest None - zwracany jest w pamięci, w tej samej postaci co wejście
+    (bytes dla ścieżek i bajtów).
+    """
 
     @abstractmethod
-    def encode(self, input_path: str, message: str, output_path: str) -> str:
+    def encode(self, input_path: ImageSource, message: str, output_path: ImageTarget) -> StegoResult:
         """
         Ukryj 'message' w obrazie 'input_path' i zapisz w 'output_path'.
-        Zwraca ścieżkę do nowego pliku.
+        Zwraca ścieżkę do nowego pliku (albo wynik w pamięci).
         """
         raise NotImplementedError
 
     @abstractmethod
-    def decode(self, input_path: str) -> str:
+    def decode(self, input_path: ImageSource) -> str:
         """
         Odczytaj ukrytą wiadomość z obrazu 'input_path'.
         Zwraca odczytany tekst.
         """
         raise NotImplementedError
+
+    @abstractmethod
+    def encode_bytes(self, input_path: ImageSource, payload: bytes, output_path: ImageTarget) -> StegoResult:
+        """
+        Ukryj dowolne dane binarne 'payload' (bytes/bytearray/memoryview)
+        w obrazie 'input_path' i zapisz w 'output_path'.
+        Zwraca ścieżkę do nowego pliku (albo wynik w pamięci).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode_bytes(self, input_path: ImageSource) -> bytes:
+        """
+        Odczytaj ukryte dane z obrazu 'input_path' bez dekodowania UTF-8.
+        Zwraca surowe bajty.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def capacity(self, input_path: ImageSource) -> int:
+        """
+        Ile bitów danych zmieści obraz 'input_path' (bez nagłówka długości).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_range(self, input_path: ImageSource, offset: int, length: Optional[int] = None) -> bytes:
+        """
+        Odczytaj tylko bajty [offset, offset + length) ukrytych danych
+        (length=None - do końca). Zakres poza danymi to ValueError.
+        """
+        raise NotImplementedError
+
+    def optimize_output(self, output_path: str, threads: Optional[int] = None) -> OptimizeResult:
+        """
+        Przepisz zapisany wynik 'output_path' najmniejszym bezstratnym
+        kodowaniem, bez zmiany pikseli. Domyślnie (BMP, JPEG) nie ma czego
+        próbować - plik zostaje bez zmian.
+        """
+        size = os.path.getsize(output_path)
+        return OptimizeResult(output_path, None, size, size)
@@ -1,9 +1,18 @@
+import struct
 from PIL import Image
-from typing import TYPE_CHECKING
-import random
-
-if TYPE_CHECKING:
-    from PIL.Image import PixelAccess # type: ignore
+from typing import Optional
+import numpy as np
+
+from imagesteganography.core.ImageStegoBackend import payload_range
+from imagesteganography.utilities.image_header import read_header
+from imagesteganography.utilities.image_io import (
+    ImageSource,
+    ImageTarget,
+    StegoResult,
+    deliver_image,
+    open_image,
+)
+from imagesteganography.utilities.noise import bernoulli_positions
 
 class LsbMixin:
     """
@@ -12,191 +21,212 @@ class LsbMixin:
     """
 
     HEADER_BITS = 32  # np. 32 bity na długość wiadomości w bajtach
+    CHUNK_BYTES = 1 << 16  # porcja payloadu rozpakowywana naraz do bitów
 
-    def _image_to_pixels(self, img: Image.Image) -> tuple[Image.Image, "PixelAccess"]:
-        # wymuś kopię aby load() zawsze działało 
-        img = img.copy()
-        
+    def _image_to_array(self, img: Image.Image) -> np.ndarray:
+        """
+        Zamienia obraz na ciągły bufor uint8 o kształcie (h, w, 3|4).
+        Tryby inne niż RGB/RGBA konwertujemy do RGBA.
+        """
         if img.mode not in ("RGB", "RGBA"):
             img = img.convert("RGBA")
-        
-        pixels = img.load()
-        if pixels is None:
-            raise RuntimeError("Image.load() returned None — cannot access pixels")
-        
-        return img, pixels
-    
-
-    def _get_rgba(self, pixels: "PixelAccess", x: int, y: int) -> tuple[int, int, int, int]:
-        """Zwraca zawsze (r, g, b, a) niezależnie od trybu obrazu."""
-        # Zapewnia zgodność typów pod Pylance
-        value = pixels[x, y]
-
-        if isinstance(value, tuple):
-            if len(value) == 4:
-                return value  # RGBA
-            if len(value) == 3:
-                r, g, b = value
-                return r, g, b, 255  # RGB -> RGBA
-            v = int(value[0])
-            return v, v, v, 255
-        else:
-            # grayscale / float / int
-            v = int(value)
-            return v, v, v, 255    
+
+        # np.array zawsze robi własną, zapisywalną kopię danych obrazu
+        return np.ascontiguousarray(np.array(img, dtype=np.uint8))
+
+    def _embed_bits_in_array(self, arr: np.ndarray, bits: np.ndarray, start_bit: int = 0) -> None:
+        """
+        Zapisuje 'bits' (tablica 0/1) w LSB kanałów RGB bufora 'arr',
+        zaczynając od pozycji 'start_bit'.
+
+        Kolejność jest identyczna jak w pętli pikselowej: (y, x, kanały R,G,B),
+        więc wcześniej zapisane pliki nadal dają się odczytać.
+        Dotykamy tylko pikseli, w które trafiają bity.
+        """
+        n_bits = len(bits)
+        if n_bits == 0:
+            return
+
+        channels = arr.shape[2]
+        first_pixel = start_bit // 3
+        end_pixel = -(-(start_bit + n_bits) // 3)  # ceil
+        offset = start_bit - first_pixel * 3
+
+        # widok na potrzebne piksele (tylko RGB, bez alfy)
+        region = arr.reshape(-1, channels)[first_pixel:end_pixel, :3]
+        flat = region.reshape(-1)  # kopia dla RGBA, widok dla RGB
+        target = flat[offset : offset + n_bits]
+        target &= 0b11111110
+        target |= bits
+        region[...] = flat.reshape(-1, 3)
 
     def _capacity_in_bits(self, img: Image.Image) -> int:
         w, h = img.size
         channels_per_pixel = 3  # użyjemy RGB
         return w * h * channels_per_pixel
 
-    def _message_to_bits(self, message: str) -> str:
-        data = message.encode("utf-8")
-        length = len(data)
-        # nagłówek: 32 bity długości
-        header = length.to_bytes(4, byteorder="big")
-        full = header + data
-        return "".join(f"{byte:08b}" for byte in full)
-
-    def _bits_to_message(self, bits: str) -> str:
-        # najpierw 32 bity = 4 bajty długości
-        header_bits = bits[: self.HEADER_BITS]
-        length = int(header_bits, 2)
-        msg_bits = bits[self.HEADER_BITS : self.HEADER_BITS + length * 8]
-        data = int(msg_bits, 2).to_bytes(length, byteorder="big")
-        return data.decode("utf-8")
+    def _capacity_lsb(self, input_path: ImageSource) -> int:
+        """
+        Pojemność na dane w bitach. Wymiary czytamy z nagłówka kontenera;
+        gdy się nie da (nietypowy wariant pliku), otwieramy go Pillowem.
+        """
+        try:
+            header = read_header(input_path)
+            width, height = header.width, header.height
+        except (ValueError, struct.error):
+            width, height = open_image(input_path).size
+        return max(0, width * height * 3 - self.HEADER_BITS)
+
+    def _embed_payload_in_array(self, arr: np.ndarray, payload: bytes) -> int:
+        """
+        Zapisuje [32 bity długości][payload] w buforze 'arr'.
+        Zwraca liczbę zajętych bitów.
+
+        Bity rozpakowujemy porcjami, więc pamięć pomocnicza nie zależy
+        od rozmiaru payloadu.
+        """
+        data = memoryview(payload).cast("B")
+        header = len(data).to_bytes(self.HEADER_BITS // 8, byteorder="big")
+        self._embed_bits_in_array(arr, np.unpackbits(np.frombuffer(header, dtype=np.uint8)))
+
+        bit_pos = self.HEADER_BITS
+        for start in range(0, len(data), self.CHUNK_BYTES):
+            chunk = np.frombuffer(data[start : start + self.CHUNK_BYTES], dtype=np.uint8)
+            bits = np.unpackbits(chunk)
+            self._embed_bits_in_array(arr, bits, bit_pos)
+            bit_pos += len(bits)
+
+        return bit_pos
+
+    def _extract_payload_from_array(self, arr: np.ndarray, start_bit: int, length: int) -> bytes:
+        """
+        Odczytuje 'length' bajtów z LSB bufora 'arr' zaczynając od 'start_bit'.
+        Bajty składamy porcjami prosto do wyniku.
+        """
+        channels = arr.shape[2]
+        pixels = arr.reshape(-1, channels)
+        out = bytearray(length)
+        chunk_bits = self.CHUNK_BYTES * 8
+
+        for start in range(0, length * 8, chunk_bits):
+            n_bits = min(chunk_bits, length * 8 - start)
+            bit = start_bit + start
+            first_pixel = bit // 3
+            end_pixel = -(-(bit + n_bits) // 3)
+            offset = bit - first_pixel * 3
+
+            flat = pixels[first_pixel:end_pixel, :3].reshape(-1)
+            packed = np.packbits(flat[offset : offset + n_bits] & 1)
+            out[start // 8 : start // 8 + len(packed)] = packed.tobytes()
+
+        return bytes(out)
 
     def _encode_lsb(
             self, 
-            input_path: str, 
-            message: str, 
-            output_path: str, 
+            input_path: ImageSource, 
+            payload: bytes, 
+            output_path: ImageTarget, 
             fmt: str, 
             anti_forensic_noise: bool, 
-            noise_ratio: float
-    ) -> str:
+            noise_ratio: float,
+            noise_seed: Optional[int] = None
+    ) -> StegoResult:
 
-        img = Image.open(input_path)
-        img, pixels = self._image_to_pixels(img)
+        img = open_image(input_path)
 
-        bits = self._message_to_bits(message)
-        if len(bits) > self._capacity_in_bits(img):
+        if self.HEADER_BITS + len(payload) * 8 > self._capacity_in_bits(img):
             raise ValueError("Wiadomość jest za długa dla tego obrazu.")
 
-        w, h = img.size
-        bit_index = 0
+        arr = self._image_to_array(img)
+        used_bits = self._embed_payload_in_array(arr, payload)
 
-        for y in range(h):
-            for x in range(w):
-                if bit_index >= len(bits):
-                    break
+        # Dodanie szumu anti-forensic
+        if anti_forensic_noise:
+            self._add_lsb_noise(arr, used_bits, noise_ratio, noise_seed)
 
-                r, g, b, a = self._get_rgba(pixels, x, y)
-                channels = [r, g, b]
+        return self._deliver_array(arr, input_path, output_path, fmt)
 
-                for i in range(3):
-                    if bit_index >= len(bits):
-                        break
+    def _deliver_array(self, arr: np.ndarray, input_path: ImageSource, output_path: ImageTarget, fmt: str) -> StegoResult:
+        """Zapisuje gotowy bufor (hook dla backendów z własnym zapisem)."""
+        return deliver_image(Image.fromarray(arr), input_path, output_path, fmt)
 
-                    channel = channels[i]
-                    channel &= 0b11111110  # zerujemy najmłodszy bit
-                    channel |= int(bits[bit_index])
-                    channels[i] = channel
-                    bit_index += 1
+    def _rows_array(self, img: Image.Image, first_row: int, end_row: int) -> np.ndarray:
+        """
+        Zwraca bufor (wiersze, w, 3|4) z wierszy [first_row, end_row) obrazu.
+        """
+        w, _ = img.size
+        return self._image_to_array(img.crop((0, first_row, w, end_row)))
 
-                pixels[x, y] = (*channels, a)
+    def _bit_range_array(self, img: Image.Image, start_bit: int, n_bits: int) -> tuple[np.ndarray, int]:
+        """
+        Bufor tylko z wierszy, w których leżą pozycje LSB
+        [start_bit, start_bit + n_bits), oraz pozycja 'start_bit' w tym buforze.
+        """
+        w, _ = img.size
+        first_row = start_bit // 3 // w
+        end_pixel = -(-(start_bit + n_bits) // 3)
+        end_row = max(first_row + 1, -(-end_pixel // w))
+        return self._rows_array(img, first_row, end_row), start_bit - first_row * w * 3
 
-            if bit_index >= len(bits):
-                break
-        used_bits = len(bits)
-        # Dodanie szumu anti-forensic
-        if anti_forensic_noise:
-            self._add_lsb_noise(pixels, w, h, used_bits, noise_ratio)
+    def _decode_lsb(self, input_path: ImageSource, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """
+        Odczytuje ukryte dane albo tylko ich bajty [offset, offset + length).
+        Z obrazu bierzemy wyłącznie wiersze z nagłówkiem i z tym zakresem,
+        więc koszt zależy od długości zakresu, a nie całych danych.
+        """
+        return self._decode_lsb_image(open_image(input_path), offset, length)
 
-        img.save(output_path, format=fmt)
-        return output_path
+    def _decode_lsb_image(self, img, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Jak _decode_lsb, dla już otwartego obrazu (wystarczy .size i _rows_array)."""
+        capacity = self._capacity_in_bits(img)
 
-    def _decode_lsb(self, input_path: str) -> str:
-        img = Image.open(input_path)
-        img, pixels = self._image_to_pixels(img)
+        if capacity < self.HEADER_BITS:
+            raise ValueError("Obraz nie zawiera nawet pełnego nagłówka.")
+
+        # 1. nagłówek: pierwsze 32 bity (11 pikseli) = długość w bajtach
+        arr, start = self._bit_range_array(img, 0, self.HEADER_BITS)
+        header = self._extract_payload_from_array(arr, start, self.HEADER_BITS // 8)
+        size = int.from_bytes(header, byteorder="big")
+
+        if self.HEADER_BITS + size * 8 > capacity:
+            raise ValueError(
+                "Deklarowana długość wiadomości przekracza pojemność osadzonych bitów."
+            )
+
+        # 2. tylko wiersze, w których leży żądany zakres
+        length = payload_range(size, offset, length)
+        arr, start = self._bit_range_array(img, self.HEADER_BITS + offset * 8, length * 8)
+        return self._extract_payload_from_array(arr, start, length)
 
-        w, h = img.size
-        bit_stream = []
-
-        # Najpierw czytamy nagłówek, żeby wiedzieć ile dalej
-        bits_needed_for_header = self.HEADER_BITS
-        header_bits = []
-        x = y = 0
-
-        # 1. Odczyt nagłówka:
-        for y in range(h):
-            for x in range(w):
-                r, g, b, *rest = pixels[x, y]
-                for channel in (r, g, b):
-                    header_bits.append(str(channel & 1))
-                    if len(header_bits) >= bits_needed_for_header:
-                        break
-                if len(header_bits) >= bits_needed_for_header:
-                    break
-            if len(header_bits) >= bits_needed_for_header:
-                break
-
-        length = int("".join(header_bits), 2)
-        msg_bits_needed = length * 8
-        msg_bits = []
-
-        idx = 0
-        for y in range(h):
-            for x in range(w):
-                r, g, b, *rest = pixels[x, y]
-                for channel in (r, g, b):
-                    if idx < bits_needed_for_header:
-                        idx += 1
-                        continue
-                    msg_bits.append(str(channel & 1))
-                    if len(msg_bits) >= msg_bits_needed:
-                        break
-                if len(msg_bits) >= msg_bits_needed:
-                    break
-            if len(msg_bits) >= msg_bits_needed:
-                break
-
-        all_bits = "".join(header_bits + msg_bits)
-        return self._bits_to_message(all_bits)
-    
     def _add_lsb_noise(
         self,
-        pixels,
-        w: int,
-        h: int,
+        arr: np.ndarray,
         used_bits: int,
         noise_ratio: float,
+        seed: Optional[int] = None,
     ) -> None:
         """
-        Dodaje szum do LSB w nieużywanych pixelach.
+        Dodaje szum do LSB w nieużywanych pozycjach bufora 'arr'.
 
-        Iterujemy w tej samej kolejności co przy kodowaniu:
+        Pozycje liczymy w tej samej kolejności co przy kodowaniu:
         (y, x, kanały R,G,B). Pierwsze 'used_bits' pozycji zostawiamy,
         a dla reszty z prawdopodobieństwem 'noise_ratio' losujemy LSB.
-        """
-        bit_pos = 0
 
-        for y in range(h):
-            for x in range(w):
-                r, g, b, a = self._get_rgba(pixels, x, y)
-                channels = [r, g, b]
-
-                for i in range(3):
-                    if bit_pos < used_bits:
-                        # tu siedzi wiadomość – nic nie ruszamy
-                        bit_pos += 1
-                        continue
-
-                    # od tego miejsca to wolna pojemność – dodajemy szum
-                    if random.random() < noise_ratio:
-                        rnd_bit = random.getrandbits(1)
-                        channels[i] = (channels[i] & 0b11111110) | rnd_bit
-
-                    bit_pos += 1
-
-                pixels[x, y] = (*channels, a)
+        Wylosowany bit różni się od obecnego z prawdopodobieństwem 1/2, więc
+        każda wolna pozycja zmienia się niezależnie z p = noise_ratio / 2.
+        Losujemy od razu zmieniane pozycje i odwracamy tylko ich LSB - koszt
+        zależy od liczby zmian, a nie od rozmiaru obrazu. Ten sam 'seed'
+        daje ten sam szum.
+        """
+        channels = arr.shape[2]
+        flat = arr.reshape(-1)
+        n_free = arr.shape[0] * arr.shape[1] * 3 - used_bits
+        rng = np.random.default_rng(seed)
+
+        for positions in bernoulli_positions(n_free, noise_ratio / 2, rng):
+            positions += used_bits
+            if channels != 3:
+                # pozycja RGB -> indeks w buforze z kanałem alfa
+                positions += (positions // 3) * (channels - 3)
+
+            flat[positions] ^= 1
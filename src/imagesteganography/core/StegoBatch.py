@@ -0,0 +1,240 @@
+import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.image_header import read_header
+from imagesteganography.utilities.image_io import ImageSource, ImageTarget, is_path
+from imagesteganography.utilities.size_optimizer import OptimizeResult
+
+
+class HideJob:
+    """
+    Jedno zadanie ukrycia: wiadomość (str) albo dane binarne (bytes).
+    Zamiast 'payload' można podać 'payload_file' - plik czyta wtedy
+    proces roboczy, więc dane nie przechodzą przez proces główny.
+    'optimize' zmniejsza zapisany wynik PNG/TIFF (StegoService.optimize_output).
+    """
+
+    def __init__(
+        self,
+        image_path: ImageSource,
+        payload: Union[str, bytes, None] = None,
+        output_path: ImageTarget = None,
+        image_format: Optional[ImageFormat] = None,
+        anti_forensic_noise: bool = False,
+        noise_ratio: float = 0.05,
+        noise_seed: Optional[int] = None,
+        jsteg: bool = False,
+        tag: Any = None,
+        payload_file: Optional[str] = None,
+        optimize: bool = False,
+    ):
+        self.image_path = image_path
+        self.payload = payload
+        self.payload_file = payload_file
+        self.output_path = output_path
+        self.image_format = image_format
+        self.anti_forensic_noise = anti_forensic_noise
+        self.noise_ratio = noise_ratio
+        self.noise_seed = noise_seed
+        self.jsteg = jsteg
+        self.tag = tag  # dowolny identyfikator wywołującego, wraca w wyniku
+        self.optimize = optimize
+
+
+class RevealJob:
+    """Jedno zadanie odczytu; 'as_bytes' zwraca surowe bajty zamiast tekstu."""
+
+    def __init__(
+        self,
+        image_path: ImageSource,
+        image_format: Optional[ImageFormat] = None,
+        as_bytes: bool = False,
+        jsteg: bool = False,
+        tag: Any = None,
+    ):
+        self.image_path = image_path
+        self.image_format = image_format
+        self.as_bytes = as_bytes
+        self.jsteg = jsteg
+        self.tag = tag
+
+
+class JobResult:
+    """
+    Wynik jednego zadania. 'index' to pozycja zadania na wejściu,
+    'value' - wynik kodowania/odczytu, 'error' - opis błędu (gdy ok=False),
+    'optimization' - wynik optymalizacji rozmiaru (HideJob z optimize=True).
+    """
+
+    def __init__(
+        self,
+        index: int,
+        job: Union[HideJob, RevealJob],
+        ok: bool,
+        value: Any = None,
+        error: Optional[str] = None,
+        elapsed: float = 0.0,
+        optimization: Optional[OptimizeResult] = None,
+    ):
+        self.index = index
+        self.job = job
+        self.ok = ok
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+        self.optimization = optimization
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"JobResult(index={self.index}, {status}, elapsed={self.elapsed:.3f}s)"
+
+
+# serwis tworzony raz na proces roboczy
+_worker_service = None
+
+
+def _init_worker(backend_factory) -> None:
+    global _worker_service
+    from imagesteganography.core.StegoService import StegoService
+
+    _worker_service = StegoService(backend_factory)
+
+
+def _job_format(job: Union[HideJob, RevealJob]) -> ImageFormat:
+    if job.image_format is not None:
+        return job.image_format
+    if is_path(job.image_path):
+        try:
+            return ImageFormat.from_path(os.fspath(job.image_path))
+        except ValueError:
+            pass  # np. .jpg - rozpoznamy po sygnaturze
+    fmt = read_header(job.image_path).format
+    if fmt is None:
+        raise ValueError("Dla obrazu w pamięci trzeba podać image_format.")
+    return fmt
+
+
+def _run_job(index: int, job: Union[HideJob, RevealJob]) -> JobResult:
+    """Wykonuje zadanie; każdy wyjątek zamieniamy na wynik z błędem."""
+    start = time.perf_counter()
+    optimization = None
+    try:
+        fmt = _job_format(job)
+        if isinstance(job, HideJob):
+            payload = job.payload
+            if job.payload_file is not None:
+                with open(job.payload_file, "rb") as f:
+                    payload = f.read()
+            hide = _worker_service.hide_message if isinstance(payload, str) else _worker_service.hide_bytes
+            value = hide(
+                job.image_path,
+                payload,
+                fmt,
+                job.output_path,
+                anti_forensic_noise=job.anti_forensic_noise,
+                noise_ratio=job.noise_ratio,
+                noise_seed=job.noise_seed,
+                jsteg=job.jsteg,
+            )
+            if job.optimize:
+                if not is_path(value):
+                    raise ValueError("Optymalizacja rozmiaru wymaga wyniku zapisanego w pliku.")
+                optimization = _worker_service.optimize_output(value, fmt)
+        else:
+            reveal = _worker_service.reveal_bytes if job.as_bytes else _worker_service.reveal_message
+            value = reveal(job.image_path, fmt, jsteg=job.jsteg)
+        return JobResult(
+            index, job, True, value=value, elapsed=time.perf_counter() - start, optimization=optimization
+        )
+    except Exception as e:
+        return JobResult(
+            index, job, False, error=f"{type(e).__name__}: {e}", elapsed=time.perf_counter() - start
+        )
+
+
+def _collected(future: Future, index: int, job: Union[HideJob, RevealJob]) -> tuple[JobResult, bool]:
+    """
+    Wynik zadania z puli i informacja, czy pula się zepsuła. Błędy samej
+    puli (padnięty proces, nieserializowalne zadanie) też stają się
+    wynikiem z błędem, zamiast przerywać cały przebieg.
+    """
+    try:
+        return future.result(), False
+    except Exception as e:
+        return JobResult(index, job, False, error=f"{type(e).__name__}: {e}"), isinstance(e, BrokenProcessPool)
+
+
+def run_jobs(
+    jobs: Iterable[Union[HideJob, RevealJob]],
+    backend_factory,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[JobResult]:
+    """
+    Wykonuje zadania w puli procesów i zwraca wyniki w kolejności ukończenia.
+
+    - workers: liczba procesów (None = liczba rdzeni, 1 = bez puli, w tym procesie),
+    - max_in_flight: ile zadań naraz może czekać w puli (domyślnie 2 * workers),
+      dzięki czemu wejście może być leniwym generatorem dowolnej długości.
+
+    Gdy proces roboczy padnie (OOM, błąd w bibliotece C), zadania będące
+    wtedy w puli kończą się błędem BrokenProcessPool, a dla pozostałych
+    tworzymy nową pulę.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(backend_factory)
+        for index, job in enumerate(jobs):
+            yield _run_job(index, job)
+        return
+
+    def new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(backend_factory,))
+
+    max_in_flight = max(1, max_in_flight or 2 * workers)
+    pool = new_pool()
+    # przyszły wynik -> (indeks, zadanie, pula, do której trafiło)
+    pending: dict[Future, tuple[int, Union[HideJob, RevealJob], ProcessPoolExecutor]] = {}
+
+    def restart() -> None:
+        nonlocal pool
+        pool.shutdown(wait=False, cancel_futures=True)
+        pool = new_pool()
+
+    def finished(when: str) -> Iterator[JobResult]:
+        done, _ = wait(pending, return_when=when)
+        broken = False
+        for future in done:
+            index, job, owner = pending.pop(future)
+            result, pool_broken = _collected(future, index, job)
+            # zepsuta pula kończy błędem swoje zadania po kolei - te odebrane
+            # po wymianie puli nie mogą zatrzymać nowej, zdrowej
+            broken |= pool_broken and owner is pool
+            yield result
+        if broken:
+            restart()
+
+    try:
+        for index, job in enumerate(jobs):
+            if len(pending) >= max_in_flight:
+                yield from finished(FIRST_COMPLETED)
+            try:
+                future = pool.submit(_run_job, index, job)
+            except BrokenProcessPool:
+                # pula padła, zanim odebraliśmy jej wyniki - reszta trafi do nowej
+                dead = pool
+                yield from finished(ALL_COMPLETED)
+                if pool is dead:
+                    restart()
+                future = pool.submit(_run_job, index, job)
+            pending[future] = (index, job, pool)
+
+        while pending:
+            yield from finished(FIRST_COMPLETED)
+    finally:
+        pool.shutdown(cancel_futures=True)
@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from imagesteganography.core import StegoBatch
+from imagesteganography.core.StegoBatch import HideJob, RevealJob, _init_worker, _run_job
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.StegoBackendFactory import StegoBackendFactory
+from imagesteganography.utilities.logger import get_logger
+
+MAX_BODY_BYTES = 256 << 20
+JOB_TIMEOUT = 300.0
+
+
+def _warm_up() -> int:
+    """Zadanie rozgrzewające: wymusza start procesu i import backendów."""
+    return StegoBatch._worker_service is not None
+
+
+class StegoServer:
+    """
+    Lokalny serwer HTTP (tylko biblioteka standardowa) z rozgrzaną pulą
+    procesów roboczych wokół StegoService.
+
+    Endpointy (parametry w query: format=png|bmp|tiff|jpeg, jsteg=1,
+    noise=1, noise_ratio=0.05, seed=N):
+
+    - POST /encode - ciało: dane do ukrycia, a zaraz po nich obraz;
+      długość danych w nagłówku X-Payload-Length. Odpowiedź: obraz wynikowy.
+    - POST /decode - ciało: obraz. Odpowiedź: ukryte dane (bajty).
+    - POST /capacity - ciało: obraz. Odpowiedź: JSON {"bits", "bytes"}.
+    - GET /health - stan puli.
+
+    Ciała żądań i odpowiedzi przechodzą wyłącznie przez pamięć. Gdy w puli
+    czeka już 'queue_size' zadań, serwer od razu odpowiada 503 z Retry-After
+    zamiast kolejkować bez końca. Zadanie przerwane po 'job_timeout' (504)
+    zajmuje miejsce w kolejce, dopóki naprawdę nie skończy się w puli -
+    'queue_size' ogranicza więc rzeczywiste obciążenie. Gdy proces roboczy
+    padnie (OOM, błąd w bibliotece C), odpowiadamy 503 i tworzymy pulę od nowa.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        max_body: int = MAX_BODY_BYTES,
+        backend_factory: StegoBackendFactory | None = None,
+        job_timeout: float = JOB_TIMEOUT,
+        log_requests: bool = True,
+    ):
+        self.backend_factory = backend_factory or StegoBackendFactory()
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = self._new_pool()
+        self._pool_lock = threading.Lock()
+        self.queue_size = queue_size or 2 * self.workers
+        self.in_flight = 0
+        self._slots_lock = threading.Lock()
+        self.max_body = max_body
+        self.job_timeout = job_timeout
+        self.log_requests = log_requests
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stego = self
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.backend_factory,),
+        )
+
+    def restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Zastępuje zepsutą pulę nową (raz, nawet gdy zgłosi to kilka wątków)."""
+        with self._pool_lock:
+            if self.pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._new_pool()
+
+    def acquire_slot(self) -> bool:
+        with self._slots_lock:
+            if self.in_flight >= self.queue_size:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release_slot(self) -> None:
+        with self._slots_lock:
+            self.in_flight -= 1
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def warm_up(self) -> None:
+        """Uruchamia wszystkie procesy robocze przed pierwszym żądaniem."""
+        for future in [self.pool.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+
+    def serve_forever(self) -> None:
+        self.warm_up()
+        self.httpd.serve_forever()
+
+    def shutdown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "StegoServer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+
+def _json_reply(status: int, data: dict, headers: dict | None = None) -> tuple:
+    return status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json", headers
+
+
+def _flag(query: dict, name: str) -> bool:
+    return query.get(name, ["0"])[0].lower() in ("1", "true", "yes")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive - bez nowego połączenia na żądanie
+    disable_nagle_algorithm = True  # nagłówki i ciało idą osobno; bez tego +40 ms (delayed ACK)
+
+    @property
+    def stego(self) -> StegoServer:
+        return self.server.stego
+
+    def log_message(self, format: str, *args) -> None:
+        if self.stego.log_requests:
+            get_logger().debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/octet-stream", headers: dict | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: dict, headers: dict | None = None) -> None:
+        self._send(*_json_reply(status, data, headers))
+
+    def _read_body(self) -> Union[bytes, tuple]:
+        """Ciało żądania albo gotowa odpowiedź z błędem (argumenty dla _send)."""
+        length = self.headers.get("Content-Length")
+        if length is None:
+            return _json_reply(411, {"error": "Wymagany nagłówek Content-Length."})
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        # przy błędach ciała nie czytamy, więc połączenia nie da się dalej używać
+        if length < 0:
+            return _json_reply(400, {"error": "Niepoprawny nagłówek Content-Length."}, {"Connection": "close"})
+        if length > self.stego.max_body:
+            return _json_reply(413, {"error": f"Ciało żądania większe niż {self.stego.max_body} B."}, {"Connection": "close"})
+        return self.rfile.read(length)
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path != "/health":
+            self._send_json(404, {"error": "Nieznany endpoint."})
+            return
+        stego = self.stego
+        self._send_json(200, {"ok": True, "workers": stego.workers, "in_flight": stego.in_flight, "queue_size": stego.queue_size})
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path not in ("/encode", "/decode", "/capacity"):
+            self._send_json(404, {"error": "Nieznany endpoint."})
+            return
+
+        # Backpressure: bez wolnego miejsca nie czytamy nawet ciała
+        if not self.stego.acquire_slot():
+            self._send_json(503, {"error": "Kolejka pełna, spróbuj ponownie."}, {"Retry-After": "1", "Connection": "close"})
+            return
+        # miejsce zwalniamy przed wysłaniem odpowiedzi - klient, który ją
+        # dostał, może od razu wysłać kolejne żądanie i nie trafi na 503
+        pending = []  # zadanie, które po 504 dalej zajmuje proces roboczy
+        try:
+            reply = self._execute(url.path, query, pending)
+        finally:
+            if pending and not pending[0].cancel():
+                pending[0].add_done_callback(lambda _: self.stego.release_slot())
+            else:
+                self.stego.release_slot()
+        self._send(*reply)
+
+    def _execute(self, path: str, query: dict, pending: list) -> tuple:
+        """
+        Wykonuje żądanie w puli; zwraca argumenty dla _send. Zadanie
+        przerwane czasem trafia do 'pending'.
+        """
+        body = self._read_body()
+        if isinstance(body, tuple):
+            return body
+        try:
+            job = self._job(path, query, body)
+        except (KeyError, ValueError) as e:
+            return _json_reply(400, {"error": f"Niepoprawne żądanie: {e}"})
+
+        start = time.perf_counter()
+        pool = self.stego.pool
+        try:
+            if path == "/capacity":
+                future = pool.submit(_capacity_job, *job)
+            else:
+                future = pool.submit(_run_job, 0, job)
+            result = future.result(timeout=self.stego.job_timeout)
+        except FutureTimeout:
+            pending.append(future)
+            return _json_reply(504, {"error": "Przekroczono czas przetwarzania."})
+        except BrokenProcessPool:
+            self.stego.restart_pool(pool)
+            return _json_reply(503, {"error": "Proces roboczy przerwał pracę, spróbuj ponownie."}, {"Retry-After": "1"})
+        elapsed = {"X-Elapsed-Ms": f"{(time.perf_counter() - start) * 1000:.1f}"}
+
+        if path == "/capacity":
+            if isinstance(result, str):
+                return _json_reply(400, {"error": result}, elapsed)
+            return _json_reply(200, {"bits": result.bits, "bytes": result.bytes}, elapsed)
+        if result.ok:
+            return 200, result.value, "application/octet-stream", elapsed
+        return _json_reply(400, {"error": result.error}, elapsed)
+
+    def _job(self, path: str, query: dict, body: bytes):
+        fmt = ImageFormat(query.get("format", ["png"])[0].lower())
+        jsteg = _flag(query, "jsteg")
+        if path == "/decode":
+            return RevealJob(body, fmt, as_bytes=True, jsteg=jsteg)
+        if path == "/capacity":
+            return body, fmt, jsteg
+
+        payload_length = int(self.headers["X-Payload-Length"])
+        if not 0 <= payload_length <= len(body):
+            raise ValueError("X-Payload-Length poza ciałem żądania.")
+        seed = query.get("seed", [None])[0]
+        return HideJob(
+            body[payload_length:],
+            body[:payload_length],
+            image_format=fmt,
+            anti_forensic_noise=_flag(query, "noise"),
+            noise_ratio=float(query.get("noise_ratio", ["0.05"])[0]),
+            noise_seed=int(seed) if seed is not None else None,
+            jsteg=jsteg,
+        )
+
+
+def _capacity_job(image: bytes, fmt: ImageFormat, jsteg: bool):
+    """Pojemność w bitach (bez nagłówka długości) albo opis błędu."""
+    try:
+        return StegoBatch._worker_service.capacity(image, fmt, jsteg=jsteg)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
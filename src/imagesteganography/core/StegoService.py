@@ -1,6 +1,11 @@
 import os
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+from imagesteganography.core import StegoVolumes
+from imagesteganography.core.StegoBatch import HideJob, JobResult, RevealJob, run_jobs
 from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.image_header import Capacity, read_header
+from imagesteganography.utilities.image_io import ImageSource, ImageTarget, StegoResult, is_path
+from imagesteganography.utilities.size_optimizer import OptimizeResult
 from imagesteganography.utilities.StegoBackendFactory import StegoBackendFactory
 
 
@@ -8,6 +13,10 @@ class StegoService:
     """
     Warstwa pośrednia między GUI a konkretnymi backendami.
     GUI używa tylko tej klasy.
+
+    'image_path' może być też obrazem w pamięci (bytes, obiekt plikowy,
+    obraz PIL, tablica NumPy). Wtedy przy output_path=None wynik wraca
+    w pamięci, w tej samej postaci co wejście, bez zapisu na dysk.
     """
 
     def __init__(self, backend_factory: StegoBackendFactory | None = None):
@@ -19,29 +28,174 @@ class StegoService:
 
     def hide_message(
         self,
-        image_path: str,
+        image_path: ImageSource,
         message: str,
         image_format: ImageFormat,
-        output_path: Optional[str] = None,
+        output_path: ImageTarget = None,
         anti_forensic_noise: bool = False, 
-        noise_ratio: float = 0.05
-    ) -> str:
+        noise_ratio: float = 0.05,
+        noise_seed: Optional[int] = None,
+        jsteg: bool = False
+    ) -> StegoResult:
         """
-        Ukrywa wiadomość i zwraca ścieżkę do nowego pliku.
+        Ukrywa wiadomość i zwraca ścieżkę do nowego pliku (albo wynik w pamięci).
         """
         backend = self.backend_factory.create(
             image_format, 
             anti_forensic_noise=anti_forensic_noise, 
-            noise_ratio=noise_ratio
+            noise_ratio=noise_ratio,
+            noise_seed=noise_seed,
+            jsteg=jsteg
         )
 
-        if output_path is None:
+        if output_path is None and is_path(image_path):
             output_path = self._default_output_path(image_path)
         return backend.encode(image_path, message, output_path)
 
-    def reveal_message(self, image_path: str, image_format: ImageFormat) -> str:
+    def hide_bytes(
+        self,
+        image_path: ImageSource,
+        payload: bytes,
+        image_format: ImageFormat,
+        output_path: ImageTarget = None,
+        anti_forensic_noise: bool = False, 
+        noise_ratio: float = 0.05,
+        noise_seed: Optional[int] = None,
+        jsteg: bool = False
+    ) -> StegoResult:
+        """
+        Ukrywa dowolne dane binarne (np. archiwum, szyfrogram)
+        bez konwersji przez UTF-8 i zwraca ścieżkę do nowego pliku
+        (albo wynik w pamięci).
+        """
+        backend = self.backend_factory.create(
+            image_format, 
+            anti_forensic_noise=anti_forensic_noise, 
+            noise_ratio=noise_ratio,
+            noise_seed=noise_seed,
+            jsteg=jsteg
+        )
+
+        if output_path is None and is_path(image_path):
+            output_path = self._default_output_path(image_path)
+        return backend.encode_bytes(image_path, payload, output_path)
+
+    def reveal_message(self, image_path: ImageSource, image_format: ImageFormat, jsteg: bool = False) -> str:
         """
         Odczytuje wiadomość i zwraca ją jako tekst.
         """
-        backend = self.backend_factory.create(image_format)
+        backend = self.backend_factory.create(image_format, jsteg=jsteg)
         return backend.decode(image_path)
+
+    def reveal_bytes(self, image_path: ImageSource, image_format: ImageFormat, jsteg: bool = False) -> bytes:
+        """
+        Odczytuje ukryte dane i zwraca je jako surowe bajty.
+        """
+        backend = self.backend_factory.create(image_format, jsteg=jsteg)
+        return backend.decode_bytes(image_path)
+
+    def read_range(
+        self,
+        image_path: ImageSource,
+        image_format: ImageFormat,
+        offset: int,
+        length: Optional[int] = None,
+        jsteg: bool = False,
+    ) -> bytes:
+        """
+        Odczytuje tylko bajty [offset, offset + length) ukrytych danych
+        (np. nagłówek albo spis treści dużego pliku), bez reszty.
+        """
+        backend = self.backend_factory.create(image_format, jsteg=jsteg)
+        return backend.read_range(image_path, offset, length)
+
+    def capacity(
+        self,
+        image_path: ImageSource,
+        image_format: Optional[ImageFormat] = None,
+        jsteg: bool = False
+    ) -> Capacity:
+        """
+        Zwraca liczbę bitów danych, które zmieszczą się w obrazie (bez
+        32-bitowego nagłówka długości); 'bytes' wyniku to pojemność w bajtach.
+
+        Czytany jest tylko nagłówek pliku (IHDR, DIB, IFD, SOF), bez
+        dekodowania pikseli ani współczynników - wyjątkiem jest JPEG w trybie
+        jsteg. Bez 'image_format' format rozpoznajemy po sygnaturze pliku.
+        """
+        if image_format is None:
+            image_format = read_header(image_path).format
+            if image_format is None:
+                raise ValueError("Podaj image_format dla obrazu w pamięci.")
+        backend = self.backend_factory.create(image_format, jsteg=jsteg)
+        return Capacity(backend.capacity(image_path))
+
+    def optimize_output(
+        self,
+        output_path: str,
+        image_format: Optional[ImageFormat] = None,
+        threads: Optional[int] = None,
+    ) -> OptimizeResult:
+        """
+        Zmniejsza zapisany wynik (PNG/TIFF), próbując równolegle kilku
+        bezstratnych kodowań i zostawiając najmniejsze. Piksele, więc
+        i ukryte bity, się nie zmieniają; wynik podaje zaoszczędzone bajty.
+        """
+        if image_format is None:
+            image_format = read_header(output_path).format
+        backend = self.backend_factory.create(image_format)
+        return backend.optimize_output(output_path, threads)
+
+    def hide_many(
+        self,
+        jobs: Iterable[HideJob],
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[JobResult]:
+        """
+        Ukrywa dane w wielu obrazach równolegle (pula procesów).
+        Wyniki wracają w kolejności ukończenia; błąd jednego zadania
+        nie przerywa pozostałych (JobResult.ok=False, JobResult.error).
+        """
+        return run_jobs(jobs, self.backend_factory, workers, max_in_flight)
+
+    def reveal_many(
+        self,
+        jobs: Iterable[RevealJob],
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[JobResult]:
+        """
+        Odczytuje dane z wielu obrazów równolegle, jak hide_many.
+        """
+        return run_jobs(jobs, self.backend_factory, workers, max_in_flight)
+
+    def hide_volumes(
+        self,
+        payload: StegoVolumes.PayloadSource,
+        covers: Iterable[str],
+        image_format: Optional[ImageFormat] = None,
+        output_dir: Optional[str] = None,
+        jsteg: bool = False,
+        workers: Optional[int] = None,
+    ) -> Iterator[JobResult]:
+        """
+        Ukrywa dane większe niż pojemność jednego obrazu jako zestaw woluminów
+        (fragment + nagłówek: id zestawu, numer, liczba, CRC32) w kolejnych
+        nośnikach. Wyniki (pliki *_volN) wracają jak w hide_many.
+        """
+        return StegoVolumes.hide_volumes(self, payload, covers, image_format, output_dir, jsteg, workers)
+
+    def reveal_volumes(
+        self,
+        images: Iterable[str],
+        output,
+        image_format: Optional[ImageFormat] = None,
+        jsteg: bool = False,
+        workers: Optional[int] = None,
+    ) -> StegoVolumes.VolumeInfo:
+        """
+        Odczytuje zestaw woluminów równolegle i składa dane w 'output'
+        (ścieżka albo strumień z seek). Kolejność obrazów nie ma znaczenia.
+        """
+        return StegoVolumes.reveal_volumes(self, images, output, image_format, jsteg, workers)
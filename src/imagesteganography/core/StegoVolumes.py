@@ -0,0 +1,196 @@
+import io
+import os
+import struct
+import uuid
+import zlib
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+from imagesteganography.core.StegoBatch import HideJob, JobResult, RevealJob
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.image_io import is_buffer, is_path
+
+# Nagłówek woluminu (przed fragmentem danych, po 32-bitowej długości):
+# magic, id zestawu (UUID), numer, liczba woluminów, rozmiar całości,
+# przesunięcie fragmentu w całości, CRC32 fragmentu
+VOLUME_MAGIC = b"SGV1"
+VOLUME_HEADER = struct.Struct(">4s16sIIQQI")
+
+PayloadSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+class VolumeInfo:
+    """Nagłówek jednego woluminu."""
+
+    def __init__(self, set_id: bytes, index: int, count: int, total_size: int, offset: int, crc: int):
+        self.set_id = set_id
+        self.index = index
+        self.count = count
+        self.total_size = total_size
+        self.offset = offset
+        self.crc = crc
+
+    def pack(self) -> bytes:
+        return VOLUME_HEADER.pack(
+            VOLUME_MAGIC, self.set_id, self.index, self.count, self.total_size, self.offset, self.crc
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> tuple["VolumeInfo", memoryview]:
+        """Rozdziela odczytane dane na nagłówek i fragment; sprawdza CRC."""
+        if len(data) < VOLUME_HEADER.size or data[:4] != VOLUME_MAGIC:
+            raise ValueError("To nie jest wolumin zestawu (brak nagłówka).")
+        _, set_id, index, count, total, offset, crc = VOLUME_HEADER.unpack_from(data)
+        chunk = memoryview(data)[VOLUME_HEADER.size :]
+        if zlib.crc32(chunk) != crc:
+            raise ValueError(f"Wolumin {index + 1}/{count}: niezgodna suma kontrolna.")
+        if index >= count or offset + len(chunk) > total:
+            raise ValueError(f"Wolumin {index + 1}/{count}: niespójny nagłówek.")
+        return cls(set_id, index, count, total, offset, crc), chunk
+
+
+def _open_payload(payload: PayloadSource) -> tuple[BinaryIO, int, bool]:
+    """Strumień z danymi, jego długość i czy trzeba go zamknąć."""
+    if is_path(payload):
+        return open(payload, "rb"), os.path.getsize(payload), True
+    if is_buffer(payload):
+        return io.BytesIO(payload), len(payload), True
+    start = payload.tell()
+    size = payload.seek(0, io.SEEK_END) - start
+    payload.seek(start)
+    return payload, size, False
+
+
+def _output_path(cover: str, output_dir: Optional[str], index: int, count: int) -> str:
+    base, ext = os.path.splitext(os.path.basename(cover))
+    folder = output_dir or os.path.dirname(os.path.abspath(cover))
+    return os.path.join(folder, f"{base}_vol{index + 1:0{len(str(count))}d}{ext}")
+
+
+def hide_volumes(
+    service,
+    payload: PayloadSource,
+    covers: Iterable[str],
+    image_format: Optional[ImageFormat] = None,
+    output_dir: Optional[str] = None,
+    jsteg: bool = False,
+    workers: Optional[int] = None,
+) -> Iterator[JobResult]:
+    """
+    Dzieli dane na fragmenty i ukrywa je w kolejnych nośnikach (tylu, ilu
+    potrzeba; każdy zapełniany do pełna). Plan powstaje z samych pojemności,
+    zanim cokolwiek zostanie zapisane. Fragmenty są czytane ze źródła
+    dopiero, gdy pula ma miejsce na kolejne zadanie, więc w pamięci jest
+    najwyżej kilka fragmentów naraz.
+
+    Zwraca wyniki zadań (JobResult.job.tag = numer woluminu).
+    """
+    stream, total, owned = _open_payload(payload)
+    sizes, used = [], []
+    remaining = total
+    for cover in covers:
+        if remaining <= 0 and sizes:
+            break
+        room = service.capacity(cover, image_format, jsteg=jsteg).bytes - VOLUME_HEADER.size
+        if room <= 0:
+            continue
+        sizes.append(min(room, remaining))
+        used.append(cover)
+        remaining -= sizes[-1]
+    if remaining > 0 or not sizes:
+        if owned:
+            stream.close()
+        raise ValueError(f"Za mało pojemności w nośnikach: brakuje {max(remaining, 1)} B.")
+
+    set_id = uuid.uuid4().bytes
+    count = len(sizes)
+
+    def jobs() -> Iterator[HideJob]:
+        offset = 0
+        try:
+            for index, (cover, size) in enumerate(zip(used, sizes)):
+                chunk = stream.read(size)
+                if len(chunk) != size:
+                    raise ValueError("Źródło danych skończyło się przedwcześnie.")
+                header = VolumeInfo(set_id, index, count, total, offset, zlib.crc32(chunk)).pack()
+                offset += size
+                yield HideJob(
+                    cover,
+                    header + chunk,
+                    output_path=_output_path(cover, output_dir, index, count),
+                    image_format=image_format,
+                    jsteg=jsteg,
+                    tag=index,
+                )
+        finally:
+            if owned:
+                stream.close()
+
+    return service.hide_many(jobs(), workers=workers)
+
+
+def reveal_volumes(
+    service,
+    images: Iterable[str],
+    output: Union[str, os.PathLike, BinaryIO],
+    image_format: Optional[ImageFormat] = None,
+    jsteg: bool = False,
+    workers: Optional[int] = None,
+) -> VolumeInfo:
+    """
+    Odczytuje woluminy równolegle i zapisuje każdy fragment od razu na jego
+    miejscu w 'output' (ścieżka albo strumień z seek), w dowolnej kolejności.
+    Sprawdza: jeden zestaw, komplet numerów, sumy kontrolne, rozmiar.
+    Zwraca nagłówek ostatniego woluminu (id zestawu, liczba, rozmiar).
+    """
+    owned = is_path(output)
+    stream = open(output, "wb") if owned else output
+    start = stream.tell()
+    first: Optional[VolumeInfo] = None
+    seen: set[int] = set()
+    errors: list[str] = []
+
+    jobs = (RevealJob(image, image_format, as_bytes=True, jsteg=jsteg, tag=image) for image in images)
+    try:
+        for result in service.reveal_many(jobs, workers=workers):
+            if not result.ok:
+                errors.append(f"{result.job.tag}: {result.error}")
+                continue
+            try:
+                info, chunk = VolumeInfo.unpack(result.value)
+            except ValueError as e:
+                errors.append(f"{result.job.tag}: {e}")
+                continue
+
+            if first is None:
+                first = info
+            elif (info.set_id, info.count, info.total_size) != (first.set_id, first.count, first.total_size):
+                errors.append(f"{result.job.tag}: wolumin z innego zestawu.")
+                continue
+            if info.index in seen:
+                errors.append(f"{result.job.tag}: powtórzony wolumin {info.index + 1}.")
+                continue
+            seen.add(info.index)
+            stream.seek(start + info.offset)
+            stream.write(chunk)
+
+        if first is not None:
+            missing = sorted(set(range(first.count)) - seen)
+            if missing:
+                errors.append("Brak woluminów: " + ", ".join(str(i + 1) for i in missing))
+        elif not errors:
+            errors.append("Nie podano żadnych woluminów.")
+        if errors:
+            raise ValueError("Nie udało się odtworzyć danych:\n" + "\n".join(errors))
+
+        stream.seek(start + first.total_size)
+        stream.truncate()
+        return first
+    except BaseException:
+        if owned:
+            stream.close()
+            os.remove(output)
+            owned = False
+        raise
+    finally:
+        if owned:
+            stream.close()
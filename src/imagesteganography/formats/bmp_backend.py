@@ -1,16 +1,108 @@
+import os
+import shutil
+import struct
+from typing import Optional
+
+import numpy as np
+
 from imagesteganography.core.ImageStegoBackend import ImageStegoBackend
 from imagesteganography.core.LsbMixin import LsbMixin
+from imagesteganography.formats.bmp_mmap import MappedBmp
+from imagesteganography.utilities.image_io import ImageSource, ImageTarget, StegoResult, is_path
+from imagesteganography.utilities.noise import bernoulli_positions
+
 
 class BmpStegoBackend(ImageStegoBackend, LsbMixin):
-    def __init__(self, anti_forensic_noise: bool, noise_ratio: float):
+    """
+    LSB w BMP. Nieskompresowane pliki 24/32-bitowe (ścieżka na wejściu
+    i wyjściu) obsługujemy bez Pillowa: kopiujemy nośnik, mapujemy kopię
+    w pamięci i zmieniamy tylko bajty, w które trafiają bity - koszt to
+    kopia pliku i praca proporcjonalna do danych. Gdy wyjście to ten sam
+    plik co wejście, zapisujemy w miejscu, bez kopii. Pozostałe warianty
+    idą zwykłą ścieżką przez Pillowa.
+    """
+
+    def __init__(self, anti_forensic_noise: bool, noise_ratio: float, noise_seed: Optional[int] = None):
         self.anti_forensic_noise = anti_forensic_noise
         self.noise_ratio = noise_ratio
+        self.noise_seed = noise_seed
 
-    def encode(self, input_path: str, message: str, output_path: str) -> str:
-        return self._encode_lsb(input_path, message, output_path, 
-                                fmt="BMP", 
+    def encode(self, input_path: ImageSource, message: str, output_path: ImageTarget) -> StegoResult:
+        return self.encode_bytes(input_path, message.encode("utf-8"), output_path)
+
+    def encode_bytes(self, input_path: ImageSource, payload: bytes, output_path: ImageTarget) -> StegoResult:
+        if is_path(input_path) and is_path(output_path):
+            try:
+                cover = MappedBmp(input_path)
+            except (OSError, ValueError, struct.error):
+                pass  # wariant bez szybkiej ścieżki
+            else:
+                with cover:
+                    capacity = self._capacity_in_bits(cover)
+                if self.HEADER_BITS + len(payload) * 8 > capacity:
+                    raise ValueError("Wiadomość jest za długa dla tego obrazu.")
+                return self._encode_mapped(input_path, payload, output_path)
+
+        return self._encode_lsb(input_path, payload, output_path,
+                                fmt="BMP",
                                 anti_forensic_noise = self.anti_forensic_noise,
-                                noise_ratio = self.noise_ratio)
+                                noise_ratio = self.noise_ratio,
+                                noise_seed = self.noise_seed)
+
+    def decode(self, input_path: ImageSource) -> str:
+        return self.decode_bytes(input_path).decode("utf-8")
+
+    def decode_bytes(self, input_path: ImageSource) -> bytes:
+        return self.read_range(input_path, 0)
+
+    def read_range(self, input_path: ImageSource, offset: int, length: Optional[int] = None) -> bytes:
+        if is_path(input_path):
+            try:
+                pixels = MappedBmp(input_path)
+            except (OSError, ValueError, struct.error):
+                pass
+            else:
+                with pixels:
+                    return self._decode_lsb_image(pixels, offset, length)
+        return self._decode_lsb(input_path, offset, length)
+
+    def capacity(self, input_path: ImageSource) -> int:
+        return self._capacity_lsb(input_path)
+
+    def _encode_mapped(self, input_path: str, payload: bytes, output_path: str) -> str:
+        in_place = os.path.exists(output_path) and os.path.samefile(input_path, output_path)
+        if not in_place:
+            shutil.copyfile(input_path, output_path)
+        with MappedBmp(output_path, writable=True) as pixels:
+            used_bits = self._embed_payload_in_array(pixels, payload)
+            if self.anti_forensic_noise:
+                self._add_lsb_noise(pixels, used_bits, self.noise_ratio, self.noise_seed)
+            pixels.flush()
+        return output_path
+
+    def _rows_array(self, img, first_row: int, end_row: int) -> np.ndarray:
+        if isinstance(img, MappedBmp):
+            return img.rows(first_row, end_row)
+        return super()._rows_array(img, first_row, end_row)
+
+    def _embed_bits_in_array(self, arr, bits: np.ndarray, start_bit: int = 0) -> None:
+        """Dla zmapowanego pliku: kopia tylko wierszy z bitami, zapis z powrotem."""
+        if not isinstance(arr, MappedBmp):
+            return super()._embed_bits_in_array(arr, bits, start_bit)
+        if len(bits) == 0:
+            return
+        band, start = self._bit_range_array(arr, start_bit, len(bits))
+        super()._embed_bits_in_array(band, bits, start)
+        arr.write_rows((start_bit - start) // (arr.size[0] * 3), band)
 
-    def decode(self, input_path: str) -> str:
-        return self._decode_lsb(input_path)
+    def _add_lsb_noise(self, arr, used_bits: int, noise_ratio: float, seed: Optional[int] = None) -> None:
+        """Ten sam szum co w LsbMixin (te same pozycje dla tego samego seeda), w pliku."""
+        if not isinstance(arr, MappedBmp):
+            return super()._add_lsb_noise(arr, used_bits, noise_ratio, seed)
+        w, h = arr.size
+        rng = np.random.default_rng(seed)
+        for positions in bernoulli_positions(w * h * 3 - used_bits, noise_ratio / 2, rng):
+            positions += used_bits
+            pixel, channel = np.divmod(positions, 3)
+            y, x = np.divmod(pixel, w)
+            arr.rgb[y, x, channel] ^= 1
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from typing import Optional
+
+import numpy as np
+
+BI_RGB, BI_BITFIELDS = 0, 3
+# maski BGRA/BGRX - jedyny układ 32-bitowy, który da się czytać bajtami
+BGRX_MASKS = (0x00FF0000, 0x0000FF00, 0x000000FF)
+
+
+class MappedBmp:
+    """
+    Nieskompresowany BMP (24 albo 32 bity na piksel) zmapowany w pamięci.
+
+    'rgb' to widok (h, w, 3) na bajty pliku w kolejności (y, x, R,G,B) od
+    górnego wiersza - jak tablica z Pillowa, ale bez kopii: uwzględnia
+    wiersze zapisane od dołu, wyrównanie wierszy do 4 bajtów i kolejność
+    BGR(X) w pliku. Zmiany w widoku trafiają wprost do pliku.
+
+    Inne warianty (paleta, 16 bitów, RLE, nietypowe maski) zgłaszają
+    ValueError - wtedy trzeba użyć Pillowa.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        self.path = path
+        self._file = open(path, "r+b" if writable else "rb")
+        try:
+            self._map(writable)
+        except Exception:
+            self._file.close()
+            raise
+
+    def _map(self, writable: bool) -> None:
+        head = self._file.read(70)
+        if len(head) < 54 or head[:2] != b"BM":
+            raise ValueError("To nie jest plik BMP.")
+        (pixel_offset,) = struct.unpack_from("<I", head, 10)
+        dib_size, width, height, _, bpp, compression = struct.unpack_from("<IiiHHI", head, 14)
+
+        if dib_size < 40 or width <= 0 or height == 0 or bpp not in (24, 32):
+            raise ValueError("Nieobsługiwany wariant BMP.")
+        if compression == BI_BITFIELDS:
+            # maski są zaraz za BITMAPINFOHEADER (albo w dłuższym nagłówku V2+)
+            if bpp != 32 or struct.unpack_from("<III", head, 54) != BGRX_MASKS:
+                raise ValueError("Nieobsługiwane maski kolorów BMP.")
+        elif compression != BI_RGB:
+            raise ValueError("Skompresowany BMP.")
+
+        rows = abs(height)
+        stride = (width * bpp + 31) // 32 * 4
+        if os.fstat(self._file.fileno()).st_size < pixel_offset + stride * rows:
+            raise ValueError("Plik BMP jest ucięty.")
+
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        data = np.frombuffer(self._mm, dtype=np.uint8, count=stride * rows, offset=pixel_offset)
+        pixels = data.reshape(rows, stride)[:, : width * (bpp // 8)].reshape(rows, width, bpp // 8)
+        if height > 0:
+            pixels = pixels[::-1]  # wiersze zapisane od dołu
+        self.rgb: Optional[np.ndarray] = pixels[..., 2::-1]  # B,G,R -> R,G,B
+        self.size = (width, rows)
+
+    def rows(self, first_row: int, end_row: int) -> np.ndarray:
+        """Ciągła kopia wierszy [first_row, end_row) jako (wiersze, w, 3)."""
+        return np.ascontiguousarray(self.rgb[first_row:end_row])
+
+    def write_rows(self, first_row: int, arr: np.ndarray) -> None:
+        self.rgb[first_row : first_row + len(arr)] = arr
+
+    def flush(self) -> None:
+        self._mm.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        # mmap nie zamknie się, póki istnieją widoki NumPy na jego bufor
+        self.rgb = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedBmp":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,12 +1,27 @@
 from __future__ import annotations
 
+import os
 import struct
 import jpegio as jio   
+import numpy as np
 
-from typing import List
+from typing import Optional
 
-from imagesteganography.core.ImageStegoBackend import ImageStegoBackend
+from imagesteganography.core.ImageStegoBackend import ImageStegoBackend, payload_range
+from imagesteganography.formats.jpeg_prefix_reader import JpegPrefixReader
+from imagesteganography.utilities.ImageFormat import ImageFormat
 from imagesteganography.utilities.config import get_config
+from imagesteganography.utilities.image_header import read_header
+from imagesteganography.utilities.image_io import (
+    ImageSource,
+    ImageTarget,
+    StegoResult,
+    deliver_file,
+    is_path,
+    source_as_path,
+    temp_path,
+)
+from imagesteganography.utilities.noise import bernoulli_positions
 
 config = get_config()
 
@@ -18,167 +33,375 @@ class JpegStegoBackend(ImageStegoBackend):
         [32 bity długości wiadomości w bajtach][dane UTF-8].
 
     Prosty LSB w DCT, nie działa po pixelach.
+
+    Tryb 'jsteg' używa tylko współczynników AC o wartości innej niż 0 i 1.
+    Zmiana LSB nigdy nie zamienia ich w 0/1, więc dekoder wyznacza ten sam
+    zbiór pozycji, a zera zostają zerami i plik wyjściowy nie puchnie.
+    Do odczytu trzeba podać ten sam tryb co przy zapisie.
+
+    Źródłem w pamięci musi być skompresowany plik JPEG (bytes albo obiekt
+    plikowy) - obraz PIL czy tablica pikseli nie mają już współczynników DCT.
+    jpegio czyta i zapisuje wyłącznie pliki, więc dla takich źródeł i celów
+    używamy pliku tymczasowego; krótkie wiadomości odczytujemy bez niego.
     """
 
     HEADER_BITS = int(config.get("PARAMS","HEADER_BITS")) #type: ignore
-
-    def __init__(self, anti_forensic_noise: bool, noise_ratio: float):
+    CHUNK_BYTES = 1 << 16  # porcja payloadu rozpakowywana naraz do bitów
+    # powyżej tej części komponentu Y pełny jio.read jest szybszy niż
+    # dekodowanie prefiksu w Pythonie
+    PREFIX_MAX_FRACTION = 1 / 16
+
+    def __init__(
+        self,
+        anti_forensic_noise: bool,
+        noise_ratio: float,
+        noise_seed: Optional[int] = None,
+        jsteg: bool = False,
+    ):
         self.anti_forensic_noise = anti_forensic_noise
         self.noise_ratio = noise_ratio
+        self.noise_seed = noise_seed
+        self.jsteg = jsteg
 
-    def encode(self, input_path: str, message: str, output_path: str) -> str:
+    def encode(self, input_path: ImageSource, message: str, output_path: ImageTarget) -> StegoResult:
         """
         Zapisuje 'message' w pliku JPEG 'input_path' i zapisuje do 'output_path'.
         Zwraca ścieżkę output_path.
         """
+        return self.encode_bytes(input_path, message.encode("utf-8"), output_path)
+
+    def encode_bytes(self, input_path: ImageSource, payload: bytes, output_path: ImageTarget) -> StegoResult:
+        """
+        Zapisuje surowe bajty 'payload' w pliku JPEG 'input_path'
+        i zapisuje do 'output_path'. Zwraca ścieżkę output_path.
+        """
         # 1. przygotuj payload (nagłówek + dane)
-        data = message.encode("utf-8")
-        length = len(data)
-        header = struct.pack(">I", length)  # 4 bajty big-endian
-        full = header + data
-        bits = self._bytes_to_bits(full)
-
-        # 2. wczytaj JPEG, zbierz pozycje współczynników
-        jpeg = jio.read(input_path)
-        positions = self._collect_positions(jpeg)
-
-        capacity = len(positions)
-        if len(bits) > capacity:
+        data = memoryview(payload).cast("B")
+        header = struct.pack(">I", len(data))  # 4 bajty big-endian
+        needed_bits = self.HEADER_BITS + len(data) * 8
+
+        # 2. wczytaj JPEG, zbuduj indeks współczynników (raz na plik)
+        with source_as_path(input_path, ".jpg") as path:
+            jpeg = jio.read(path)
+        offsets, positions = self._build_index(jpeg)
+
+        capacity = self._index_capacity(offsets, positions)
+        if needed_bits > capacity:
             raise ValueError(
                 f"Wiadomość jest za długa dla tego JPEG-a: "
-                f"potrzebne {len(bits)} bitów, dostępne {capacity}."
+                f"potrzebne {needed_bits} bitów, dostępne {capacity}."
             )
 
-        # 3. osadzanie bitów w LSB współczynników DCT
-        for bit_idx, bit in enumerate(bits):
-            comp_idx, i, j = positions[bit_idx]
-            coeff_arr = jpeg.coef_arrays[comp_idx]
-            coeff = int(coeff_arr[i, j])
-
-            # ustaw LSB na wartość bitu
-            if bit == 0:
-                coeff &= ~1
-            else:
-                coeff |= 1
+        # 3. osadzanie bitów w LSB współczynników DCT (porcjami)
+        self._write_bits(jpeg, offsets, self._bytes_to_bits(header), 0, positions)
+        bit_pos = self.HEADER_BITS
+        for start in range(0, len(data), self.CHUNK_BYTES):
+            bits = self._bytes_to_bits(data[start : start + self.CHUNK_BYTES])
+            self._write_bits(jpeg, offsets, bits, bit_pos, positions)
+            bit_pos += len(bits)
 
-            coeff_arr[i, j] = coeff
         # 4. opcjonalny szum anti-forensic
         if self.anti_forensic_noise:
-            self._apply_anti_forensic_noise(jpeg, positions, used_bits=len(bits))
+            self._apply_anti_forensic_noise(jpeg, offsets, used_bits=needed_bits, positions=positions)
 
         # 5. zapis nowego JPEG
-        jio.write(jpeg, output_path)
-        return output_path
-
-    def decode(self, input_path: str) -> str:
+        if is_path(output_path):
+            jio.write(jpeg, os.fspath(output_path))
+            return output_path
+        with temp_path(".jpg") as path:
+            jio.write(jpeg, path)
+            return deliver_file(path, input_path, output_path)
+
+    def decode(self, input_path: ImageSource) -> str:
         """
         Odczytuje wiadomość z JPEG-a.
         Zakładamy, że obraz był zakodowany powyższą metodą.
         """
-        jpeg = jio.read(input_path)
-        positions = self._collect_positions(jpeg)
+        data_bytes = self.decode_bytes(input_path)
+        try:
+            return data_bytes.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ValueError("Nie udało się zdekodować wiadomości jako UTF-8.")
+
+    def decode_bytes(self, input_path: ImageSource) -> bytes:
+        """
+        Odczytuje surowe bajty ukryte w JPEG-u.
+        """
+        return self.read_range(input_path, 0)
 
-        if len(positions) < self.HEADER_BITS:
-            raise ValueError("Obraz nie zawiera nawet pełnego nagłówka.")
+    def read_range(self, input_path: ImageSource, offset: int, length: Optional[int] = None) -> bytes:
+        """
+        Odczytuje tylko bajty [offset, offset + length) ukrytych danych.
+        Bajt k leży we współczynnikach HEADER_BITS + 8k ... HEADER_BITS + 8k + 7
+        indeksu, więc z pełnego odczytu bierzemy wyłącznie ten wycinek.
+        Strumienia Huffmana nie da się przewinąć, więc szybka ścieżka
+        dekoduje wiersze MCU od początku do końca zakresu.
+        """
+        data = self._decode_prefix(input_path, offset, length)
+        if data is not None:
+            return data
 
-        # 1. odczytaj 32 bity nagłówka (długość w bajtach)
-        header_bits: List[int] = []
-        for idx in range(self.HEADER_BITS):
-            comp_idx, i, j = positions[idx]
-            coeff = int(jpeg.coef_arrays[comp_idx][i, j])
-            header_bits.append(coeff & 1)
+        with source_as_path(input_path, ".jpg") as path:
+            jpeg = jio.read(path)
+        offsets, positions = self._build_index(jpeg)
+        capacity = self._index_capacity(offsets, positions)
 
-        header_bytes = self._bits_to_bytes(header_bits)
-        (msg_len,) = struct.unpack(">I", header_bytes)
+        if capacity < self.HEADER_BITS:
+            raise ValueError("Obraz nie zawiera nawet pełnego nagłówka.")
 
-        # 2. odczytaj msg_len bajtów (msg_len * 8 bitów)
-        data_bits_len = msg_len * 8
-        total_bits_needed = self.HEADER_BITS + data_bits_len
+        # 1. odczytaj 32 bity nagłówka (długość w bajtach)
+        header_bits = self._read_bits(jpeg, offsets, 0, self.HEADER_BITS, positions)
+        (msg_len,) = struct.unpack(">I", self._bits_to_bytes(header_bits))
 
-        if total_bits_needed > len(positions):
+        if self.HEADER_BITS + msg_len * 8 > capacity:
             raise ValueError(
                 "Deklarowana długość wiadomości przekracza pojemność osadzonych bitów."
             )
 
-        data_bits: List[int] = []
-        for idx in range(self.HEADER_BITS, total_bits_needed):
-            comp_idx, i, j = positions[idx]
-            coeff = int(jpeg.coef_arrays[comp_idx][i, j])
-            data_bits.append(coeff & 1)
-
-        data_bytes = self._bits_to_bytes(data_bits)
-        try:
-            return data_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            raise ValueError("Nie udało się zdekodować wiadomości jako UTF-8.")
+        # 2. odczytaj tylko bity żądanego zakresu
+        length = payload_range(msg_len, offset, length)
+        start = self.HEADER_BITS + offset * 8
+        data_bits = self._read_bits(jpeg, offsets, start, length * 8, positions)
+        return self._bits_to_bytes(data_bits)
 
-    def _bytes_to_bits(self, data: bytes) -> list[int]:
-        """Zamiana bajtów na listę bitów (0/1), MSB first."""
-        bits: list[int] = []
-        for b in data:
-            for i in range(7, -1, -1):
-                bits.append((b >> i) & 1)
-        return bits
+    def capacity(self, input_path: ImageSource) -> int:
+        """
+        Pojemność na dane w bitach: liczba współczynników DCT minus nagłówek
+        długości. Liczbę współczynników wyznacza sam znacznik SOF (wymiary
+        i próbkowanie), więc niczego nie dekodujemy. W trybie jsteg liczą się
+        tylko AC różne od 0 i 1 - to zależy od wartości, więc wtedy (i dla
+        nietypowych plików) czytamy współczynniki przez jpegio.
+        """
+        if not self.jsteg:
+            try:
+                header = read_header(input_path, ImageFormat.JPEG)
+                if header.jpeg_shapes is not None:
+                    return max(0, header.jpeg_coefficients - self.HEADER_BITS)
+            except (ValueError, struct.error):
+                pass
+
+        with source_as_path(input_path, ".jpg") as path:
+            jpeg = jio.read(path)
+        return max(0, self._index_capacity(*self._build_index(jpeg)) - self.HEADER_BITS)
+
+    def _decode_prefix(
+        self,
+        input_path: ImageSource,
+        offset: int = 0,
+        length: Optional[int] = None,
+    ) -> Optional[bytes]:
+        """
+        Szybka ścieżka odczytu: najpierw 32 współczynniki nagłówka, potem
+        współczynniki do końca zakresu [offset, offset + length) danych.
+        Dekodujemy tylko początkowe wiersze MCU, więc koszt krótkiego
+        odczytu nie zależy od rozdzielczości.
 
-    def _bits_to_bytes(self, bits: list[int]) -> bytes:
-        """Zamiana listy bitów (0/1) na bajty."""
+        Zwraca None, gdy trzeba użyć pełnego jio.read (np. JPEG progresywny
+        albo zakres sięgający daleko w głąb obrazu).
+        """
+        try:
+            reader = JpegPrefixReader(input_path)
+        except (OSError, TypeError, ValueError):
+            return None
+
+        with reader:
+            if not reader.supported:
+                return None
+            limit = int(reader.component_sizes[0] * self.PREFIX_MAX_FRACTION)
+
+            header = self._prefix_bits(reader, self.HEADER_BITS, limit)
+            if header is None:
+                return None
+            (msg_len,) = struct.unpack(">I", self._bits_to_bytes(header))
+
+            total_bits_needed = self.HEADER_BITS + msg_len * 8
+            if not self.jsteg and total_bits_needed > sum(reader.component_sizes):
+                raise ValueError(
+                    "Deklarowana długość wiadomości przekracza pojemność osadzonych bitów."
+                )
+
+            length = payload_range(msg_len, offset, length)
+            start = self.HEADER_BITS + offset * 8
+            bits = self._prefix_bits(reader, start + length * 8, limit)
+            if bits is None:
+                return None
+            return self._bits_to_bytes(bits[start:])
+
+    def _prefix_bits(self, reader: JpegPrefixReader, n_bits: int, limit: int) -> Optional[np.ndarray]:
+        """
+        Zwraca LSB pierwszych 'n_bits' pozycji indeksu, czytając co najwyżej
+        'limit' współczynników komponentu Y. None, jeśli to nie wystarczy.
+        """
+        if not self.jsteg:
+            if n_bits > limit:
+                return None
+            coefs = reader.read(n_bits)
+            return None if coefs is None else (coefs & 1).astype(np.uint8)
+
+        # w trybie jsteg nie wiemy z góry, ile współczynników trzeba
+        width = reader.component_shapes[0][1]
+        count = min(limit, max(2 * n_bits, width * 8))
+        while True:
+            coefs = reader.read(count)
+            if coefs is None:
+                return None
+            eligible = coefs[self._jsteg_mask(coefs, width)]
+            if len(eligible) >= n_bits:
+                return (eligible[:n_bits] & 1).astype(np.uint8)
+            if count >= limit:
+                return None
+            count = min(limit, 2 * count)
+
+    def _bytes_to_bits(self, data: bytes) -> np.ndarray:
+        """Zamiana bajtów na tablicę bitów (0/1), MSB first."""
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+    def _bits_to_bytes(self, bits: np.ndarray) -> bytes:
+        """Zamiana tablicy bitów (0/1) na bajty."""
         if len(bits) % 8 != 0:
             raise ValueError("Długość strumienia bitów nie jest podzielna przez 8.")
-        out = bytearray()
-        for i in range(0, len(bits), 8):
-            byte = 0
-            for bit in bits[i:i+8]:
-                byte = (byte << 1) | (bit & 1)
-            out.append(byte)
-        return bytes(out)
+        return np.packbits(bits).tobytes()
 
-    def _collect_positions(self, jpeg) -> list[tuple[int, int, int]]:
+    def _collect_positions(self, jpeg) -> np.ndarray:
         """
-        Zwraca listę pozycji współczynników DCT:
-        [(comp_idx, i, j), ...]
+        Zwraca indeks pozycji współczynników DCT jako granice komponentów
+        w płaskiej przestrzeni współczynników:
+        [0, n_Y, n_Y + n_Cb, n_Y + n_Cb + n_Cr]
+
+        Pozycja k należy do komponentu c, gdy offsets[c] <= k < offsets[c+1],
+        i odpowiada elementowi coef_arrays[c].reshape(-1)[k - offsets[c]].
+        To ta sama kolejność (comp_idx, i, j) co dawna lista krotek, ale bez
+        materializowania jednej krotki na współczynnik.
 
         Dla uproszczenia:
-        - używamy wszystkich niezerowych współczynników,
+        - używamy wszystkich współczynników,
         - wszystkich komponentów (Y, Cb, Cr),
         - nie rozróżniamy DC/AC
         """
-        positions: list[tuple[int, int, int]] = []
+        sizes = [arr.size for arr in jpeg.coef_arrays]
+        return np.concatenate(([0], np.cumsum(sizes, dtype=np.int64)))
+
+    def _jsteg_mask(self, coefs: np.ndarray, width: int) -> np.ndarray:
+        """
+        Maska współczynników używanych w trybie jsteg dla płaskiego wycinka
+        komponentu o szerokości 'width': AC o wartości różnej od 0 i 1.
+        """
+        idx = np.arange(len(coefs))
+        is_dc = ((idx // width) % 8 == 0) & ((idx % width) % 8 == 0)
+        return (coefs != 0) & (coefs != 1) & ~is_dc
 
+    def _collect_jsteg_positions(self, jpeg, offsets: np.ndarray) -> np.ndarray:
+        """
+        Zwraca posortowane pozycje (w płaskiej przestrzeni współczynników)
+        używane w trybie jsteg. Liczone raz na plik i używane do sprawdzenia
+        pojemności, osadzania i szumu.
+        """
+        parts = []
         for comp_idx, arr in enumerate(jpeg.coef_arrays):
-            # arr jest np. typu np.ndarray[int16]
-            h, w = arr.shape
-            for i in range(h):
-                for j in range(w):
-                    positions.append((comp_idx, i, j))
+            mask = (arr != 0) & (arr != 1)
+            mask[::8, ::8] = False  # współczynniki DC
+            parts.append(np.flatnonzero(mask) + offsets[comp_idx])
+        return np.concatenate(parts)
 
-        return positions
+    def _build_index(self, jpeg) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Zwraca (granice komponentów, pozycje jsteg albo None).
+        None oznacza, że używamy wszystkich współczynników po kolei.
+        """
+        offsets = self._collect_positions(jpeg)
+        positions = self._collect_jsteg_positions(jpeg, offsets) if self.jsteg else None
+        return offsets, positions
+
+    def _index_capacity(self, offsets: np.ndarray, positions: Optional[np.ndarray]) -> int:
+        return int(offsets[-1]) if positions is None else len(positions)
+
+    def _flat_coefs(self, arr: np.ndarray) -> np.ndarray:
+        """Płaski widok (bez kopii) na tablicę współczynników komponentu."""
+        flat = arr.view()
+        flat.shape = (-1,)  # rzuca wyjątek zamiast po cichu kopiować
+        return flat
+
+    def _coef_ranges(
+        self,
+        jpeg,
+        offsets: np.ndarray,
+        start: int,
+        stop: int,
+        positions: Optional[np.ndarray] = None,
+    ):
+        """
+        Rozbija pozycje indeksu [start, stop) na kawałki w komponentach.
+        Zwraca krotki (płaski widok, wycinek albo tablica indeksów w komponencie,
+        początek i koniec w zakresie).
+        """
+        if positions is None:
+            for comp_idx, arr in enumerate(jpeg.coef_arrays):
+                lo, hi = int(offsets[comp_idx]), int(offsets[comp_idx + 1])
+                a, b = max(start, lo), min(stop, hi)
+                if a < b:
+                    yield self._flat_coefs(arr), slice(a - lo, b - lo), a - start, b - start
+            return
+
+        selected = positions[start:stop]
+        bounds = np.searchsorted(selected, offsets)
+        for comp_idx, arr in enumerate(jpeg.coef_arrays):
+            a, b = int(bounds[comp_idx]), int(bounds[comp_idx + 1])
+            if a < b:
+                yield self._flat_coefs(arr), selected[a:b] - offsets[comp_idx], a, b
+
+    def _write_bits(
+        self,
+        jpeg,
+        offsets: np.ndarray,
+        bits: np.ndarray,
+        start: int,
+        positions: Optional[np.ndarray] = None,
+    ) -> None:
+        """Ustawia LSB współczynników od pozycji 'start' na wartości 'bits'."""
+        for flat, sel, a, b in self._coef_ranges(jpeg, offsets, start, start + len(bits), positions):
+            flat[sel] = (flat[sel] & ~1) | bits[a:b]
+
+    def _read_bits(
+        self,
+        jpeg,
+        offsets: np.ndarray,
+        start: int,
+        count: int,
+        positions: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Zwraca LSB 'count' współczynników od pozycji 'start' (tablica 0/1)."""
+        out = np.empty(count, dtype=np.uint8)
+        for flat, sel, a, b in self._coef_ranges(jpeg, offsets, start, start + count, positions):
+            out[a:b] = flat[sel] & 1
+        return out
 
     def _apply_anti_forensic_noise(
             self,
             jpeg,
-            positions: list[tuple[int, int, int]],
+            offsets: np.ndarray,
             used_bits: int,
+            positions: Optional[np.ndarray] = None,
         ) -> None:
             """
             Dodaje lekki szum do nieużywanych współczynników DCT,
-            nie ruszając tych, które zmodyfikowaliśmy
-            """
-            import random
-
-            free_positions = positions[used_bits:]
-            if not free_positions:
-                return
-
-            n_to_modify = int(len(free_positions) * self.noise_ratio)
-            if n_to_modify <= 0:
-                return
+            nie ruszając tych, które zmodyfikowaliśmy.
 
-            for comp_idx, i, j in random.sample(free_positions, n_to_modify):
-                coeff_arr = jpeg.coef_arrays[comp_idx]
-                coeff = int(coeff_arr[i, j])
-
-                # Minimalna zmiana: losowy LSB
-                bit = 1 if random.random() < 0.5 else 0
-                coeff = (coeff & ~1) | bit
-
-                coeff_arr[i, j] = coeff
\ No newline at end of file
+            Każdy wolny współczynnik dostaje losowy LSB z prawdopodobieństwem
+            noise_ratio, czyli zmienia się z p = noise_ratio / 2. Pozycje
+            losujemy porcjami wprost z przestrzeni indeksu za payloadem
+            i odwracamy ich LSB operacjami na tablicach.
+            """
+            capacity = self._index_capacity(offsets, positions)
+            rng = np.random.default_rng(self.noise_seed)
+
+            for noisy in bernoulli_positions(capacity - used_bits, self.noise_ratio / 2, rng):
+                noisy += used_bits
+                if positions is not None:
+                    noisy = positions[noisy]
+                # podział posortowanych pozycji na komponenty
+                bounds = np.searchsorted(noisy, offsets)
+                for comp_idx, arr in enumerate(jpeg.coef_arrays):
+                    a, b = bounds[comp_idx], bounds[comp_idx + 1]
+                    if a < b:
+                        flat = self._flat_coefs(arr)
+                        flat[noisy[a:b] - offsets[comp_idx]] ^= 1
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+from imagesteganography.utilities.image_header import jpeg_component_shapes
+from imagesteganography.utilities.image_io import ImageSource, open_stream
+
+# pozycja w kolejności zig-zag -> indeks w bloku 8x8 (wiersz * 8 + kolumna)
+ZIGZAG = (
+    0, 1, 8, 16, 9, 2, 3, 10,
+    17, 24, 32, 25, 18, 11, 4, 5,
+    12, 19, 26, 33, 40, 48, 41, 34,
+    27, 20, 13, 6, 7, 14, 21, 28,
+    35, 42, 49, 56, 57, 50, 43, 36,
+    29, 22, 15, 23, 30, 37, 44, 51,
+    58, 59, 52, 45, 38, 31, 39, 46,
+    53, 60, 61, 54, 47, 55, 62, 63,
+)
+
+SOF_BASELINE = (0xC0, 0xC1)  # sekwencyjny Huffman (8/12 bit)
+SOF_OTHER = (0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+READ_CHUNK = 1 << 16
+
+
+class JpegPrefixReader:
+    """
+    Czyta współczynniki DCT pierwszego komponentu (Y) od początku pliku,
+    dekodując tylko tyle wierszy MCU, ile potrzeba.
+
+    Układ wyniku jest taki sam jak w jpegio: komponent to tablica
+    (wysokość_w_blokach * 8, szerokość_w_blokach * 8), blok 8x8 w naturalnej
+    kolejności, a pozycje liczymy po spłaszczeniu wierszami.
+
+    Obsługujemy tylko sekwencyjny JPEG z kodowaniem Huffmana, w którym
+    pierwszy skan zawiera komponent 0. Dla innych plików (progresywny,
+    arytmetyczny, ...) 'supported' jest False i trzeba użyć jpegio.
+    """
+
+    def __init__(self, source: ImageSource):
+        self.supported = False
+        self.components: list[dict] = []
+        self.component_shapes: list[tuple[int, int]] = []
+
+        self._dc_tables: dict[int, list[int]] = {}
+        self._ac_tables: dict[int, list[int]] = {}
+        self._restart_interval = 0
+
+        # strumienie podane z zewnątrz zostawiamy otwarte, w pozycji początkowej
+        self._owns_file = not hasattr(source, "read")
+        self._file: Optional[BinaryIO] = open_stream(source)
+        self._origin = self._file.tell()
+        try:
+            self._parse_headers(self._file)
+        except Exception:
+            self.close()
+            raise
+
+    # --- nagłówki ---
+
+    def _parse_headers(self, f: BinaryIO) -> None:
+        if f.read(2) != b"\xff\xd8":
+            raise ValueError("To nie jest plik JPEG (brak znacznika SOI).")
+
+        baseline = False
+        while True:
+            marker = self._next_marker(f)
+            if marker is None or marker == 0xD9:
+                return
+
+            length_bytes = f.read(2)
+            if len(length_bytes) < 2:
+                return
+            length = int.from_bytes(length_bytes, "big") - 2
+            segment = f.read(length)
+
+            if marker in SOF_BASELINE:
+                self._parse_sof(segment)
+                baseline = True
+            elif marker in SOF_OTHER:
+                self._parse_sof(segment)
+                return
+            elif marker == 0xC4:
+                self._parse_dht(segment)
+            elif marker == 0xDD:
+                self._restart_interval = int.from_bytes(segment[:2], "big")
+            elif marker == 0xDA:
+                if baseline:
+                    self._parse_sos(segment, f.tell())
+                return
+
+    @staticmethod
+    def _next_marker(f: BinaryIO) -> Optional[int]:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        return byte[0] if byte else None
+
+    def _parse_sof(self, segment: bytes) -> None:
+        self.height = int.from_bytes(segment[1:3], "big")
+        self.width = int.from_bytes(segment[3:5], "big")
+        n_comp = segment[5]
+
+        for c in range(n_comp):
+            cid, sampling, _ = segment[6 + 3 * c : 9 + 3 * c]
+            self.components.append({"id": cid, "h": sampling >> 4, "v": sampling & 15})
+
+        samplings = [(comp["h"], comp["v"]) for comp in self.components]
+        self.component_shapes = jpeg_component_shapes(self.width, self.height, samplings)
+        self._h_max = max(h for h, _ in samplings)
+        self._v_max = max(v for _, v in samplings)
+
+    def _parse_dht(self, segment: bytes) -> None:
+        pos = 0
+        while pos < len(segment):
+            table_class, table_id = segment[pos] >> 4, segment[pos] & 15
+            counts = segment[pos + 1 : pos + 17]
+            pos += 17
+            symbols = segment[pos : pos + sum(counts)]
+            pos += sum(counts)
+
+            lut = self._build_lut(counts, symbols)
+            if table_class == 0:
+                self._dc_tables[table_id] = lut
+            else:
+                self._ac_tables[table_id] = lut
+
+    @staticmethod
+    def _build_lut(counts: bytes, symbols: bytes) -> list[int]:
+        """
+        Tablica 2^16 wpisów: 16 kolejnych bitów -> (długość << 8) | symbol.
+        Wpis 0 oznacza nieprawidłowy kod.
+        """
+        lut = [0] * (1 << 16)
+        code = 0
+        k = 0
+        for length in range(1, 17):
+            for _ in range(counts[length - 1]):
+                shift = 16 - length
+                lut[code << shift : (code + 1) << shift] = [(length << 8) | symbols[k]] * (1 << shift)
+                code += 1
+                k += 1
+            code <<= 1
+        return lut
+
+    def _parse_sos(self, segment: bytes, data_offset: int) -> None:
+        n_scan = segment[0]
+        scan = []
+        for s in range(n_scan):
+            cid, tables = segment[1 + 2 * s : 3 + 2 * s]
+            comp_idx = next((i for i, comp in enumerate(self.components) if comp["id"] == cid), None)
+            if comp_idx is None:
+                return
+            scan.append((comp_idx, self._dc_tables.get(tables >> 4), self._ac_tables.get(tables & 15)))
+
+        ss, se, approx = segment[1 + 2 * n_scan : 4 + 2 * n_scan]
+        if ss != 0 or se != 63 or approx != 0 or scan[0][0] != 0:
+            return
+        if any(dc is None or ac is None for _, dc, ac in scan):
+            return
+
+        self._scan = scan
+        self._data_offset = data_offset
+        self._init_layout()
+        self.supported = True
+
+    def _init_layout(self) -> None:
+        """
+        Lista bloków jednego MCU: (indeks w skanie, wiersz, kolumna)
+        oraz liczba MCU w wierszu.
+        """
+        comp0 = self.components[0]
+        rows0, cols0 = self.component_shapes[0]
+        self._wib0 = cols0 // 8
+        self._hib0 = rows0 // 8
+
+        if len(self._scan) == 1:
+            # skan nieprzeplatany: MCU = jeden blok
+            self._mcu_blocks = [(0, 0, 0)]
+            self._mcu_cols = self._wib0
+            self._mcu_h0, self._mcu_v0 = 1, 1
+        else:
+            self._mcu_blocks = [
+                (s, v, h)
+                for s, (comp_idx, _, _) in enumerate(self._scan)
+                for v in range(self.components[comp_idx]["v"])
+                for h in range(self.components[comp_idx]["h"])
+            ]
+            self._mcu_cols = -(-self.width // (self._h_max * 8))
+            self._mcu_h0, self._mcu_v0 = comp0["h"], comp0["v"]
+
+        self._rows: list[np.ndarray] = []
+        self._block_rows_done = 0
+        self._preds = [0] * len(self._scan)
+        self._mcus_done = 0
+
+        self._started = False
+        self._buf = b""
+        self._pos = 0
+        self._acc = 0
+        self._nbits = 0
+        self._marker: Optional[int] = None
+
+    # --- pojemność ---
+
+    @property
+    def component_sizes(self) -> list[int]:
+        return [h * w for h, w in self.component_shapes]
+
+    # --- odczyt ---
+
+    def read(self, count: int) -> Optional[np.ndarray]:
+        """
+        Zwraca pierwsze 'count' współczynników komponentu 0 (płasko, int32)
+        albo None, jeśli nie da się ich odczytać bez pełnego dekodowania.
+        """
+        if not self.supported or count > self.component_sizes[0]:
+            return None
+        if count <= 0:
+            return np.zeros(0, dtype=np.int32)
+
+        row_len = self._wib0 * 8
+        block_rows_needed = (count - 1) // row_len // 8 + 1
+
+        if self._file is None:
+            return None
+        if not self._started:
+            self._file.seek(self._data_offset)
+            self._started = True
+
+        try:
+            while self._block_rows_done < block_rows_needed:
+                self._decode_mcu_row()
+        except (IndexError, ValueError):
+            # uszkodzony strumień albo coś, czego nie obsługujemy
+            self.supported = False
+            return None
+
+        return np.concatenate(self._rows).reshape(-1)[:count]
+
+    def close(self) -> None:
+        if self._file is not None:
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.seek(self._origin)
+            self._file = None
+
+    def __enter__(self) -> "JpegPrefixReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _decode_mcu_row(self) -> None:
+        v0, h0 = self._mcu_v0, self._mcu_h0
+        row_blocks = self._mcu_cols * h0
+        values = [0] * (v0 * row_blocks * 64)
+
+        for mcu_col in range(self._mcu_cols):
+            if self._restart_interval and self._mcus_done and self._mcus_done % self._restart_interval == 0:
+                self._restart()
+
+            for s, v, h in self._mcu_blocks:
+                coefs = self._decode_block(s)
+                if s == 0:
+                    base = (v * row_blocks + mcu_col * h0 + h) * 64
+                    for k, value in coefs:
+                        values[base + k] = value
+            self._mcus_done += 1
+
+        # (v0, kolumny bloków, 8, 8) -> wiersze współczynników w układzie jpegio
+        blocks = np.array(values, dtype=np.int32).reshape(v0, row_blocks, 64)
+        blocks = blocks[:, : self._wib0].reshape(v0, self._wib0, 8, 8)
+        rows = blocks.transpose(0, 2, 1, 3).reshape(v0 * 8, self._wib0 * 8)
+
+        keep = min(v0, self._hib0 - self._block_rows_done)
+        self._rows.append(rows[: keep * 8])
+        self._block_rows_done += keep
+
+    def _decode_block(self, s: int) -> list[tuple[int, int]]:
+        """Dekoduje jeden blok; zwraca niezerowe (indeks naturalny, wartość)."""
+        _, dc_table, ac_table = self._scan[s]
+        out = []
+
+        size = self._decode_huffman(dc_table)
+        diff = self._receive_extend(size) if size else 0
+        self._preds[s] += diff
+        if self._preds[s]:
+            out.append((0, self._preds[s]))
+
+        k = 1
+        while k < 64:
+            rs = self._decode_huffman(ac_table)
+            run, size = rs >> 4, rs & 15
+            if size == 0:
+                if run != 15:
+                    break  # EOB
+                k += 16
+                continue
+            k += run
+            out.append((ZIGZAG[k], self._receive_extend(size)))
+            k += 1
+        return out
+
+    # --- strumień bitów ---
+
+    def _fill(self) -> None:
+        """Dokłada jeden bajt danych (po usunięciu byte stuffingu) do akumulatora."""
+        byte = 0
+        if self._marker is None:
+            if self._pos + 2 > len(self._buf):
+                self._buf = self._buf[self._pos :] + self._file.read(READ_CHUNK)
+                self._pos = 0
+            if self._pos < len(self._buf):
+                byte = self._buf[self._pos]
+                if byte == 0xFF:
+                    nxt = self._buf[self._pos + 1] if self._pos + 1 < len(self._buf) else 0xD9
+                    if nxt == 0:
+                        self._pos += 2
+                    else:
+                        # znacznik - za nim dokładamy same zera (jak libjpeg)
+                        self._marker = nxt
+                        byte = 0
+                else:
+                    self._pos += 1
+            else:
+                self._marker = 0xD9
+        self._acc = ((self._acc << 8) | byte) & 0xFFFFFFFF
+        self._nbits += 8
+
+    def _decode_huffman(self, lut: list[int]) -> int:
+        while self._nbits < 16:
+            self._fill()
+        entry = lut[(self._acc >> (self._nbits - 16)) & 0xFFFF]
+        if not entry:
+            raise ValueError("Nieprawidłowy kod Huffmana.")
+        self._nbits -= entry >> 8
+        return entry & 0xFF
+
+    def _receive_extend(self, size: int) -> int:
+        while self._nbits < size:
+            self._fill()
+        self._nbits -= size
+        value = (self._acc >> self._nbits) & ((1 << size) - 1)
+        if value < (1 << (size - 1)):
+            value -= (1 << size) - 1
+        return value
+
+    def _restart(self) -> None:
+        """Obsługa znacznika RSTn: zerujemy bufor bitów i predyktory DC."""
+        self._acc = 0
+        self._nbits = 0
+        if self._marker is None:
+            # znacznik nie został jeszcze napotkany - szukamy go w strumieniu
+            while self._marker is None:
+                self._fill()
+            self._acc = 0
+            self._nbits = 0
+        if not 0xD0 <= self._marker <= 0xD7:
+            raise ValueError("Brak oczekiwanego znacznika RST.")
+        self._pos += 2
+        self._marker = None
+        self._preds = [0] * len(self._scan)
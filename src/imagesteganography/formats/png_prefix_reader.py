@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import io
+import struct
+import zlib
+from typing import BinaryIO, Optional
+
+from PIL import Image
+
+from imagesteganography.utilities.image_io import ImageSource, open_stream
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# kanały na piksel dla typów koloru PNG
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# chunki potrzebne do poprawnego odczytu pikseli (paleta, przezroczystość)
+KEEP_CHUNKS = (b"PLTE", b"tRNS")
+READ_CHUNK = 1 << 14
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+class PngPrefixReader:
+    """
+    Czyta początkowe wiersze PNG bez rozpakowywania całego obrazu.
+
+    Dane IDAT rozpakowujemy przyrostowo (zlib.decompressobj z limitem
+    wyjścia), tylko do końca ostatniego potrzebnego wiersza. Filtrów
+    (Paeth, Average) nie cofamy w Pythonie - bajt po bajcie byłoby to
+    wolniejsze niż całe dekodowanie - tylko składamy z tych wierszy mały
+    PNG o mniejszej wysokości i dekodujemy go Pillowem. Wynik (tryb,
+    paleta, konwersje) jest więc identyczny jak przy pełnym odczycie.
+
+    Obrazy z przeplotem (Adam7) mają wiersze rozrzucone po całym
+    strumieniu - wtedy 'supported' jest False i trzeba użyć Pillowa.
+    """
+
+    # powyżej tej części obrazu składanie prefiksu jest wolniejsze niż
+    # zwykłe dekodowanie całego pliku przez Pillowa
+    PREFIX_MAX_FRACTION = 1 / 2
+
+    def __init__(self, source: ImageSource):
+        self.supported = False
+        self._chunks: list[bytes] = []
+        self._raw = bytearray()  # rozpakowane (jeszcze filtrowane) wiersze
+        self._pending = b""  # skompresowane dane, których zlib jeszcze nie przyjął
+        self._inflate = zlib.decompressobj()
+        self._in_idat = False
+        self._full: Optional[Image.Image] = None
+
+        # strumienie podane z zewnątrz zostawiamy otwarte, w pozycji początkowej
+        self._owns_file = not hasattr(source, "read")
+        self._file: Optional[BinaryIO] = open_stream(source)
+        self._origin = self._file.tell()
+        try:
+            self._parse_headers(self._file)
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_headers(self, f: BinaryIO) -> None:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("To nie jest plik PNG.")
+        length, kind = struct.unpack(">I4s", f.read(8))
+        if kind != b"IHDR":
+            raise ValueError("Brak chunku IHDR na początku pliku PNG.")
+        self._ihdr = f.read(length)
+        f.read(4)  # CRC
+        width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", self._ihdr)
+        self.size = (width, height)
+        self.mode_info = (depth, color)
+        if color not in CHANNELS:
+            raise ValueError("Nieznany typ koloru PNG.")
+        self._row_bytes = 1 + -(-width * CHANNELS[color] * depth // 8)  # bajt filtra + dane
+
+        # chunki do pierwszego IDAT; PLTE i tRNS zachowujemy
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("Plik PNG bez danych obrazu.")
+            length, kind = struct.unpack(">I4s", header)
+            if kind == b"IDAT":
+                self._idat_left = length
+                self._in_idat = True
+                break
+            data = f.read(length)
+            f.read(4)
+            if kind in KEEP_CHUNKS:
+                self._chunks.append(_chunk(kind, data))
+            elif kind == b"IEND":
+                raise ValueError("Plik PNG bez danych obrazu.")
+        self.supported = interlace == 0
+
+    def _next_data(self) -> Optional[bytes]:
+        """Kolejny kawałek skompresowanych danych z (być może kilku) chunków IDAT."""
+        f = self._file
+        while self._in_idat and self._idat_left == 0:
+            f.read(4)  # CRC poprzedniego chunku
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            self._idat_left, kind = struct.unpack(">I4s", header)
+            self._in_idat = kind == b"IDAT"
+        if not self._in_idat:
+            return None
+        data = f.read(min(self._idat_left, READ_CHUNK))
+        if not data:
+            return None
+        self._idat_left -= len(data)
+        return data
+
+    def _inflate_to(self, n_bytes: int) -> None:
+        while len(self._raw) < n_bytes:
+            data = self._pending or self._next_data()
+            if data is None or self._inflate.eof:
+                raise ValueError("Dane PNG kończą się przed ostatnim wierszem.")
+            try:
+                self._raw += self._inflate.decompress(data, n_bytes - len(self._raw))
+            except zlib.error as e:
+                raise ValueError(f"Uszkodzone dane PNG: {e}")
+            self._pending = self._inflate.unconsumed_tail
+
+    def image(self, rows: int) -> Image.Image:
+        """
+        Obraz Pillow (w trybie oryginału) z co najmniej pierwszymi 'rows'
+        wierszami; dla dużej części obrazu - cały plik.
+        """
+        if not self.supported or self._file is None:
+            raise ValueError("Ten PNG trzeba odczytać w całości.")
+        if self._full is None and rows > self.size[1] * self.PREFIX_MAX_FRACTION:
+            self._file.seek(self._origin)
+            self._full = Image.open(self._file)
+        if self._full is not None:
+            return self._full
+        rows = max(1, min(rows, self.size[1]))
+        self._inflate_to(rows * self._row_bytes)
+        ihdr = bytearray(self._ihdr)
+        struct.pack_into(">I", ihdr, 4, rows)
+        data = zlib.compress(memoryview(self._raw)[: rows * self._row_bytes], 0)
+        png = b"".join(
+            (PNG_SIGNATURE, _chunk(b"IHDR", bytes(ihdr)), *self._chunks, _chunk(b"IDAT", data), _chunk(b"IEND", b""))
+        )
+        return Image.open(io.BytesIO(png))
+
+    def close(self) -> None:
+        if self._file is not None:
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.seek(self._origin)
+            self._file = None
+
+    def __enter__(self) -> "PngPrefixReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COLOR_TYPES = {3: 2, 4: 6}  # kanały -> typ koloru PNG (RGB, RGBA)
+WINDOW = 1 << 15  # okno deflate: tyle poprzednich danych dostaje segment jako słownik
+ADLER_BASE = 65521
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def _adler32_combine(adler1: int, adler2: int, len2: int) -> int:
+    """Suma Adler-32 sklejenia dwóch ciągów (jak adler32_combine z zlib)."""
+    rem = len2 % ADLER_BASE
+    sum1 = adler1 & 0xFFFF
+    sum2 = (rem * sum1) % ADLER_BASE
+    sum1 += (adler2 & 0xFFFF) + ADLER_BASE - 1
+    sum2 += (adler1 >> 16) + (adler2 >> 16) + ADLER_BASE - rem
+    sum1 %= ADLER_BASE
+    sum2 %= ADLER_BASE
+    return sum1 | (sum2 << 16)
+
+
+def filter_rows(rows: np.ndarray, prev: np.ndarray, bpp: int, filter_type: Optional[int] = None) -> np.ndarray:
+    """
+    Filtruje wiersze (n, stride) PNG. Bez 'filter_type' wybiera dla
+    każdego wiersza filtr o najmniejszej sumie |bajt ze znakiem|
+    (heurystyka libpng); z 'filter_type' (0-4) używa jednego filtra.
+    'prev' to wiersz nad pierwszym (zera dla początku obrazu). Zwraca
+    (n, 1 + stride) z bajtem typu filtra na początku wiersza.
+
+    Filtrowanie korzysta tylko z surowych bajtów, więc liczymy je
+    wektorowo dla całego bloku wierszy (w przeciwieństwie do cofania).
+    """
+    n, stride = rows.shape
+    up = np.empty_like(rows)
+    up[0] = prev
+    up[1:] = rows[:-1]
+    left = np.zeros_like(rows)
+    left[:, bpp:] = rows[:, :-bpp]
+
+    predictors = {
+        1: lambda: left,
+        2: lambda: up,
+        3: lambda: ((left.astype(np.int16) + up) >> 1).astype(np.uint8),
+        4: lambda: _paeth(left, up, bpp),
+    }
+    out = np.empty((n, 1 + stride), dtype=np.uint8)
+    if filter_type is not None:
+        out[:, 0] = filter_type
+        out[:, 1:] = rows - predictors[filter_type]() if filter_type else rows
+        return out
+
+    out[:, 0] = 0
+    out[:, 1:] = rows
+    best = _filter_score(rows)
+    for kind, predictor in predictors.items():
+        candidate = rows - predictor()  # różnice modulo 256
+        score = _filter_score(candidate)
+        better = score < best
+        if better.any():
+            best[better] = score[better]
+            out[better, 0] = kind
+            out[better, 1:] = candidate[better]
+    return out
+
+
+def _paeth(left: np.ndarray, up: np.ndarray, bpp: int) -> np.ndarray:
+    """Predyktor Paeth: z a (lewy), b (górny), c (lewy górny) ten najbliższy a + b - c."""
+    upleft = np.zeros_like(up)
+    upleft[:, bpp:] = up[:, :-bpp]
+    a, b, c = left.astype(np.int16), up.astype(np.int16), upleft.astype(np.int16)
+    pa = np.abs(b - c)
+    pb = np.abs(a - c)
+    pc = np.abs(a + b - 2 * c)
+    return np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+
+
+def _filter_score(filtered: np.ndarray) -> np.ndarray:
+    """Suma |bajt ze znakiem| w wierszach: min(x, 256 - x) bez wyjścia poza uint8."""
+    return np.minimum(filtered, 0 - filtered).sum(axis=1, dtype=np.int64)
+
+
+class ParallelPngWriter:
+    """
+    Zapis PNG z kompresją w kilku wątkach (jak pigz).
+
+    Wiersze dzielimy na segmenty; każdy wątek filtruje swój segment
+    i kompresuje go niezależnym strumieniem deflate zakończonym
+    Z_SYNC_FLUSH (ostatni - Z_FINISH), ze słownikiem z ostatnich 32 KiB
+    danych poprzedniego segmentu (liczonych w tym samym wątku, bez
+    czekania na sąsiada). Sklejone segmenty z nagłówkiem zlib i sumą
+    Adler-32 (łączoną z sum segmentów) dają jeden zwykły strumień zlib,
+    czytelny dla każdego dekodera PNG. zlib i NumPy zwalniają GIL, więc
+    wątki wystarczą.
+
+    'filter_type' (0-4) wymusza jeden filtr zamiast wyboru per wiersz,
+    'strategy' to strategia zlib (Z_FILTERED, Z_RLE, ...).
+    """
+
+    SEGMENT_BYTES = 1 << 20  # surowe bajty na segment
+
+    def __init__(
+        self,
+        threads: int,
+        level: int = 6,
+        filter_type: Optional[int] = None,
+        strategy: int = zlib.Z_DEFAULT_STRATEGY,
+    ):
+        if threads < 1:
+            raise ValueError("Liczba wątków zapisu PNG musi być dodatnia.")
+        self.threads = threads
+        self.level = level
+        self.filter_type = filter_type
+        self.strategy = strategy
+
+    def write(self, arr: np.ndarray, target: Union[str, BinaryIO]) -> None:
+        """Zapisuje tablicę (h, w, 3|4) uint8 jako PNG do ścieżki albo obiektu plikowego."""
+        if hasattr(target, "write"):
+            self._write(arr, target)
+        else:
+            with open(target, "wb") as f:
+                self._write(arr, f)
+
+    def _write(self, arr: np.ndarray, f: BinaryIO) -> None:
+        if arr.dtype != np.uint8 or arr.ndim != 3 or arr.shape[2] not in COLOR_TYPES:
+            raise ValueError("Zapis PNG obsługuje tylko tablice uint8 RGB/RGBA.")
+        h, w, channels = arr.shape
+        rows = np.ascontiguousarray(arr).reshape(h, w * channels)
+
+        f.write(PNG_SIGNATURE)
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, COLOR_TYPES[channels], 0, 0, 0)))
+
+        per_segment = max(1, self.SEGMENT_BYTES // (w * channels + 1))
+        bounds = [(a, min(a + per_segment, h)) for a in range(0, h, per_segment)]
+
+        adler = 1
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            results = pool.map(lambda b: self._segment(rows, channels, *b), bounds)
+            for i, (data, seg_adler, seg_len) in enumerate(results):
+                adler = _adler32_combine(adler, seg_adler, seg_len)
+                if i == 0:
+                    data = _zlib_header(self.level) + data
+                if i == len(bounds) - 1:
+                    data += struct.pack(">I", adler)
+                f.write(_chunk(b"IDAT", data))
+        f.write(_chunk(b"IEND", b""))
+
+    def _segment(self, rows: np.ndarray, bpp: int, first: int, end: int) -> tuple[bytes, int, int]:
+        """Filtruje i kompresuje wiersze [first, end); zwraca dane, Adler-32 i długość."""
+        row_bytes = rows.shape[1] + 1
+        # wiersze poprzedniego segmentu potrzebne na słownik
+        start = max(0, first - -(-WINDOW // row_bytes))
+        prev = rows[start - 1] if start > 0 else np.zeros(rows.shape[1], dtype=np.uint8)
+        filtered = filter_rows(rows[start:end], prev, bpp, self.filter_type).reshape(-1)
+
+        split = (first - start) * row_bytes
+        head, data = filtered[:split], filtered[split:]
+        options = (self.level, zlib.DEFLATED, -15, 8, self.strategy)
+        if len(head):
+            comp = zlib.compressobj(*options, zdict=head[-WINDOW:].tobytes())
+        else:
+            comp = zlib.compressobj(*options)
+        last = end == rows.shape[0]
+        out = comp.compress(data) + comp.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+        return out, zlib.adler32(data), len(data)
+
+
+def _zlib_header(level: int) -> bytes:
+    """Nagłówek zlib (CMF, FLG) dla okna 32 KiB i danego poziomu."""
+    flevel = 0 if level in (0, 1) else 1 if level < 6 else 2 if level == 6 or level == -1 else 3
+    cmf = 0x78
+    flg = flevel << 6
+    flg += (31 - (cmf * 256 + flg) % 31) % 31
+    return bytes((cmf, flg))
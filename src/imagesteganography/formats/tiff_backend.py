@@ -1,17 +1,223 @@
-from imagesteganography.core.ImageStegoBackend import ImageStegoBackend
+import os
+import shutil
+import struct
+import zlib
+from typing import Iterator, Optional
+
+import numpy as np
+from PIL.TiffImagePlugin import PREDICTOR
+
+from imagesteganography.core.ImageStegoBackend import ImageStegoBackend, payload_range
 from imagesteganography.core.LsbMixin import LsbMixin
+from imagesteganography.formats.tiff_stream import StreamedTiff
+from imagesteganography.utilities.image_io import ImageSource, ImageTarget, StegoResult, is_path
+from imagesteganography.utilities.noise import bernoulli_positions
+from imagesteganography.utilities.size_optimizer import OptimizeResult, optimize_file
+
+# błędy, przy których wracamy do ścieżki przez Pillowa
+STREAM_ERRORS = (OSError, ValueError, struct.error, zlib.error)
+
+
+def _tiff_strategy(compression: Optional[str], predictor: bool = False):
+    extra = {"tiffinfo": {PREDICTOR: 2}} if predictor else {}
+    return lambda img, pixels, target: img.save(target, format="TIFF", compression=compression, **extra)
+
+
+# kandydaci optimize_output; Deflate (z predyktorem lub bez) i bez kompresji
+# zostawiają plik w ścieżce strumieniowej, LZW i PackBits czyta już Pillow
+OPTIMIZE_STRATEGIES = {
+    "raw": _tiff_strategy(None),
+    "deflate": _tiff_strategy("tiff_adobe_deflate"),
+    "deflate-predictor": _tiff_strategy("tiff_adobe_deflate", predictor=True),
+    "lzw": _tiff_strategy("tiff_lzw"),
+    "lzw-predictor": _tiff_strategy("tiff_lzw", predictor=True),
+    "packbits": _tiff_strategy("packbits"),
+}
+
+
+class _PositionQueue:
+    """Rosnące pozycje z bernoulli_positions odbierane kolejnymi zakresami."""
+
+    def __init__(self, batches: Iterator[np.ndarray]):
+        self._batches = batches
+        self._pending = np.empty(0, dtype=np.int64)
+
+    def take_below(self, limit: int) -> np.ndarray:
+        parts = []
+        while True:
+            if len(self._pending) == 0:
+                batch = next(self._batches, None)
+                if batch is None:
+                    break
+                self._pending = batch
+            cut = int(np.searchsorted(self._pending, limit))
+            parts.append(self._pending[:cut])
+            self._pending = self._pending[cut:]
+            if len(self._pending):
+                break
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
 
 
 class TiffStegoBackend(ImageStegoBackend, LsbMixin):
-    def __init__(self, anti_forensic_noise: bool, noise_ratio: float):
+    """
+    LSB w TIFF. Pliki 8-bitowe RGB/RGBA bez kompresji albo z Deflate
+    (ścieżka na wejściu i wyjściu) przetwarzamy strumieniowo przez
+    StreamedTiff: pasmo po paśmie (kilka pasów albo rząd kafli), w tej
+    samej kolejności bitów co LsbMixin. Bez szumu przepisujemy tylko pasma
+    z danymi, a odczyt kończy się na paśmie z ostatnim potrzebnym bitem.
+    Pamięć zależy od rozmiaru pasma, nie obrazu, i nie dotyczą nas limity
+    Pillowa dla bardzo dużych obrazów. Inne warianty idą przez Pillowa.
+    """
+
+    def __init__(self, anti_forensic_noise: bool, noise_ratio: float, noise_seed: Optional[int] = None):
         self.anti_forensic_noise = anti_forensic_noise
         self.noise_ratio = noise_ratio
+        self.noise_seed = noise_seed
 
-    def encode(self, input_path: str, message: str, output_path: str) -> str:
-        return self._encode_lsb(input_path, message, output_path, 
-                                fmt="TIFF", 
+    def encode(self, input_path: ImageSource, message: str, output_path: ImageTarget) -> StegoResult:
+        return self.encode_bytes(input_path, message.encode("utf-8"), output_path)
+
+    def encode_bytes(self, input_path: ImageSource, payload: bytes, output_path: ImageTarget) -> StegoResult:
+        if is_path(input_path) and is_path(output_path):
+            try:
+                cover = StreamedTiff(input_path)
+            except STREAM_ERRORS:
+                pass  # wariant bez ścieżki strumieniowej
+            else:
+                with cover:
+                    capacity = cover.width * cover.height * 3
+                if self.HEADER_BITS + len(payload) * 8 > capacity:
+                    raise ValueError("Wiadomość jest za długa dla tego obrazu.")
+                return self._encode_streamed(input_path, payload, output_path)
+
+        return self._encode_lsb(input_path, payload, output_path,
+                                fmt="TIFF",
                                 anti_forensic_noise = self.anti_forensic_noise,
-                                noise_ratio = self.noise_ratio)
+                                noise_ratio = self.noise_ratio,
+                                noise_seed = self.noise_seed)
+
+    def decode(self, input_path: ImageSource) -> str:
+        return self.decode_bytes(input_path).decode("utf-8")
+
+    def decode_bytes(self, input_path: ImageSource) -> bytes:
+        return self.read_range(input_path, 0)
+
+    def read_range(self, input_path: ImageSource, offset: int, length: Optional[int] = None) -> bytes:
+        if is_path(input_path):
+            try:
+                tif = StreamedTiff(input_path, strips_per_band=1)  # odczyt: pas po pasie
+            except STREAM_ERRORS:
+                pass
+            else:
+                with tif:
+                    return self._read_streamed(tif, offset, length)
+        return self._decode_lsb(input_path, offset, length)
+
+    def capacity(self, input_path: ImageSource) -> int:
+        return self._capacity_lsb(input_path)
+
+    def optimize_output(self, output_path: str, threads: Optional[int] = None) -> OptimizeResult:
+        return optimize_file(output_path, OPTIMIZE_STRATEGIES, threads)
+
+    # --- ścieżka strumieniowa ---
+
+    def _encode_streamed(self, input_path: str, payload: bytes, output_path: str) -> str:
+        data = memoryview(payload).cast("B")
+        header = len(data).to_bytes(self.HEADER_BITS // 8, byteorder="big")
+        used_bits = self.HEADER_BITS + len(data) * 8
+
+        in_place = os.path.exists(output_path) and os.path.samefile(input_path, output_path)
+        if not in_place:
+            shutil.copyfile(input_path, output_path)
+        try:
+            with StreamedTiff(output_path, writable=True) as tif:
+                self._embed_streamed(tif, header, data, used_bits)
+        except BaseException:
+            if not in_place:
+                os.remove(output_path)
+            raise
+        return output_path
+
+    def _embed_streamed(self, tif: StreamedTiff, header: bytes, data: memoryview, used_bits: int) -> None:
+        """
+        Pasmo po paśmie: bity danych z zakresu pasma i (z szumem) wylosowane
+        pozycje za danymi - te same co w LsbMixin dla tego samego seeda.
+        """
+        row_bits = tif.width * 3
+        noise = None
+        if self.anti_forensic_noise:
+            rng = np.random.default_rng(self.noise_seed)
+            free = tif.width * tif.height * 3 - used_bits
+            noise = _PositionQueue(bernoulli_positions(free, self.noise_ratio / 2, rng))
+
+        for band, (first, end, _) in enumerate(tif.bands):
+            lo, hi = first * row_bits, end * row_bits
+            if lo >= used_bits and noise is None:
+                break  # reszta pliku bez zmian
+
+            buf = tif.read_band(band)
+            view = buf[: end - first, : tif.width]
+            region = np.ascontiguousarray(view)
+            if lo < used_bits:
+                b = min(hi, used_bits)
+                self._embed_bits_in_array(region, _payload_bits(header, data, lo, b), 0)
+            if noise is not None:
+                positions = noise.take_below(hi - used_bits) + used_bits - lo
+                if tif.samples != 3:
+                    positions += (positions // 3) * (tif.samples - 3)
+                region.reshape(-1)[positions] ^= 1
+            view[...] = region
+            tif.write_band(band, buf)
+
+    def _read_streamed(self, tif: StreamedTiff, offset: int, length: Optional[int]) -> bytes:
+        capacity = tif.width * tif.height * 3
+        if capacity < self.HEADER_BITS:
+            raise ValueError("Obraz nie zawiera nawet pełnego nagłówka.")
+
+        header = self._stream_bytes(tif, 0, self.HEADER_BITS // 8)
+        size = int.from_bytes(header, byteorder="big")
+        if self.HEADER_BITS + size * 8 > capacity:
+            raise ValueError(
+                "Deklarowana długość wiadomości przekracza pojemność osadzonych bitów."
+            )
+
+        length = payload_range(size, offset, length)
+        return self._stream_bytes(tif, self.HEADER_BITS + offset * 8, length)
+
+    def _stream_bytes(self, tif: StreamedTiff, start_bit: int, n_bytes: int) -> bytes:
+        """Składa 'n_bytes' bajtów z LSB od pozycji 'start_bit', czytając tylko pasma z tym zakresem."""
+        row_bits = tif.width * 3
+        end_bit = start_bit + n_bytes * 8
+        out = bytearray()
+        carry = np.empty(0, dtype=np.uint8)  # bity niepełnego bajtu z poprzedniego pasma
+
+        band = tif.band_at(start_bit // row_bits)
+        bit = start_bit
+        while bit < end_bit:
+            first, end, _ = tif.bands[band]
+            stop = min(end * row_bits, end_bit)
+            # tylko wiersze pasma z bitami [bit, stop)
+            r0, r1 = bit // row_bits - first, -(-stop // row_bits) - first
+            rows = tif.read_band(band)[r0:r1, : tif.width, :3].reshape(-1)
+            base = (first + r0) * row_bits
+            bits = np.concatenate((carry, rows[bit - base : stop - base] & 1))
+            whole = len(bits) // 8 * 8
+            out += np.packbits(bits[:whole]).tobytes()
+            carry = bits[whole:]
+            bit = stop
+            band += 1
+        return bytes(out)
+
 
-    def decode(self, input_path: str) -> str:
-        return self._decode_lsb(input_path)
+def _payload_bits(header: bytes, data: memoryview, start: int, stop: int) -> np.ndarray:
+    """Bity [start, stop) strumienia [nagłówek][dane] bez składania go w całości."""
+    first, last = start // 8, -(-stop // 8)
+    head = len(header)
+    parts = []
+    if first < head:
+        parts.append(header[first : min(last, head)])
+    if last > head:
+        parts.append(data[max(first, head) - head : last - head])
+    chunk = np.frombuffer(b"".join(parts), dtype=np.uint8)
+    bits = np.unpackbits(chunk)
+    return bits[start - first * 8 : stop - first * 8]
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import bisect
+import struct
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from imagesteganography.utilities.config import get_config
+
+config = get_config()
+
+COMPRESSION_NONE = 1
+COMPRESSION_DEFLATE = (8, 32946)
+PHOTOMETRIC_RGB = 2
+PREDICTOR_HORIZONTAL = 2
+# typy całkowite TIFF: kod -> (format struct, rozmiar w bajtach)
+INT_TYPES = {1: ("B", 1), 3: ("H", 2), 4: ("I", 4), 16: ("Q", 8)}
+
+WIDTH, LENGTH, BITS_PER_SAMPLE, COMPRESSION, PHOTOMETRIC = 256, 257, 258, 259, 262
+STRIP_OFFSETS, SAMPLES_PER_PIXEL, ROWS_PER_STRIP, STRIP_BYTE_COUNTS = 273, 277, 278, 279
+PLANAR_CONFIG, PREDICTOR, TILE_WIDTH, TILE_LENGTH = 284, 317, 322, 323
+TILE_OFFSETS, TILE_BYTE_COUNTS, SAMPLE_FORMAT = 324, 325, 339
+
+
+class Segment:
+    """Jeden pas albo kafel: położenie w pliku i w obrazie."""
+
+    __slots__ = ("index", "offset", "count", "row", "rows", "col", "cols")
+
+    def __init__(self, index: Optional[int], offset: int, count: int, row: int, rows: int, col: int, cols: int):
+        self.index = index  # pozycja w tablicy StripOffsets/TileOffsets (None: część pasa)
+        self.offset = offset
+        self.count = count
+        self.row = row
+        self.rows = rows
+        self.col = col
+        self.cols = cols
+
+
+class StreamedTiff:
+    """
+    Pierwszy obraz pliku TIFF (klasyczny albo BigTIFF) czytany i zapisywany
+    pasmami: kilka kolejnych pasów (strip) albo jeden rząd kafli (tile),
+    bez wczytywania całego rastra i bez Pillowa.
+
+    Obsługujemy 8-bitowe RGB/RGBA z próbkami obok siebie (PlanarConfig 1),
+    bez kompresji albo z Deflate (także z predyktorem poziomym). Inne
+    warianty (LZW, JPEG, paleta, 16 bitów, ...) zgłaszają ValueError.
+
+    Pasy bez kompresji dzielimy na części po co najwyżej MAX_SEGMENT_BYTES,
+    bo Pillow zapisuje cały obraz jako jeden pas. Skompresowany pas po
+    zmianie zapisujemy w starym miejscu, jeśli się mieści, a inaczej na
+    końcu pliku; tablice przesunięć i długości poprawiamy przy close().
+    """
+
+    MAX_SEGMENT_BYTES = 1 << 22
+    DEFLATE_LEVEL = 6
+
+    def __init__(self, path: str, writable: bool = False, strips_per_band: Optional[int] = None):
+        self.path = path
+        self._file = open(path, "r+b" if writable else "rb")
+        self._dirty = False
+        try:
+            self._parse()
+            self._layout(strips_per_band or int(config.get("TIFF", "STREAM_STRIPS", 8)))
+            self._band_starts = [band[0] for band in self.bands]
+        except Exception:
+            self._file.close()
+            raise
+
+    # --- nagłówki ---
+
+    def _parse(self) -> None:
+        f = self._file
+        head = f.read(16)
+        if head[:2] not in (b"II", b"MM"):
+            raise ValueError("To nie jest plik TIFF.")
+        o = self._order = "<" if head[:2] == b"II" else ">"
+        (version,) = struct.unpack(o + "H", head[2:4])
+        if version == 42:
+            self._offset_fmt, self._count_fmt, value_size = "I", "H", 4
+            (ifd,) = struct.unpack(o + "I", head[4:8])
+        elif version == 43:  # BigTIFF
+            self._offset_fmt, self._count_fmt, value_size = "Q", "Q", 8
+            (ifd,) = struct.unpack(o + "Q", head[8:16])
+        else:
+            raise ValueError("Nieznana wersja TIFF.")
+
+        count_size = struct.calcsize(self._count_fmt)
+        entry_size = 4 + 2 * value_size
+        f.seek(ifd)
+        (n,) = struct.unpack(o + self._count_fmt, f.read(count_size))
+        entries = f.read(n * entry_size)
+
+        # tag -> (typ, liczba wartości, pole wartości, pozycja pola w pliku)
+        self._entries: dict[int, tuple[int, int, bytes, int]] = {}
+        for i in range(n):
+            entry = entries[i * entry_size : (i + 1) * entry_size]
+            tag, typ = struct.unpack(o + "HH", entry[:4])
+            (count,) = struct.unpack(o + self._offset_fmt, entry[4 : 4 + value_size])
+            position = ifd + count_size + i * entry_size + 4 + value_size
+            self._entries[tag] = (typ, count, entry[4 + value_size :], position)
+
+        self.width = self._values(WIDTH)[0]
+        self.height = self._values(LENGTH)[0]
+        self.samples = self._values(SAMPLES_PER_PIXEL, [1])[0]
+        self.compression = self._values(COMPRESSION, [COMPRESSION_NONE])[0]
+        self.predictor = self._values(PREDICTOR, [1])[0]
+        supported = (
+            self._values(PHOTOMETRIC, [None])[0] == PHOTOMETRIC_RGB
+            and self.samples in (3, 4)
+            and all(bits == 8 for bits in self._values(BITS_PER_SAMPLE, [1]))
+            and self._values(PLANAR_CONFIG, [1])[0] == 1
+            and all(fmt == 1 for fmt in self._values(SAMPLE_FORMAT, [1]))
+            and (self.compression == COMPRESSION_NONE or self.compression in COMPRESSION_DEFLATE)
+            and self.predictor in (1, PREDICTOR_HORIZONTAL)
+        )
+        if not supported:
+            raise ValueError("Nieobsługiwany wariant TIFF.")
+
+        self.tiled = TILE_WIDTH in self._entries
+        self._offsets_tag, self._counts_tag = (
+            (TILE_OFFSETS, TILE_BYTE_COUNTS) if self.tiled else (STRIP_OFFSETS, STRIP_BYTE_COUNTS)
+        )
+        self.offsets = self._values(self._offsets_tag)
+        self.counts = self._values(self._counts_tag)
+        if self.compressed and any(self._entries[tag][0] not in (4, 16) for tag in (self._offsets_tag, self._counts_tag)):
+            raise ValueError("Tablice pasów typu SHORT - nie da się przenieść pasa.")
+
+    def _values(self, tag: int, default: Optional[list] = None) -> list:
+        if tag not in self._entries:
+            if default is None:
+                raise ValueError(f"Brak wymaganego tagu TIFF {tag}.")
+            return default
+        typ, count, value, _ = self._entries[tag]
+        if typ not in INT_TYPES:
+            raise ValueError(f"Nieobsługiwany typ tagu TIFF {tag}.")
+        fmt, size = INT_TYPES[typ]
+        if count * size <= len(value):
+            data = value[: count * size]
+        else:
+            (offset,) = struct.unpack(self._order + self._offset_fmt, value)
+            self._file.seek(offset)
+            data = self._file.read(count * size)
+        return list(struct.unpack(f"{self._order}{count}{fmt}", data))
+
+    @property
+    def compressed(self) -> bool:
+        return self.compression != COMPRESSION_NONE
+
+    def _layout(self, strips_per_band: int) -> None:
+        """Podział na segmenty i pasma (kolejne wiersze obrazu)."""
+        w, h, row_bytes = self.width, self.height, self.width * self.samples
+        self.segments: list[Segment] = []
+        # pasmo: (pierwszy wiersz, koniec, indeksy segmentów)
+        self.bands: list[tuple[int, int, list[int]]] = []
+
+        if self.tiled:
+            tw, th = self._values(TILE_WIDTH)[0], self._values(TILE_LENGTH)[0]
+            across = -(-w // tw)
+            self._band_width = across * tw
+            for ty in range(-(-h // th)):
+                first = len(self.segments)
+                for tx in range(across):
+                    i = ty * across + tx
+                    self.segments.append(Segment(i, self.offsets[i], self.counts[i], ty * th, th, tx * tw, tw))
+                self.bands.append((ty * th, min(h, (ty + 1) * th), list(range(first, len(self.segments)))))
+            return
+
+        self._band_width = w
+        rps = min(self._values(ROWS_PER_STRIP, [h])[0], h)
+        for i in range(-(-h // rps)):
+            row, rows = i * rps, min(rps, h - i * rps)
+            if self.compressed:
+                self.segments.append(Segment(i, self.offsets[i], self.counts[i], row, rows, 0, w))
+                continue
+            if self.counts[i] < rows * row_bytes:
+                raise ValueError("Pas TIFF krótszy niż wynika z wymiarów.")
+            step = max(1, self.MAX_SEGMENT_BYTES // row_bytes)
+            for r in range(0, rows, step):
+                n = min(step, rows - r)
+                self.segments.append(Segment(None, self.offsets[i] + r * row_bytes, n * row_bytes, row + r, n, 0, w))
+
+        for start in range(0, len(self.segments), strips_per_band):
+            group = list(range(start, min(start + strips_per_band, len(self.segments))))
+            first, last = self.segments[group[0]], self.segments[group[-1]]
+            self.bands.append((first.row, last.row + last.rows, group))
+
+    # --- pasma ---
+
+    def band_at(self, row: int) -> int:
+        """Numer pasma z wierszem 'row'."""
+        return bisect.bisect_right(self._band_starts, row) - 1
+
+    def read_band(self, band: int) -> np.ndarray:
+        """
+        Piksele pasma jako (wiersze, szerokość, próbki); dla kafli z
+        dopełnieniem do całych kafli - obraz to wynik[:wiersze, :width].
+        """
+        first, end, segments = self.bands[band]
+        if not self.tiled:
+            return np.concatenate([self._read_segment(self.segments[i]) for i in segments])
+        segs = [self.segments[i] for i in segments]
+        buf = np.empty((segs[0].rows, self._band_width, self.samples), dtype=np.uint8)
+        for seg in segs:
+            buf[:, seg.col : seg.col + seg.cols] = self._read_segment(seg)
+        return buf
+
+    def write_band(self, band: int, buf: np.ndarray) -> None:
+        """Zapisuje pasmo odczytane przez read_band (po zmianach)."""
+        first, _, segments = self.bands[band]
+        for i in segments:
+            seg = self.segments[i]
+            if self.tiled:
+                part = buf[:, seg.col : seg.col + seg.cols]
+            else:
+                part = buf[seg.row - first : seg.row - first + seg.rows]
+            self._write_segment(seg, np.ascontiguousarray(part))
+
+    def _read_segment(self, seg: Segment) -> np.ndarray:
+        self._file.seek(seg.offset)
+        data = self._file.read(seg.count)
+        if self.compressed:
+            data = zlib.decompress(data)
+        size = seg.rows * seg.cols * self.samples
+        if len(data) < size:
+            raise ValueError("Uszkodzony albo ucięty pas TIFF.")
+        arr = np.frombuffer(data, dtype=np.uint8, count=size).reshape(seg.rows, seg.cols, self.samples)
+        if self.predictor == PREDICTOR_HORIZONTAL:
+            arr = np.cumsum(arr, axis=1, dtype=np.uint8)  # suma modulo 256
+        return arr
+
+    def _write_segment(self, seg: Segment, arr: np.ndarray) -> None:
+        if self.predictor == PREDICTOR_HORIZONTAL:
+            diff = arr.copy()
+            diff[:, 1:] -= arr[:, :-1]
+            arr = diff
+        data = arr.tobytes()
+
+        if self.compressed:
+            data = zlib.compress(data, self.DEFLATE_LEVEL)
+            if len(data) > seg.count:
+                # nie mieści się w starym miejscu - na koniec pliku (wyrównane do słowa)
+                end = self._file.seek(0, 2)
+                if end % 2:
+                    self._file.write(b"\0")
+                    end += 1
+                if self._offset_fmt == "I" and end + len(data) > 0xFFFFFFFF:
+                    raise ValueError("Plik przekroczyłby 4 GB - potrzebny BigTIFF.")
+                seg.offset = end
+            seg.count = len(data)
+            self.offsets[seg.index], self.counts[seg.index] = seg.offset, seg.count
+            self._dirty = True
+
+        self._file.seek(seg.offset)
+        self._file.write(data)
+
+    # --- zamknięcie ---
+
+    def _store(self, tag: int, values: list) -> None:
+        typ, count, value, position = self._entries[tag]
+        fmt, size = INT_TYPES[typ]
+        data = struct.pack(f"{self._order}{count}{fmt}", *values)
+        if count * size > len(value):
+            (position,) = struct.unpack(self._order + self._offset_fmt, value)
+        self._file.seek(position)
+        self._file.write(data)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            if self._dirty:
+                self._store(self._offsets_tag, self.offsets)
+                self._store(self._counts_tag, self.counts)
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> "StreamedTiff":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
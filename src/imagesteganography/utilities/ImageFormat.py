@@ -18,4 +18,22 @@ class ImageFormat(Enum):
             if fmt.value == ext:
                 return fmt
 
-        raise ValueError(f"Unsupported image format: {ext}")
\ No newline at end of file
+        raise ValueError(f"Unsupported image format: {ext}")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ImageFormat":
+        """Rozpoznaje format po sygnaturze pliku (np. dla danych ze stdin)."""
+        signatures = (
+            (b"\x89PNG\r\n\x1a\n", cls.PNG),
+            (b"BM", cls.BMP),
+            (b"II*\x00", cls.TIFF),
+            (b"MM\x00*", cls.TIFF),
+            (b"II+\x00", cls.TIFF),  # BigTIFF
+            (b"MM\x00+", cls.TIFF),
+            (b"\xff\xd8\xff", cls.JPEG),
+        )
+        for magic, fmt in signatures:
+            if data.startswith(magic):
+                return fmt
+
+        raise ValueError("Unrecognized image format")
@@ -1,3 +1,4 @@
+from typing import Optional
 from imagesteganography.core.ImageStegoBackend import ImageStegoBackend
 from imagesteganography.utilities.ImageFormat import ImageFormat
 from imagesteganography.formats.png_backend import PngStegoBackend
@@ -7,13 +8,19 @@ from imagesteganography.formats.jpeg_backend import JpegStegoBackend
 
 class StegoBackendFactory:
     @staticmethod
-    def create(fmt: ImageFormat, anti_forensic_noise: bool = False, noise_ratio: float = 0.05) -> ImageStegoBackend:
+    def create(
+        fmt: ImageFormat,
+        anti_forensic_noise: bool = False,
+        noise_ratio: float = 0.05,
+        noise_seed: Optional[int] = None,
+        jsteg: bool = False,
+    ) -> ImageStegoBackend:
         if fmt == ImageFormat.PNG:
-            return PngStegoBackend(anti_forensic_noise = anti_forensic_noise, noise_ratio = noise_ratio)
+            return PngStegoBackend(anti_forensic_noise = anti_forensic_noise, noise_ratio = noise_ratio, noise_seed = noise_seed)
         if fmt == ImageFormat.BMP:
-            return BmpStegoBackend(anti_forensic_noise = anti_forensic_noise, noise_ratio = noise_ratio)
+            return BmpStegoBackend(anti_forensic_noise = anti_forensic_noise, noise_ratio = noise_ratio, noise_seed = noise_seed)
         if fmt == ImageFormat.TIFF:
-            return TiffStegoBackend(anti_forensic_noise = anti_forensic_noise, noise_ratio = noise_ratio)
+            return TiffStegoBackend(anti_forensic_noise = anti_forensic_noise, noise_ratio = noise_ratio, noise_seed = noise_seed)
         if fmt == ImageFormat.JPEG:
-            return JpegStegoBackend(anti_forensic_noise = anti_forensic_noise, noise_ratio = noise_ratio)
+            return JpegStegoBackend(anti_forensic_noise = anti_forensic_noise, noise_ratio = noise_ratio, noise_seed = noise_seed, jsteg = jsteg)
         raise ValueError(f"No backend for format: {fmt}")
@@ -0,0 +1,223 @@
+import json
+import multiprocessing
+import os
+import platform
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+from PIL import Image
+
+from imagesteganography.core.StegoService import StegoService
+from imagesteganography.utilities.ImageFormat import ImageFormat
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_MEGAPIXELS = (1, 12, 24, 50)
+DEFAULT_PAYLOADS = (1 << 10, 1 << 16, 1 << 20)
+DEFAULT_THRESHOLD = 0.2
+
+
+def make_cover(path: str, fmt: ImageFormat, megapixels: float, seed: int = 0) -> tuple[int, int]:
+    """
+    Tworzy syntetyczny nośnik 4:3 o zadanej liczbie megapikseli: gradient
+    z lekkim szumem, żeby kompresja zachowywała się podobnie jak dla zdjęć.
+    """
+    h = max(8, int(round((megapixels * 1e6 * 3 / 4) ** 0.5)))
+    w = max(8, int(round(h * 4 / 3)))
+    rng = np.random.default_rng(seed)
+
+    arr = np.empty((h, w, 3), dtype=np.uint8)
+    ramp_x = np.linspace(0, 255, w, dtype=np.float32)
+    for y0 in range(0, h, 512):  # pasami - bez tablic float o rozmiarze całego obrazu
+        y1 = min(h, y0 + 512)
+        ramp_y = np.linspace(y0, y1 - 1, y1 - y0, dtype=np.float32)[:, None] * (255 / h)
+        noise = rng.integers(-8, 9, (y1 - y0, w, 3), dtype=np.int16)
+        band = (ramp_x[None, :, None] + ramp_y[:, :, None]) / 2 + noise
+        arr[y0:y1] = np.clip(band, 0, 255).astype(np.uint8)
+
+    img = Image.fromarray(arr)
+    if fmt is ImageFormat.JPEG:
+        img.save(path, format="JPEG", quality=90)
+    else:
+        img.save(path, format=fmt.name)
+    return w, h
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Szczytowe RSS procesu w MB. Wartość nigdy nie maleje w czasie życia
+    procesu, więc pomiar pojedynczego przypadku robi _case_peak_rss_mb
+    w osobnym procesie.
+
+    Na Linuksie czytamy VmHWM z /proc - ru_maxrss przechodzi z rodzica
+    przez fork i exec, więc nowy proces pokazywałby szczyt benchmarku.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux podaje KB, macOS bajty
+    return round(peak / (1 << 20) if platform.system() == "Darwin" else peak / 1024, 1)
+
+
+def _best_time(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _capacity_bytes(service: StegoService, fmt: ImageFormat, path: str) -> int:
+    return service.capacity(path, fmt).bytes
+
+
+def _operation(service: StegoService, op: str, fmt: ImageFormat, cover: str, output: str, payload: bytes) -> Callable[[], object]:
+    ops = {
+        "capacity": lambda: _capacity_bytes(service, fmt, cover),
+        "encode": lambda: service.hide_bytes(cover, payload, fmt, output),
+        "encode_noise": lambda: service.hide_bytes(cover, payload, fmt, output, anti_forensic_noise=True, noise_seed=0),
+        "decode": lambda: service.reveal_bytes(output, fmt),
+    }
+    return ops[op]
+
+
+def _run_once(op: str, fmt: ImageFormat, cover: str, output: str, payload: bytes) -> Optional[float]:
+    """Jedna operacja w świeżym procesie; zwraca jego szczytowe RSS."""
+    _operation(StegoService(), op, fmt, cover, output, payload)()
+    return peak_rss_mb()
+
+
+def _case_peak_rss_mb(op: str, fmt: ImageFormat, cover: str, output: str, payload: bytes) -> Optional[float]:
+    """
+    Szczytowe RSS jednego przypadku: operacja raz, w nowym procesie
+    (spawn - bez pamięci odziedziczonej po procesie benchmarku). Obejmuje
+    też interpreter i importy, więc porównywalne są wartości między
+    przypadkami, a nie z zerem.
+    """
+    if peak_rss_mb() is None:
+        return None
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_once, op, fmt, cover, output, payload).result()
+
+
+def run_benchmark(
+    megapixels: Iterable[float] = DEFAULT_MEGAPIXELS,
+    formats: Iterable[ImageFormat] = tuple(ImageFormat),
+    payload_sizes: Iterable[int] = DEFAULT_PAYLOADS,
+    repeat: int = 3,
+    progress: Optional[Callable[[dict], None]] = None,
+    measure_memory: bool = True,
+) -> dict:
+    """
+    Mierzy czasy operacji (najlepszy z 'repeat' przebiegów) dla każdego
+    formatu, rozmiaru nośnika i rozmiaru danych:
+
+    - capacity: odczyt obrazu i wyliczenie pojemności,
+    - encode / encode_noise: ukrycie danych (bez i z szumem anti-forensic),
+    - decode: odczyt danych.
+
+    Zwraca słownik {"meta": ..., "results": [...]} gotowy do zapisu jako JSON.
+    Przypadki, w których dane nie mieszczą się w nośniku, są pomijane.
+    'peak_rss_mb' mierzymy osobnym przebiegiem w nowym procesie (bez
+    'measure_memory' - None).
+    """
+    service = StegoService()
+    results = []
+
+    def record(fmt: ImageFormat, cover: str, output: str, payload: bytes, **fields) -> None:
+        if measure_memory:
+            fields["peak_rss_mb"] = _case_peak_rss_mb(fields["op"], fmt, cover, output, payload)
+        else:
+            fields["peak_rss_mb"] = None
+        results.append(fields)
+        if progress is not None:
+            progress(fields)
+
+    with tempfile.TemporaryDirectory(prefix="stego-bench-") as tmp:
+        for fmt in formats:
+            for mp in megapixels:
+                cover = os.path.join(tmp, f"cover_{mp}mp.{fmt.value}")
+                output = os.path.join(tmp, f"stego_{mp}mp.{fmt.value}")
+                w, h = make_cover(cover, fmt, mp)
+                pixels = w * h
+                case = {"format": fmt.value, "megapixels": mp, "width": w, "height": h}
+
+                capacity = _capacity_bytes(service, fmt, cover)
+                seconds = _best_time(_operation(service, "capacity", fmt, cover, output, b""), repeat)
+                record(fmt, cover, output, b"", **case, op="capacity", payload_bytes=0, seconds=seconds,
+                       mb_per_s=None, pixels_per_s=pixels / seconds, capacity_bytes=capacity)
+
+                for size in payload_sizes:
+                    if size > capacity:
+                        continue
+                    payload = os.urandom(size)
+                    for op in ("encode", "encode_noise", "decode"):
+                        seconds = _best_time(_operation(service, op, fmt, cover, output, payload), repeat)
+                        record(fmt, cover, output, payload, **case, op=op, payload_bytes=size, seconds=seconds,
+                               mb_per_s=size / seconds / 1e6, pixels_per_s=pixels / seconds)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _case_key(result: dict) -> tuple:
+    return result["format"], result["megapixels"], result["op"], result["payload_bytes"]
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    Porównuje wyniki z bazowymi. Zwraca listę regresji: przypadków,
+    których czas wzrósł o więcej niż 'threshold' (0.2 = 20%).
+    Przypadki bez odpowiednika w pliku bazowym są pomijane.
+    """
+    reference = {_case_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        base = reference.get(_case_key(result))
+        if base is None or base["seconds"] <= 0:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "format": result["format"],
+                "megapixels": result["megapixels"],
+                "op": result["op"],
+                "payload_bytes": result["payload_bytes"],
+                "baseline_seconds": base["seconds"],
+                "seconds": result["seconds"],
+                "ratio": round(ratio, 3),
+            })
+    return regressions
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,233 @@
+import glob
+import hashlib
+import os
+import sqlite3
+import struct
+import threading
+import time
+from typing import Iterable, Optional
+
+from PIL import Image
+
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.config import get_config
+from imagesteganography.utilities.image_header import Capacity, read_header
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS covers (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    format TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    mode TEXT,
+    capacity_bits INTEGER NOT NULL,
+    capacity_jsteg_bits INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS covers_capacity ON covers (format, capacity_bits);
+CREATE INDEX IF NOT EXISTS covers_sha256 ON covers (sha256);
+"""
+COLUMNS = (
+    "path", "size", "mtime_ns", "sha256", "format", "width", "height",
+    "mode", "capacity_bits", "capacity_jsteg_bits", "indexed_at",
+)
+IMAGE_SUFFIXES = (".png", ".bmp", ".tif", ".tiff", ".jpg", ".jpeg")
+
+
+def default_db_path() -> str:
+    return get_config().get("INDEX", "DB", "cover_index.sqlite")
+
+
+def _entry(row: sqlite3.Row) -> dict:
+    """Wiersz indeksu jako słownik; pojemności także w bajtach."""
+    entry = dict(row)
+    for column in ("capacity_bits", "capacity_jsteg_bits"):
+        bits = entry[column]
+        entry[column.replace("_bits", "_bytes")] = None if bits is None else Capacity(bits).bytes
+    return entry
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class CoverIndex:
+    """
+    Trwały indeks (SQLite) nośników: wymiary, tryb i pojemność per backend.
+
+    Kluczem jest ścieżka; rozmiar i mtime pozwalają pominąć pliki bez zmian,
+    a skrót SHA-256 - nie liczyć metadanych od nowa, gdy zmienił się tylko
+    czas modyfikacji (albo plik skopiowano: wiersz o tym samym skrócie
+    wystarczy przepisać). Pojemność jsteg (JPEG) wymaga odczytu
+    współczynników, więc liczymy ją tylko na żądanie.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, service=None):
+        if service is None:
+            from imagesteganography.core.StegoService import StegoService
+
+            service = StegoService()
+        self.service = service
+        self.db_path = db_path or default_db_path()
+        # GUI i CLI mogą wołać z różnych wątków - jedno połączenie pod blokadą
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "CoverIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- odczyt ---
+
+    def get(self, path: str) -> Optional[dict]:
+        """Wpis dla pliku, o ile jest aktualny (ten sam rozmiar i mtime)."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM covers WHERE path = ?", (path,)).fetchone()
+        if row is None or row["size"] != st.st_size or row["mtime_ns"] != st.st_mtime_ns:
+            return None
+        return _entry(row)
+
+    def lookup(self, path: str, jsteg: bool = False) -> dict:
+        """Wpis dla pliku; gdy go brak albo jest nieaktualny - indeksuje plik."""
+        entry = self.get(path)
+        if entry is None or (jsteg and entry["format"] == "jpeg" and entry["capacity_jsteg_bits"] is None):
+            self.update([path], jsteg=jsteg)
+            entry = self.get(path)
+        if entry is None:
+            raise FileNotFoundError(path)
+        return entry
+
+    def find(
+        self,
+        min_bytes: int,
+        image_format: Optional[ImageFormat] = None,
+        jsteg: bool = False,
+        limit: Optional[int] = 10,
+    ) -> list[dict]:
+        """
+        Nośniki, w których zmieści się 'min_bytes' danych - od najmniejszej
+        wystarczającej pojemności (najlepsze dopasowanie) w górę.
+        """
+        column = "capacity_jsteg_bits" if jsteg else "capacity_bits"
+        sql = f"SELECT * FROM covers WHERE {column} >= ?"
+        params: list = [min_bytes * 8]
+        if image_format is not None:
+            sql += " AND format = ?"
+            params.append(image_format.value)
+        sql += f" ORDER BY {column}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [_entry(row) for row in self._conn.execute(sql, params)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT format, COUNT(*) AS n, SUM(capacity_bits) / 8 AS bytes FROM covers GROUP BY format"
+            ).fetchall()
+        return {row["format"]: {"count": row["n"], "capacity_bytes": row["bytes"]} for row in rows}
+
+    # --- aktualizacja ---
+
+    def update(self, paths: Iterable[str], jsteg: bool = False) -> dict:
+        """
+        Dodaje albo odświeża wpisy. Zwraca liczniki: added, updated,
+        unchanged, failed.
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                status = self._update_one(path, jsteg)
+            except (OSError, ValueError, struct.error, Image.DecompressionBombError):
+                status = "failed"
+            counts[status] += 1
+        return counts
+
+    def scan(self, sources: Iterable[str], jsteg: bool = False, prune: bool = True) -> dict:
+        """
+        Indeksuje katalogi (rekurencyjnie, pliki obrazów), wzorce glob albo
+        pojedyncze pliki. Z 'prune' usuwa wpisy plików, których już nie ma.
+        """
+        paths = []
+        for source in sources:
+            if os.path.isdir(source):
+                for root, _, files in os.walk(source):
+                    paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_SUFFIXES))
+            else:
+                paths.extend(p for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+        counts = self.update(sorted(paths), jsteg=jsteg)
+        counts["removed"] = self.prune() if prune else 0
+        return counts
+
+    def prune(self) -> int:
+        """Usuwa wpisy plików, które zniknęły z dysku."""
+        with self._lock:
+            missing = [row[0] for row in self._conn.execute("SELECT path FROM covers") if not os.path.exists(row[0])]
+            with self._conn:
+                self._conn.executemany("DELETE FROM covers WHERE path = ?", [(p,) for p in missing])
+        return len(missing)
+
+    def _update_one(self, path: str, jsteg: bool) -> str:
+        st = os.stat(path)
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM covers WHERE path = ?", (path,)).fetchone()
+        need_jsteg = jsteg and (row is None or (row["format"] == "jpeg" and row["capacity_jsteg_bits"] is None))
+        if row is not None and row["size"] == st.st_size and row["mtime_ns"] == st.st_mtime_ns and not need_jsteg:
+            return "unchanged"
+
+        digest = file_sha256(path)
+        with self._lock:
+            same = self._conn.execute(
+                "SELECT * FROM covers WHERE sha256 = ? AND size = ? LIMIT 1", (digest, st.st_size)
+            ).fetchone()
+        if same is not None and not (need_jsteg and same["capacity_jsteg_bits"] is None):
+            # treść już znamy (ten plik z nowym mtime albo kopia innego)
+            entry = dict(same)
+        else:
+            entry = self._describe(path, jsteg)
+
+        entry.update(path=path, size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=digest, indexed_at=time.time())
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO covers ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [entry[c] for c in COLUMNS],
+            )
+        return "added" if row is None else "updated"
+
+    def _describe(self, path: str, jsteg: bool) -> dict:
+        header = read_header(path)
+        with Image.open(path) as img:  # leniwie - tylko nagłówek
+            mode = img.mode
+        jsteg_bits = None
+        if jsteg and header.format is ImageFormat.JPEG:
+            jsteg_bits = self.service.capacity(path, header.format, jsteg=True)
+        return {
+            "format": header.format.value,
+            "width": header.width,
+            "height": header.height,
+            "mode": mode,
+            "capacity_bits": self.service.capacity(path, header.format),
+            "capacity_jsteg_bits": jsteg_bits,
+        }
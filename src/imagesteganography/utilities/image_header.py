@@ -0,0 +1,172 @@
+import struct
+from typing import BinaryIO, Optional
+
+import numpy as np
+from PIL import Image
+
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.image_io import ImageSource, open_stream
+
+# znaczniki SOF (bez DHT=C4, JPG=C8, DAC=CC)
+JPEG_SOF = (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+TIFF_WIDTH, TIFF_LENGTH = 256, 257
+
+
+class ImageHeader:
+    """
+    Wymiary obrazu odczytane z nagłówka kontenera, bez dekodowania pikseli.
+    Dla JPEG także próbkowanie komponentów i kształty tablic współczynników.
+    """
+
+    def __init__(
+        self,
+        fmt: Optional[ImageFormat],
+        width: int,
+        height: int,
+        jpeg_shapes: Optional[list[tuple[int, int]]] = None,
+    ):
+        self.format = fmt
+        self.width = width
+        self.height = height
+        self.jpeg_shapes = jpeg_shapes
+
+    @property
+    def jpeg_coefficients(self) -> int:
+        """Liczba współczynników DCT we wszystkich komponentach."""
+        return sum(h * w for h, w in self.jpeg_shapes or ())
+
+
+class Capacity(int):
+    """
+    Pojemność obrazu w bitach (bez nagłówka długości). Zachowuje się jak
+    zwykła liczba bitów; 'bytes' to liczba pełnych bajtów danych.
+    """
+
+    __slots__ = ()
+
+    @property
+    def bits(self) -> int:
+        return int(self)
+
+    @property
+    def bytes(self) -> int:
+        return int(self) // 8
+
+
+def jpeg_component_shapes(width: int, height: int, samplings: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """
+    Kształty tablic współczynników (jak w jpegio) dla próbkowań (h, v)
+    kolejnych komponentów; ten sam wzór co width_in_blocks w libjpeg.
+    """
+    h_max = max(h for h, _ in samplings)
+    v_max = max(v for _, v in samplings)
+    shapes = []
+    for h, v in samplings:
+        wib = -(-width * h // (h_max * 8))
+        hib = -(-height * v // (v_max * 8))
+        shapes.append((hib * 8, wib * 8))
+    return shapes
+
+
+def read_header(source: ImageSource, fmt: Optional[ImageFormat] = None) -> ImageHeader:
+    """
+    Czyta wymiary z nagłówka: PNG (IHDR), BMP (nagłówek DIB), TIFF
+    (pierwszy IFD) albo JPEG (SOF z próbkowaniem). Czytamy kilkadziesiąt
+    bajtów (TIFF/JPEG: tyle, ile trzeba do IFD/SOF), nigdy danych obrazu.
+
+    Format rozpoznajemy po sygnaturze; 'fmt' tylko go potwierdza.
+    Obrazy PIL i tablice NumPy mają wymiary od razu.
+    """
+    if isinstance(source, Image.Image):
+        return ImageHeader(fmt, *source.size)
+    if isinstance(source, np.ndarray):
+        return ImageHeader(fmt, source.shape[1], source.shape[0])
+
+    owns_file = not hasattr(source, "read")
+    f = open_stream(source)
+    origin = f.tell()
+    try:
+        head = f.read(32)
+        detected = ImageFormat.from_bytes(head)
+        if fmt is not None and fmt is not detected:
+            raise ValueError(f"Plik ma format {detected.value}, a oczekiwano {fmt.value}.")
+
+        if detected is ImageFormat.PNG:
+            return _png(head)
+        if detected is ImageFormat.BMP:
+            return _bmp(head)
+        if detected is ImageFormat.TIFF:
+            return _tiff(f, origin, head)
+        return _jpeg(f, origin)
+    finally:
+        if owns_file:
+            f.close()
+        else:
+            f.seek(origin)
+
+
+def _png(head: bytes) -> ImageHeader:
+    if head[12:16] != b"IHDR":
+        raise ValueError("Brak chunku IHDR na początku pliku PNG.")
+    width, height = struct.unpack(">II", head[16:24])
+    return ImageHeader(ImageFormat.PNG, width, height)
+
+
+def _bmp(head: bytes) -> ImageHeader:
+    (dib_size,) = struct.unpack("<I", head[14:18])
+    if dib_size == 12:  # BITMAPCOREHEADER
+        width, height = struct.unpack("<HH", head[18:22])
+    else:
+        width, height = struct.unpack("<ii", head[18:26])
+    return ImageHeader(ImageFormat.BMP, abs(width), abs(height))  # height < 0: wiersze od góry
+
+
+def _tiff(f: BinaryIO, origin: int, head: bytes) -> ImageHeader:
+    order = "<" if head[:2] == b"II" else ">"
+    if struct.unpack(order + "H", head[2:4])[0] == 43:  # BigTIFF: 8-bajtowe przesunięcia
+        offset_fmt, count_fmt, entry_size = "Q", "Q", 20
+        (ifd,) = struct.unpack(order + "Q", head[8:16])
+    else:
+        offset_fmt, count_fmt, entry_size = "I", "H", 12
+        (ifd,) = struct.unpack(order + "I", head[4:8])
+    f.seek(origin + ifd)
+    (count,) = struct.unpack(order + count_fmt, f.read(struct.calcsize(count_fmt)))
+    entries = f.read(entry_size * count)
+
+    dims = {}
+    value_at = entry_size - struct.calcsize(offset_fmt)
+    for i in range(count):
+        entry = entries[entry_size * i : entry_size * (i + 1)]
+        tag, typ = struct.unpack(order + "HH", entry[:4])
+        if tag in (TIFF_WIDTH, TIFF_LENGTH):
+            # SHORT (3) albo LONG (4), wartość zapisana w samym wpisie
+            value = entry[value_at:]
+            dims[tag] = struct.unpack(order + ("H" if typ == 3 else "I"), value[: 2 if typ == 3 else 4])[0]
+    if len(dims) < 2:
+        raise ValueError("Pierwszy IFD pliku TIFF nie zawiera wymiarów.")
+    return ImageHeader(ImageFormat.TIFF, dims[TIFF_WIDTH], dims[TIFF_LENGTH])
+
+
+def _jpeg(f: BinaryIO, origin: int) -> ImageHeader:
+    f.seek(origin + 2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte or byte[0] in (0xD9, 0xDA):
+            raise ValueError("Nie znaleziono znacznika SOF w pliku JPEG.")
+
+        marker = byte[0]
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:  # znaczniki bez długości
+            continue
+        (length,) = struct.unpack(">H", f.read(2))
+        if marker not in JPEG_SOF:
+            f.seek(length - 2, 1)  # np. APP1 z EXIF-em i miniaturą - pomijamy bez czytania
+            continue
+
+        segment = f.read(length - 2)
+        height, width = struct.unpack(">HH", segment[1:5])
+        samplings = [(s >> 4, s & 15) for s in segment[7 : 7 + 3 * segment[5] : 3]]
+        return ImageHeader(ImageFormat.JPEG, width, height, jpeg_component_shapes(width, height, samplings))
@@ -0,0 +1,130 @@
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+import numpy as np
+from PIL import Image
+
+# Źródło obrazu: ścieżka, bajty pliku, obiekt plikowy, obraz PIL albo tablica NumPy
+ImageSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO, Image.Image, np.ndarray]
+# Cel zapisu: ścieżka, obiekt plikowy albo None (wynik zwracany w pamięci)
+ImageTarget = Union[str, os.PathLike, BinaryIO, None]
+# Wynik kodowania: 'output' albo obiekt w pamięci tego samego rodzaju co źródło
+StegoResult = Union[str, os.PathLike, BinaryIO, bytes, Image.Image, np.ndarray]
+
+
+def is_path(obj) -> bool:
+    return isinstance(obj, (str, os.PathLike))
+
+
+def is_buffer(obj) -> bool:
+    return isinstance(obj, (bytes, bytearray, memoryview))
+
+
+def open_image(source: ImageSource) -> Image.Image:
+    """Otwiera obraz z dowolnego obsługiwanego źródła bez zapisu na dysk."""
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, np.ndarray):
+        return Image.fromarray(source)
+    if is_buffer(source):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)  # ścieżka albo obiekt plikowy
+
+
+def open_stream(source: ImageSource) -> BinaryIO:
+    """
+    Zwraca strumień binarny ze skompresowanym plikiem (np. JPEG).
+    Obrazy PIL i tablice nie mają już postaci pliku, więc ich nie obsługujemy.
+    """
+    if is_path(source):
+        return open(source, "rb")
+    if is_buffer(source):
+        return io.BytesIO(source)
+    if hasattr(source, "read"):
+        return source  # type: ignore[return-value]
+    raise TypeError(
+        f"Oczekiwano pliku (ścieżka, bytes albo obiekt plikowy), otrzymano {type(source).__name__}."
+    )
+
+
+@contextmanager
+def temp_path(suffix: str) -> Iterator[str]:
+    """Ścieżka do pliku tymczasowego usuwanego po wyjściu z bloku."""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        os.remove(path)
+
+
+@contextmanager
+def source_as_path(source: ImageSource, suffix: str) -> Iterator[str]:
+    """
+    Daje ścieżkę do pliku ze źródłem. Dla ścieżek nic nie kopiujemy;
+    pozostałe źródła trafiają do pliku tymczasowego (dla bibliotek, które
+    czytają wyłącznie z dysku, jak jpegio).
+    """
+    if is_path(source):
+        yield os.fspath(source)
+        return
+
+    stream = open_stream(source)
+    with temp_path(suffix) as path:
+        with open(path, "wb") as f:
+            f.write(stream.read())
+        yield path
+
+
+def deliver_image(
+    img: Image.Image,
+    source: ImageSource,
+    output: ImageTarget,
+    fmt: str,
+) -> StegoResult:
+    """
+    Zapisuje wynik tam, gdzie chce wywołujący.
+
+    - ścieżka albo obiekt plikowy -> zapis w 'fmt', zwracamy 'output',
+    - None -> wynik tego samego rodzaju co źródło: obraz PIL, tablica NumPy,
+      BytesIO dla obiektów plikowych, a bytes dla ścieżek i bajtów.
+    """
+    if output is not None:
+        img.save(output, format=fmt)
+        return output
+
+    if isinstance(source, Image.Image):
+        return img
+    if isinstance(source, np.ndarray):
+        return np.asarray(img)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt)
+    if hasattr(source, "read"):
+        buffer.seek(0)
+        return buffer
+    return buffer.getvalue()
+
+
+def deliver_file(
+    path: str,
+    source: ImageSource,
+    output: BinaryIO | None,
+) -> Union[BinaryIO, bytes]:
+    """
+    Odpowiednik deliver_image dla wyniku zapisanego do pliku tymczasowego
+    'path' (biblioteki piszące tylko na dysk): przenosimy go do 'output'
+    albo zwracamy w pamięci.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if output is not None:
+        output.write(data)
+        return output
+    if hasattr(source, "read"):
+        return io.BytesIO(data)
+    return data
@@ -0,0 +1,236 @@
+import http.client
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from imagesteganography.core.StegoService import StegoService
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.benchmark import make_cover
+
+
+class LoadCase:
+    """Jeden rodzaj żądania: format, rozmiar nośnika i danych oraz gotowe pliki."""
+
+    def __init__(self, fmt: ImageFormat, megapixels: float, payload: bytes, cover: bytes, stego: bytes):
+        self.fmt = fmt
+        self.megapixels = megapixels
+        self.payload = payload
+        self.cover = cover
+        self.stego = stego
+
+    @property
+    def name(self) -> str:
+        return f"{self.fmt.value}/{self.megapixels}MP/{len(self.payload)}B"
+
+
+def build_cases(
+    formats: Iterable[ImageFormat],
+    megapixels: Iterable[float],
+    payload_sizes: Iterable[int],
+) -> list[LoadCase]:
+    """Syntetyczne nośniki i obrazy z ukrytymi danymi (do żądań decode), w pamięci."""
+    service = StegoService()
+    cases = []
+    with tempfile.TemporaryDirectory(prefix="stego-load-") as tmp:
+        for fmt in formats:
+            for mp in megapixels:
+                path = os.path.join(tmp, f"cover.{fmt.value}")
+                make_cover(path, fmt, mp)
+                with open(path, "rb") as f:
+                    cover = f.read()
+                capacity = service.capacity(cover, fmt).bytes
+                for size in payload_sizes:
+                    if size > capacity:
+                        continue
+                    payload = os.urandom(size)
+                    stego = service.hide_bytes(cover, payload, fmt)
+                    cases.append(LoadCase(fmt, mp, payload, cover, stego))
+    if not cases:
+        raise ValueError("Żaden rozmiar danych nie mieści się w nośnikach.")
+    return cases
+
+
+class ServiceTarget:
+    """Wywołania StegoService w tym samym procesie."""
+
+    def __init__(self, service: StegoService | None = None):
+        self.service = service or StegoService()
+
+    def encode(self, case: LoadCase) -> None:
+        self.service.hide_bytes(case.cover, case.payload, case.fmt)
+
+    def decode(self, case: LoadCase) -> None:
+        if self.service.reveal_bytes(case.stego, case.fmt) != case.payload:
+            raise ValueError("Odczytane dane różnią się od ukrytych.")
+
+
+class HttpTarget:
+    """Żądania do 'stego serve'; jedno połączenie keep-alive na wątek."""
+
+    def __init__(self, url: str, timeout: float = 60.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _post(self, path: str, body: bytes, headers: dict | None = None) -> bytes:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request("POST", path, body, headers or {})
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+        if response.will_close:
+            conn.close()
+            self._local.conn = None
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        return data
+
+    def encode(self, case: LoadCase) -> None:
+        self._post(
+            f"/encode?format={case.fmt.value}",
+            case.payload + case.cover,
+            {"X-Payload-Length": str(len(case.payload))},
+        )
+
+    def decode(self, case: LoadCase) -> None:
+        if self._post(f"/decode?format={case.fmt.value}", case.stego) != case.payload:
+            raise ValueError("Odczytane dane różnią się od ukrytych.")
+
+
+def _summary(latencies: list[float]) -> dict:
+    if not latencies:
+        return {"count": 0}
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": len(latencies),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+def run_load(
+    target,
+    cases: list[LoadCase],
+    concurrency: int = 4,
+    rate: Optional[float] = None,
+    duration: Optional[float] = 10.0,
+    requests: Optional[int] = None,
+    decode_ratio: float = 0.5,
+    seed: int = 0,
+) -> dict:
+    """
+    Generuje obciążenie i zwraca raport (słownik gotowy do JSON).
+
+    - bez 'rate': pętla zamknięta, 'concurrency' wątków wysyła kolejne
+      żądania zaraz po otrzymaniu odpowiedzi,
+    - z 'rate': pętla otwarta, żądania startują w stałym tempie (na sekundę),
+      a opóźnienie liczymy od planowanego startu - kolejka po stronie klienta
+      też jest wliczona (bez "coordinated omission").
+
+    Koniec po 'requests' żądaniach albo po 'duration' sekundach.
+    Każde żądanie losuje przypadek z 'cases' i operację (decode z
+    prawdopodobieństwem 'decode_ratio').
+    """
+    if requests is None and duration is None:
+        raise ValueError("Podaj 'requests' albo 'duration'.")
+
+    rng = random.Random(seed)
+    plan_lock = threading.Lock()
+    results_lock = threading.Lock()
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else float("inf")
+
+    def next_request():
+        nonlocal issued
+        with plan_lock:
+            if (requests is not None and issued >= requests) or time.perf_counter() >= deadline:
+                return None
+            issued += 1
+            op = "decode" if rng.random() < decode_ratio else "encode"
+            return op, rng.choice(cases)
+
+    def execute(op: str, case: LoadCase, scheduled: float) -> None:
+        key = f"{op} {case.name}"
+        try:
+            getattr(target, op)(case)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - scheduled
+        with results_lock:
+            if error is None:
+                latencies.setdefault(key, []).append(elapsed)
+            else:
+                errors[error] = errors.get(error, 0) + 1
+                latencies.setdefault(key, [])
+
+    if rate is None:
+        def worker() -> None:
+            while (request := next_request()) is not None:
+                execute(*request, time.perf_counter())
+
+        threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            n = 0
+            while (request := next_request()) is not None:
+                scheduled = start + n / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(execute, *request, scheduled)
+                n += 1
+
+    wall = time.perf_counter() - start
+    ok = [x for values in latencies.values() for x in values]
+    failed = sum(errors.values())
+    total = len(ok) + failed
+    return {
+        "config": {
+            "concurrency": concurrency,
+            "rate": rate,
+            "duration": duration,
+            "requests": requests,
+            "decode_ratio": decode_ratio,
+            "cases": [case.name for case in cases],
+        },
+        "requests": total,
+        "errors": failed,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "error_types": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(ok) / wall, 2) if wall > 0 else 0.0,
+        "latency": _summary(ok),
+        "by_case": {key: _summary(values) for key, values in sorted(latencies.items())},
+    }
+
+
+def dumps(report: dict) -> str:
+    return json.dumps(report, indent=2, ensure_ascii=False)
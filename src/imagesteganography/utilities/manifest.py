@@ -0,0 +1,79 @@
+import csv
+import glob
+import json
+import os
+from typing import Iterable, Optional
+
+# Kolumny manifestu wejściowego: image (wymagana), message albo payload
+# (ścieżka do pliku z danymi), output, format (np. "png"; domyślnie z rozszerzenia).
+MANIFEST_SUFFIXES = (".csv", ".jsonl")
+
+
+def is_manifest(source: str) -> bool:
+    return source.lower().endswith(MANIFEST_SUFFIXES) and os.path.isfile(source)
+
+
+def load_rows(source: str) -> list[dict]:
+    """
+    Zwraca wiersze zadań z manifestu CSV/JSONL albo z wzorca glob
+    (wtedy każdy wiersz ma tylko 'image').
+    """
+    if not is_manifest(source):
+        return [{"image": path} for path in sorted(glob.glob(source, recursive=True)) if os.path.isfile(path)]
+
+    with open(source, newline="", encoding="utf-8") as f:
+        if source.lower().endswith(".csv"):
+            rows = [dict(row) for row in csv.DictReader(f)]
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    for number, row in enumerate(rows, start=1):
+        if not row.get("image"):
+            raise ValueError(f"Wiersz {number} manifestu nie ma kolumny 'image'.")
+    return rows
+
+
+def row_key(row: dict) -> str:
+    """Identyfikator zadania w manifeście wyników (obraz + plik wyjściowy)."""
+    return json.dumps([row["image"], row.get("output") or ""])
+
+
+def load_results(path: str) -> list[dict]:
+    """Wczytuje manifest wyników; uszkodzoną ostatnią linię (przerwany zapis) pomijamy."""
+    if not os.path.exists(path):
+        return []
+    results = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return results
+
+
+def pending_rows(rows: Iterable[dict], results: list[dict]) -> list[dict]:
+    """
+    Pomija zadania zakończone sukcesem we wcześniejszym uruchomieniu
+    oraz pliki, które same są wynikami tamtego uruchomienia.
+    """
+    done = {row_key(r) for r in results if r.get("ok")}
+    outputs = {os.path.abspath(r["result"]) for r in results if r.get("ok") and isinstance(r.get("result"), str)}
+    return [
+        row for row in rows
+        if row_key(row) not in done and os.path.abspath(row["image"]) not in outputs
+    ]
+
+
+def result_record(row: dict, ok: bool, output: Optional[str], error: Optional[str], elapsed: float, **extra) -> str:
+    """Jedna linia JSONL manifestu wyników."""
+    record = {
+        "image": row["image"],
+        "output": row.get("output") or "",
+        "ok": ok,
+        "result": output,
+        "error": error,
+        "elapsed": round(elapsed, 4),
+    }
+    record.update(extra)
+    return json.dumps(record, ensure_ascii=False) + "\n"
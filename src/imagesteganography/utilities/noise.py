@@ -0,0 +1,33 @@
+from typing import Iterator
+
+import numpy as np
+
+MAX_BATCH = 1 << 20  # ile pozycji losujemy naraz - ogranicza zużycie pamięci
+
+
+def bernoulli_positions(
+    n: int,
+    p: float,
+    rng: np.random.Generator,
+    max_batch: int = MAX_BATCH,
+) -> Iterator[np.ndarray]:
+    """
+    Zwraca kolejne, rosnące tablice pozycji z zakresu [0, n), gdzie każda
+    pozycja jest wybrana niezależnie z prawdopodobieństwem 'p'.
+
+    Zamiast losować liczbę dla każdej pozycji, losujemy odstępy między
+    wybranymi pozycjami (rozkład geometryczny), więc koszt i pamięć zależą
+    od liczby wybranych pozycji, a nie od 'n'.
+    """
+    if n <= 0 or p <= 0:
+        return
+
+    p = min(p, 1.0)
+    expected = n * p
+    batch = min(int(expected + 4 * np.sqrt(expected)) + 16, max_batch)
+
+    last = -1
+    while last < n - 1:
+        positions = last + np.cumsum(rng.geometric(p, batch))
+        last = int(positions[-1])
+        yield positions[positions < n]
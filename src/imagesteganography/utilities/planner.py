@@ -0,0 +1,146 @@
+import bisect
+import os
+from typing import Iterable, Iterator, Optional
+
+from imagesteganography.core.StegoBatch import HideJob, JobResult
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.image_header import Capacity
+
+STRATEGIES = ("tight", "balanced")
+
+
+class Assignment:
+    """Przydział danych do nośnika."""
+
+    def __init__(self, payload: str, payload_bytes: int, cover: str, capacity_bits: int, output: Optional[str] = None):
+        self.payload = payload
+        self.payload_bytes = payload_bytes
+        self.cover = cover
+        self.capacity_bits = Capacity(capacity_bits)
+        self.output = output
+
+    @property
+    def fill(self) -> float:
+        """Zapełnienie nośnika (0-1)."""
+        return self.payload_bytes * 8 / self.capacity_bits if self.capacity_bits else 1.0
+
+    def as_dict(self) -> dict:
+        return {
+            "payload": self.payload,
+            "cover": self.cover,
+            "output": self.output,
+            "payload_bytes": self.payload_bytes,
+            "capacity_bytes": self.capacity_bits.bytes,
+            "fill": round(self.fill, 4),
+        }
+
+
+def _greedy(
+    payloads: list[tuple[str, int]],
+    covers: list[tuple[int, str]],
+    ratio: float = 1.0,
+) -> tuple[list[Assignment], list[str]]:
+    """
+    Od największych danych: każde dostają najmniejszy wolny nośnik, w którym
+    zajmą co najwyżej 'ratio' pojemności. Zbiory dopuszczalnych nośników
+    są zagnieżdżone (im większe dane, tym mniej nośników), więc ta kolejność
+    rozmieszcza maksymalną liczbę danych.
+    """
+    free = sorted(covers)
+    capacities = [cap for cap, _ in free]
+    assignments, unplaced = [], []
+    for name, size in sorted(payloads, key=lambda p: -p[1]):
+        need = size * 8 / ratio
+        i = bisect.bisect_left(capacities, need)
+        if i == len(free):
+            unplaced.append(name)
+            continue
+        cap, cover = free.pop(i)
+        del capacities[i]
+        assignments.append(Assignment(name, size, cover, cap))
+    return assignments, unplaced
+
+
+def plan(
+    payloads: dict[str, int],
+    covers: dict[str, int],
+    strategy: str = "tight",
+) -> tuple[list[Assignment], list[str]]:
+    """
+    Przydziela dane (nazwa -> rozmiar w bajtach) do nośników
+    (ścieżka -> pojemność w bitach, bez nagłówka), po jednych danych
+    na nośnik - tyle mieści format osadzania.
+
+    - "tight": każde dane trafiają do najmniejszego pasującego nośnika;
+      duże nośniki zostają wolne dla kolejnych zadań,
+    - "balanced": minimalizuje największe zapełnienie nośnika (mniej
+      zmienionych bitów na obraz), nie zmniejszając liczby rozmieszczonych danych.
+
+    Zwraca (przydziały, nazwy danych, których nie da się rozmieścić).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Nieznana strategia: {strategy} (dostępne: {', '.join(STRATEGIES)})")
+    items = list(payloads.items())
+    pool = [(cap, path) for path, cap in covers.items()]
+
+    best, unplaced = _greedy(items, pool)
+    if strategy == "tight" or not best:
+        return best, unplaced
+
+    # wyszukiwanie binarne najmniejszego progu zapełnienia, przy którym
+    # nadal mieści się tyle samo danych
+    placed = len(best)
+    low, high = 0.0, max(a.fill for a in best)
+    if high == 0:  # same puste dane - nic do wyrównania (i dzielenia przez próg 0)
+        return best, unplaced
+    for _ in range(40):
+        mid = (low + high) / 2
+        candidate, rest = _greedy(items, pool, mid)
+        if len(candidate) == placed:
+            best, unplaced, high = candidate, rest, mid
+        else:
+            low = mid
+    return best, unplaced
+
+
+def plan_from_index(
+    payload_paths: Iterable[str],
+    index,
+    image_format: Optional[ImageFormat] = None,
+    jsteg: bool = False,
+    strategy: str = "tight",
+) -> tuple[list[Assignment], list[str]]:
+    """Plan dla plików z danymi i nośników z indeksu (CoverIndex)."""
+    payloads = {path: os.path.getsize(path) for path in payload_paths}
+    if not payloads:
+        return [], []
+    column = "capacity_jsteg_bits" if jsteg else "capacity_bits"
+    entries = index.find(min(payloads.values()), image_format, jsteg=jsteg, limit=None)
+    return plan(payloads, {e["path"]: e[column] for e in entries}, strategy)
+
+
+def assign_outputs(assignments: list[Assignment], output_dir: Optional[str]) -> None:
+    """Ścieżki wynikowe: *_stego obok nośnika albo w 'output_dir' (bez kolizji nazw)."""
+    used = set()
+    for a in assignments:
+        base, ext = os.path.splitext(os.path.basename(a.cover))
+        folder = output_dir or os.path.dirname(a.cover)
+        name, n = f"{base}_stego{ext}", 1
+        while os.path.join(folder, name) in used:
+            name, n = f"{base}_stego{n}{ext}", n + 1
+        a.output = os.path.join(folder, name)
+        used.add(a.output)
+
+
+def embed(
+    service,
+    assignments: list[Assignment],
+    jsteg: bool = False,
+    workers: Optional[int] = None,
+) -> Iterator[JobResult]:
+    """Wykonuje plan równolegle (StegoService.hide_many); JobResult.job.tag to Assignment."""
+    jobs = (
+        HideJob(a.cover, output_path=a.output, jsteg=jsteg, payload_file=a.payload, tag=a)
+        for a in assignments
+    )
+    return service.hide_many(jobs, workers=workers)
@@ -0,0 +1,93 @@
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Callable, Optional
+
+import numpy as np
+from PIL import Image
+
+from imagesteganography.utilities.config import get_config
+
+# strategia: zapisuje obraz (PIL i jego piksele) do strumienia
+Strategy = Callable[[Image.Image, np.ndarray, BinaryIO], None]
+
+
+class OptimizeResult:
+    """
+    Wynik optymalizacji rozmiaru pliku. 'strategy' to nazwa zwycięskiej
+    strategii albo None, gdy żadna nie dała mniejszego pliku (plik bez zmian).
+    """
+
+    def __init__(self, path: str, strategy: Optional[str], original_size: int, size: int):
+        self.path = path
+        self.strategy = strategy
+        self.original_size = original_size
+        self.size = size
+
+    @property
+    def saved(self) -> int:
+        return self.original_size - self.size
+
+    def __repr__(self) -> str:
+        return f"OptimizeResult({self.path!r}, strategy={self.strategy!r}, saved={self.saved} B)"
+
+
+def optimize_file(path: str, strategies: dict[str, Strategy], threads: Optional[int] = None) -> OptimizeResult:
+    """
+    Koduje obraz z 'path' każdą strategią (równolegle, w wątkach - zlib
+    i koderzy Pillowa zwalniają GIL) i zastępuje plik najmniejszym
+    wynikiem, jeśli jest mniejszy od obecnego. Strategie mają być
+    bezstratne, ale każdy wynik przed podmianą dekodujemy i porównujemy
+    piksele - gdy najmniejszy się nie zgadza, sprawdzamy następny, więc
+    ukryte bity na pewno się nie zmieniają. Strategie, które nie pasują
+    do obrazu (np. tryb), pomijamy.
+    """
+    original_size = os.path.getsize(path)
+    with Image.open(path) as img:
+        img.load()
+    pixels = np.asarray(img)
+    threads = threads or int(get_config().get("OPTIMIZE", "THREADS", 0)) or os.cpu_count() or 1
+
+    def encode(strategy: Strategy) -> bytes:
+        buffer = io.BytesIO()
+        strategy(img, pixels, buffer)
+        return buffer.getvalue()
+
+    def lossless(data: bytes) -> bool:
+        with Image.open(io.BytesIO(data)) as check:
+            return check.mode == img.mode and np.array_equal(np.asarray(check), pixels)
+
+    order = list(strategies)
+    candidates: list[tuple[int, int, bytes]] = []  # (rozmiar, pozycja strategii, dane)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {pool.submit(encode, strategies[name]): i for i, name in enumerate(order)}
+        for future in as_completed(futures):
+            try:
+                data = future.result()
+            except (OSError, ValueError):
+                continue
+            if len(data) < original_size:
+                candidates.append((len(data), futures[future], data))
+
+    # od najmniejszego do pierwszego, który daje te same piksele
+    candidates.sort(key=lambda c: c[:2])
+    best = next((c for c in candidates if lossless(c[2])), None)
+    if best is None:
+        return OptimizeResult(path, None, original_size, original_size)
+
+    size, position, data = best
+
+    # zapis obok i podmiana - przerwany zapis nie psuje wyniku
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return OptimizeResult(path, order[position], original_size, size)
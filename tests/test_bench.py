@@ -0,0 +1,47 @@
+import os
+import unittest
+
+from imagesteganography.utilities import benchmark
+from imagesteganography.utilities.ImageFormat import ImageFormat
+
+BASELINE = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "baseline.json")
+
+
+class TestBenchmark(unittest.TestCase):
+    """Testy zestawu benchmarków (mała skala)"""
+
+    def test_small_run(self):
+        """Test krótkiego przebiegu dla wszystkich formatów"""
+        report = benchmark.run_benchmark(megapixels=[0.05], payload_sizes=[256, 1 << 20], repeat=1, measure_memory=False)
+        ops = {(r["format"], r["op"]) for r in report["results"]}
+        for fmt in ImageFormat:
+            for op in ("capacity", "encode", "encode_noise", "decode"):
+                self.assertIn((fmt.value, op), ops)
+        # 1 MiB nie mieści się w 0.05 MP - przypadek pominięty
+        self.assertNotIn(1 << 20, {r["payload_bytes"] for r in report["results"]})
+
+    @unittest.skipIf(benchmark.peak_rss_mb() is None, "brak pomiaru RSS")
+    def test_peak_rss_per_case(self):
+        """Test RSS liczonego osobno dla każdego przypadku (mały przypadek po dużym nie dziedziczy szczytu)"""
+        report = benchmark.run_benchmark(megapixels=[2, 0.05], formats=[ImageFormat.PNG], payload_sizes=[256], repeat=1)
+        peak = {r["megapixels"]: r["peak_rss_mb"] for r in report["results"] if r["op"] == "encode"}
+        self.assertLess(peak[0.05], peak[2])
+
+    def test_compare(self):
+        """Test wykrywania regresji względem pliku bazowego"""
+        case = {"format": "png", "megapixels": 1, "op": "encode", "payload_bytes": 1024}
+        baseline = {"results": [dict(case, seconds=1.0)]}
+        self.assertEqual(benchmark.compare({"results": [dict(case, seconds=1.1)]}, baseline, 0.2), [])
+        regressions = benchmark.compare({"results": [dict(case, seconds=1.5)]}, baseline, 0.2)
+        self.assertEqual(regressions[0]["ratio"], 1.5)
+
+    @unittest.skipUnless(os.environ.get("STEGO_BENCH"), "pełny benchmark: ustaw STEGO_BENCH=1")
+    def test_against_baseline(self):
+        """Pełny benchmark porównany z benchmarks/baseline.json"""
+        threshold = float(os.environ.get("STEGO_BENCH_THRESHOLD", benchmark.DEFAULT_THRESHOLD))
+        report = benchmark.run_benchmark()
+        self.assertEqual(benchmark.compare(report, benchmark.load_report(BASELINE), threshold), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
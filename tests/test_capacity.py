@@ -0,0 +1,79 @@
+import io
+import os
+import struct
+import tempfile
+import unittest
+
+import jpegio as jio
+import numpy as np
+from PIL import Image
+
+from imagesteganography.core.StegoService import StegoService
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.image_header import read_header
+from tests.test_lsb import make_cover
+
+
+class TestCapacity(unittest.TestCase):
+    """Testy pojemności liczonej z samego nagłówka"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = StegoService()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lsb_headers(self):
+        """Test wymiarów z IHDR, DIB i IFD oraz dokładnej pojemności LSB"""
+        for name, mode in (("a.png", "RGB"), ("b.bmp", "RGB"), ("c.tiff", "RGBA"), ("d.png", "L")):
+            path = make_cover(os.path.join(self.tmp.name, name), mode=mode, size=(37, 21))
+            header = read_header(path)
+            self.assertEqual((header.width, header.height), (37, 21))
+
+            capacity = self.service.capacity(path)
+            expected = 37 * 21 * 3 - 32
+            self.assertEqual(capacity, expected)
+            self.assertEqual((capacity.bits, capacity.bytes), (expected, expected // 8))
+            fmt = ImageFormat.from_path(path)
+            out = os.path.join(self.tmp.name, "out" + os.path.splitext(name)[1])
+            self.service.hide_bytes(path, bytes(capacity.bytes), fmt, out)
+            with self.assertRaises(ValueError):
+                self.service.hide_bytes(path, bytes(capacity.bytes + 1), fmt, out)
+
+    def test_tiff_big_endian(self):
+        """Test IFD w kolejności MM (ImageWidth jako SHORT, ImageLength jako LONG)"""
+        ifd = struct.pack(">H", 2)
+        ifd += struct.pack(">HHIH2x", 256, 3, 1, 300)
+        ifd += struct.pack(">HHII", 257, 4, 1, 7)
+        header = read_header(b"MM\x00*" + struct.pack(">I", 8) + ifd + bytes(4))
+        self.assertEqual((header.format, header.width, header.height), (ImageFormat.TIFF, 300, 7))
+
+    def test_jpeg_matches_jpegio(self):
+        """Test JPEG: liczba współczynników z SOF = rozmiar tablic jpegio"""
+        rng = np.random.default_rng(5)
+        img = Image.fromarray(rng.integers(0, 256, (117, 161, 3), dtype=np.uint8))
+        for subsampling in (0, 1, 2):
+            path = os.path.join(self.tmp.name, f"s{subsampling}.jpg")
+            img.save(path, quality=80, subsampling=subsampling, exif=b"Exif\x00\x00" + bytes(5000))
+            jpeg = jio.read(path)
+            expected = sum(arr.size for arr in jpeg.coef_arrays) - 32
+            self.assertEqual(self.service.capacity(path), expected)
+
+        # jsteg zależy od wartości współczynników - nadal dokładnie
+        full = self.service.capacity(path, ImageFormat.JPEG, jsteg=True)
+        self.assertLess(full, expected)
+
+    def test_stream_position(self):
+        """Test obiektu plikowego: pozycja wraca na początek"""
+        path = make_cover(os.path.join(self.tmp.name, "a.png"))
+        with open(path, "rb") as f:
+            stream = io.BytesIO(f.read())
+        self.service.capacity(stream, ImageFormat.PNG)
+        self.assertEqual(stream.tell(), 0)
+        with self.assertRaises(ValueError):
+            read_header(stream, ImageFormat.BMP)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from typer.testing import CliRunner
+
+from imagesteganography.cli.cli import app
+from tests.test_lsb import make_cover
+
+
+class TestBatchCommand(unittest.TestCase):
+    """Testy komendy 'stego batch'"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.runner = CliRunner()
+        self.covers = [make_cover(os.path.join(self.tmp.name, f"cover{i}.png")) for i in range(3)]
+        self.results = os.path.join(self.tmp.name, "results.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _batch(self, *args: str):
+        return self.runner.invoke(app, ["batch", *args, "--results", self.results, "--workers", "1"])
+
+    def _results(self) -> list[dict]:
+        with open(self.results, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_glob_and_resume(self):
+        """Test wzorca glob oraz wznowienia (zakończone zadania są pomijane)"""
+        pattern = os.path.join(self.tmp.name, "*.png")
+        result = self._batch(pattern, "--message", "abc")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(len(self._results()), 3)
+
+        # wyniki *_stego.png pasują do wzorca, ale nie są nowymi zadaniami
+        result = self._batch(pattern, "--message", "abc")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(len(self._results()), 3)
+
+        outputs = [os.path.join(self.tmp.name, f"cover{i}_stego.png") for i in range(3)]
+        self.results = os.path.join(self.tmp.name, "revealed.jsonl")
+        self.assertEqual(self._batch(outputs[0], "--reveal").exit_code, 0)
+        self.assertEqual(self._results()[0]["message"], "abc")
+
+    def test_manifest_with_errors(self):
+        """Test manifestu JSONL z plikiem danych i zadaniem kończącym się błędem"""
+        payload = os.path.join(self.tmp.name, "payload.bin")
+        with open(payload, "wb") as f:
+            f.write(b"\x00\x01\x02")
+        rows = [
+            {"image": self.covers[0], "payload": payload, "output": os.path.join(self.tmp.name, "a.png")},
+            {"image": self.covers[1], "message": "x" * 10000},
+        ]
+        source = os.path.join(self.tmp.name, "jobs.jsonl")
+        with open(source, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+
+        result = self._batch(source)
+        self.assertEqual(result.exit_code, 1)
+        records = {r["image"]: r for r in self._results()}
+        self.assertTrue(records[self.covers[0]]["ok"])
+        self.assertFalse(records[self.covers[1]]["ok"])
+        self.assertIn("ValueError", records[self.covers[1]]["error"])
+
+
+class TestStdio(unittest.TestCase):
+    """Testy '-' (stdin/stdout) w encode i decode"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.runner = CliRunner()
+        with open(make_cover(os.path.join(self.tmp.name, "cover.png")), "rb") as f:
+            self.cover = f.read()
+        self.payload = os.path.join(self.tmp.name, "payload.bin")
+        with open(self.payload, "wb") as f:
+            f.write(b"\x00\xffsekret")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_pipeline(self):
+        """Test: obraz ze stdin, dane z pliku, wynik na stdout i z powrotem"""
+        encoded = self.runner.invoke(app, ["encode", "-", "--payload-file", self.payload, "-"], input=self.cover)
+        self.assertEqual(encoded.exit_code, 0, encoded.stderr)
+        self.assertTrue(encoded.stdout_bytes.startswith(b"\x89PNG"))
+
+        decoded = self.runner.invoke(app, ["decode", "-", "-o", "-"], input=encoded.stdout_bytes)
+        self.assertEqual(decoded.stdout_bytes, b"\x00\xffsekret")
+
+    def test_payload_from_stdin(self):
+        """Test: dane ze stdin, obraz z pliku"""
+        cover = os.path.join(self.tmp.name, "cover.png")
+        output = os.path.join(self.tmp.name, "out.png")
+        result = self.runner.invoke(app, ["encode", cover, "-p", "-", "-o", output], input=b"tajne")
+        self.assertEqual(result.exit_code, 0, result.stderr)
+        self.assertEqual(self.runner.invoke(app, ["decode", output]).stdout, "tajne\n")
+
+        both = self.runner.invoke(app, ["encode", "-", "-p", "-"], input=self.cover)
+        self.assertNotEqual(both.exit_code, 0)
+
+    def test_in_place_bmp_only(self):
+        """Test: --in-place zapisuje w nośniku BMP, a inne formaty odrzuca bez zmiany pliku"""
+        cover = os.path.join(self.tmp.name, "cover.png")
+        rejected = self.runner.invoke(app, ["encode", cover, "-p", self.payload, "--in-place"])
+        self.assertNotEqual(rejected.exit_code, 0)
+        self.assertIn("BMP", rejected.stderr)
+        with open(cover, "rb") as f:
+            self.assertEqual(f.read(), self.cover)
+
+        bmp = make_cover(os.path.join(self.tmp.name, "cover.bmp"))
+        result = self.runner.invoke(app, ["encode", bmp, "-p", self.payload, "--in-place"])
+        self.assertEqual(result.exit_code, 0, result.stderr)
+        self.assertEqual(self.runner.invoke(app, ["decode", bmp, "-o", "-"]).stdout_bytes, b"\x00\xffsekret")
+
+
+class TestImports(unittest.TestCase):
+    """Testy startu CLI"""
+
+    def test_lazy_imports(self):
+        """Test: serwer, benchmark, loadtest, planer i indeks ładowane dopiero w swoich komendach"""
+        lazy = [
+            "imagesteganography.core.StegoServer",
+            "imagesteganography.utilities.benchmark",
+            "imagesteganography.utilities.loadtest",
+            "imagesteganography.utilities.planner",
+            "imagesteganography.utilities.cover_index",
+        ]
+        code = f"import sys, imagesteganography.cli.cli; print([m for m in {lazy!r} if m in sys.modules])"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), "[]")
+
+        from imagesteganography.utilities import benchmark
+
+        result = CliRunner().invoke(app, ["bench", "--help"])
+        self.assertIn(",".join(map(str, benchmark.DEFAULT_PAYLOADS)), result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
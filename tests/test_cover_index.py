@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from imagesteganography.UX.gui_backend_bridge import GUIBackendBridge
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.cover_index import CoverIndex
+from tests.test_jpeg import make_jpeg_cover
+from tests.test_lsb import make_cover
+
+
+class TestCoverIndex(unittest.TestCase):
+    """Testy trwałego indeksu nośników"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "covers")
+        os.makedirs(self.dir)
+        self.small = make_cover(os.path.join(self.dir, "small.png"), size=(20, 20))
+        self.big = make_cover(os.path.join(self.dir, "big.bmp"), size=(200, 100))
+        self.jpg = make_jpeg_cover(os.path.join(self.dir, "photo.jpg"))
+        self.db = os.path.join(self.tmp.name, "index.sqlite")
+        self.index = CoverIndex(self.db)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_incremental_scan(self):
+        """Test: nowe, niezmienione, zmienione, skopiowane i usunięte pliki"""
+        counts = self.index.scan([self.dir])
+        self.assertEqual((counts["added"], counts["failed"]), (3, 0))
+        self.assertEqual(self.index.scan([self.dir])["unchanged"], 3)
+
+        make_cover(self.small, size=(30, 30))
+        shutil.copy(self.big, os.path.join(self.dir, "copy.bmp"))
+        os.remove(self.jpg)
+        counts = self.index.scan([self.dir])
+        self.assertEqual((counts["added"], counts["updated"], counts["removed"]), (1, 1, 1))
+        self.assertEqual(self.index.get(self.small)["width"], 30)
+
+        # indeks przetrwał zamknięcie bazy
+        self.index.close()
+        self.index = CoverIndex(self.db)
+        self.assertEqual(self.index.get(self.big)["capacity_bits"], 200 * 100 * 3 - 32)
+
+    def test_find(self):
+        """Test wyszukiwania: najmniejszy wystarczający nośnik pierwszy"""
+        self.index.scan([self.dir], jsteg=True)
+        found = [os.path.basename(e["path"]) for e in self.index.find(100)]
+        self.assertEqual(found, ["small.png", "photo.jpg", "big.bmp"])
+        self.assertEqual(len(self.index.find(10 ** 6)), 0)
+        only_jpeg = self.index.find(100, ImageFormat.JPEG, jsteg=True)
+        self.assertLess(only_jpeg[0]["capacity_jsteg_bits"], only_jpeg[0]["capacity_bits"])
+
+    def test_bridge(self):
+        """Test: GUIBackendBridge korzysta z indeksu"""
+        bridge = GUIBackendBridge(cover_index=self.index)
+        ok, capacity, _ = bridge.calculate_capacity(self.jpg)
+        self.assertTrue(ok)
+        self.assertEqual(capacity, self.index.get(self.jpg)["capacity_bytes"])
+        self.assertEqual(bridge.get_image_info(self.big)["mode"], "RGB")
+
+    def test_bridge_without_index(self):
+        """Test: bez indeksu GUIBackendBridge czyta nagłówek i nie tworzy bazy"""
+        bridge = GUIBackendBridge()
+        self.assertIsNone(bridge.cover_index)
+        ok, capacity, _ = bridge.calculate_capacity(self.big)
+        self.assertTrue(ok)
+        self.assertEqual(capacity, (200 * 100 * 3 - 32) // 8)
+        info = bridge.get_image_info(self.jpg)
+        self.assertEqual((info["format"], info["capacity_bytes"]), ("JPEG", self.index.lookup(self.jpg)["capacity_bytes"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
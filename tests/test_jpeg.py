@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+
+import jpegio as jio
+import numpy as np
+from PIL import Image
+
+from imagesteganography.formats.jpeg_backend import JpegStegoBackend
+from imagesteganography.formats.jpeg_prefix_reader import JpegPrefixReader
+
+
+def make_jpeg_cover(path: str, size: tuple[int, int] = (160, 120), quality: int = 90) -> str:
+    """Tworzy losowy obraz-nośnik JPEG."""
+    rng = np.random.default_rng(1234)
+    w, h = size
+    Image.fromarray(rng.integers(0, 256, (h, w, 3), dtype=np.uint8)).save(path, quality=quality)
+    return path
+
+
+class TestJpegRoundTrip(unittest.TestCase):
+    """Testy kodowania/dekodowania w współczynnikach DCT"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cover = make_jpeg_cover(os.path.join(self.tmp.name, "cover.jpg"))
+        self.output = os.path.join(self.tmp.name, "stego.jpg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_message(self):
+        """Test wiadomości tekstowej"""
+        backend = JpegStegoBackend(False, 0.05)
+        msg = "Zażółć gęślą jaźń"
+        backend.encode(self.cover, msg, self.output)
+        self.assertEqual(backend.decode(self.output), msg)
+
+    def test_binary_across_components(self):
+        """Test payloadu binarnego, który przechodzi z Y do Cb/Cr"""
+        backend = JpegStegoBackend(False, 0.05)
+        backend.CHUNK_BYTES = 7
+        payload = os.urandom(2500)  # > 160*120 bitów komponentu Y
+        backend.encode_bytes(self.cover, payload, self.output)
+        self.assertEqual(backend.decode_bytes(self.output), payload)
+
+    def test_with_noise(self):
+        """Test z szumem anti-forensic"""
+        backend = JpegStegoBackend(True, 0.2, noise_seed=1)
+        msg = "tajne" * 20
+        backend.encode(self.cover, msg, self.output)
+        self.assertEqual(backend.decode(self.output), msg)
+
+    def test_noise_only_past_payload(self):
+        """Test czy szum omija payload i zmienia ok. noise_ratio/2 współczynników"""
+        backend = JpegStegoBackend(True, 0.2, noise_seed=3)
+        jpeg = jio.read(self.cover)
+        before = [arr.copy() for arr in jpeg.coef_arrays]
+        offsets = backend._collect_positions(jpeg)
+        backend._apply_anti_forensic_noise(jpeg, offsets, used_bits=1000)
+
+        changed = np.concatenate([(a != b).reshape(-1) for a, b in zip(before, jpeg.coef_arrays)])
+        self.assertFalse(changed[:1000].any())
+        self.assertAlmostEqual(changed[1000:].mean(), 0.1, delta=0.01)
+
+    def test_jsteg(self):
+        """Test trybu jsteg: zmieniane są tylko AC różne od 0 i 1, z szumem"""
+        backend = JpegStegoBackend(True, 0.1, noise_seed=2, jsteg=True)
+        payload = os.urandom(300)
+        backend.encode_bytes(self.cover, payload, self.output)
+        self.assertEqual(backend.decode_bytes(self.output), payload)
+
+        # tablice jpegio wskazują na pamięć obiektu - trzymamy referencje
+        cover, stego = jio.read(self.cover), jio.read(self.output)
+        for before, after in zip(cover.coef_arrays, stego.coef_arrays):
+            changed = before != after
+            self.assertFalse(changed[::8, ::8].any())
+            self.assertFalse(np.isin(before[changed], (0, 1)).any())
+            self.assertFalse(np.isin(after[changed], (0, 1)).any())
+
+    def test_jsteg_long_payload(self):
+        """Test trybu jsteg poza szybką ścieżką prefiksu"""
+        backend = JpegStegoBackend(False, 0.05, jsteg=True)
+        payload = os.urandom(1500)
+        backend.encode_bytes(self.cover, payload, self.output)
+        self.assertEqual(backend.decode_bytes(self.output), payload)
+
+    def test_read_range(self):
+        """Test odczytu fragmentu: szybka ścieżka, pełny odczyt i jsteg"""
+        payload = os.urandom(2500)
+        for jsteg, size in ((False, 2500), (True, 1500)):
+            backend = JpegStegoBackend(False, 0.05, jsteg=jsteg)
+            backend.encode_bytes(self.cover, payload[:size], self.output)
+            for offset, length in ((0, 16), (40, 8), (size - 300, 300), (size, 0)):
+                with self.subTest(jsteg=jsteg, offset=offset):
+                    self.assertEqual(
+                        backend.read_range(self.output, offset, length), payload[offset : offset + length]
+                    )
+            with self.assertRaises(ValueError):
+                backend.read_range(self.output, size - 1, 2)
+
+    def test_too_long(self):
+        """Test wiadomości przekraczającej pojemność"""
+        backend = JpegStegoBackend(False, 0.05)
+        with self.assertRaises(ValueError):
+            backend.encode_bytes(self.cover, bytes(10000), self.output)
+
+
+class TestJpegPrefixReader(unittest.TestCase):
+    """Testy częściowego dekodowania współczynników komponentu Y"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cover.jpg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _check_against_jpegio(self, **save_kwargs):
+        rng = np.random.default_rng(7)
+        img = Image.fromarray(rng.integers(0, 256, (117, 161, 3), dtype=np.uint8))
+        img.save(self.path, quality=85, **save_kwargs)
+
+        full = jio.read(self.path)
+        with JpegPrefixReader(self.path) as reader:
+            self.assertTrue(reader.supported)
+            self.assertEqual(reader.component_shapes, [a.shape for a in full.coef_arrays])
+            expected = full.coef_arrays[0].reshape(-1)
+            for count in (32, 1000, len(expected)):
+                self.assertTrue((reader.read(count) == expected[:count]).all())
+
+    def test_subsampled(self):
+        """Test 4:2:0 z blokami dopełniającymi na krawędziach"""
+        self._check_against_jpegio(subsampling=2)
+
+    def test_no_subsampling(self):
+        """Test 4:4:4"""
+        self._check_against_jpegio(subsampling=0)
+
+    def test_restart_markers(self):
+        """Test znaczników RST"""
+        self._check_against_jpegio(subsampling=2, restart_marker_blocks=3)
+
+    def test_progressive_not_supported(self):
+        """JPEG progresywny -> pełne dekodowanie przez jpegio"""
+        make_jpeg_cover(self.path)
+        Image.open(self.path).save(self.path, progressive=True)
+        with JpegPrefixReader(self.path) as reader:
+            self.assertFalse(reader.supported)
+            self.assertIsNone(reader.read(32))
+
+        backend = JpegStegoBackend(False, 0.05)
+        output = os.path.join(self.tmp.name, "stego.jpg")
+        backend.encode(self.path, "abc", output)
+        self.assertEqual(backend.decode(output), "abc")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import threading
+import unittest
+
+from imagesteganography.core.StegoServer import StegoServer
+from imagesteganography.utilities import loadtest
+from imagesteganography.utilities.ImageFormat import ImageFormat
+
+
+class TestLoadTest(unittest.TestCase):
+    """Testy generatora obciążenia"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cases = loadtest.build_cases([ImageFormat.PNG, ImageFormat.JPEG], [0.02], [64, 10 ** 6])
+
+    def test_cases(self):
+        """Test przypadków: za duże dane są pomijane"""
+        self.assertEqual([c.name for c in self.cases], ["png/0.02MP/64B", "jpeg/0.02MP/64B"])
+
+    def test_in_process(self):
+        """Test pętli zamkniętej i otwartej na StegoService w procesie"""
+        target = loadtest.ServiceTarget()
+        report = loadtest.run_load(target, self.cases, concurrency=2, duration=None, requests=12)
+        self.assertEqual((report["requests"], report["errors"]), (12, 0))
+        self.assertLessEqual(report["latency"]["p50_ms"], report["latency"]["p99_ms"])
+
+        report = loadtest.run_load(target, self.cases, rate=50, duration=None, requests=5)
+        self.assertEqual(report["requests"], 5)
+
+    def test_http(self):
+        """Test przez 'stego serve' z odrzuconymi żądaniami (503) liczonymi jako błędy"""
+        with StegoServer(port=0, workers=1, queue_size=1, log_requests=False) as server:
+            threading.Thread(target=server.httpd.serve_forever, daemon=True).start()
+            host, port = server.address
+            target = loadtest.HttpTarget(f"http://{host}:{port}")
+            report = loadtest.run_load(target, self.cases, concurrency=1, duration=None, requests=6)
+            self.assertEqual(report["errors"], 0)
+
+            server.acquire_slot()
+            report = loadtest.run_load(target, self.cases, concurrency=1, duration=None, requests=2)
+            server.release_slot()
+            self.assertEqual(report["error_rate"], 1.0)
+            self.assertEqual(report["error_types"], {"RuntimeError: HTTP 503": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+import io
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from imagesteganography.formats.bmp_backend import BmpStegoBackend
+from imagesteganography.formats.bmp_mmap import MappedBmp
+from imagesteganography.formats.png_backend import PngStegoBackend
+from imagesteganography.formats.png_prefix_reader import PngPrefixReader
+from imagesteganography.formats.tiff_backend import TiffStegoBackend
+
+
+def make_cover(path: str, mode: str = "RGB", size: tuple[int, int] = (64, 48)) -> str:
+    """Tworzy losowy obraz-nośnik w podanym trybie."""
+    rng = np.random.default_rng(1234)
+    w, h = size
+    channels = {"RGB": 3, "RGBA": 4}.get(mode)
+    shape = (h, w, channels) if channels else (h, w)
+    Image.fromarray(rng.integers(0, 256, shape, dtype=np.uint8)).convert(mode).save(path)
+    return path
+
+
+class TestLsbRoundTrip(unittest.TestCase):
+    """Testy kodowania/dekodowania LSB dla formatów bezstratnych"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _round_trip(self, backend, ext: str, mode: str, message: str):
+        cover = make_cover(os.path.join(self.dir, f"cover.{ext}"), mode)
+        output = os.path.join(self.dir, f"stego.{ext}")
+        backend.encode(cover, message, output)
+        return backend.decode(output)
+
+    def test_png_rgb(self):
+        """Test PNG RGB"""
+        msg = "Zażółć gęślą jaźń"
+        self.assertEqual(self._round_trip(PngStegoBackend(False, 0.05), "png", "RGB", msg), msg)
+
+    def test_png_rgba(self):
+        """Test PNG RGBA - kanał alfa nie jest używany"""
+        msg = "Hello 😀" * 10
+        self.assertEqual(self._round_trip(PngStegoBackend(False, 0.05), "png", "RGBA", msg), msg)
+
+    def test_png_grayscale(self):
+        """Test PNG w skali szarości (konwersja do RGBA)"""
+        msg = "Linia 1\nLinia 2"
+        self.assertEqual(self._round_trip(PngStegoBackend(False, 0.05), "png", "L", msg), msg)
+
+    def test_bmp(self):
+        """Test BMP"""
+        msg = "A" * 1000
+        self.assertEqual(self._round_trip(BmpStegoBackend(False, 0.05), "bmp", "RGB", msg), msg)
+
+    def test_tiff(self):
+        """Test TIFF"""
+        msg = "!@#$%^&*()_+{}|:\"<>?"
+        self.assertEqual(self._round_trip(TiffStegoBackend(False, 0.05), "tiff", "RGB", msg), msg)
+
+    def test_empty_message(self):
+        """Test pustej wiadomości"""
+        self.assertEqual(self._round_trip(PngStegoBackend(False, 0.05), "png", "RGB", ""), "")
+
+    def test_with_noise(self):
+        """Test z szumem anti-forensic - wiadomość musi pozostać nienaruszona"""
+        msg = "tajne"
+        self.assertEqual(self._round_trip(PngStegoBackend(True, 0.5), "png", "RGB", msg), msg)
+
+    def test_noise_seed_reproducible(self):
+        """Test czy ten sam seed daje identyczny szum, a różny - inny"""
+        cover = make_cover(os.path.join(self.dir, "cover.png"))
+        outputs = []
+        for i, seed in enumerate((7, 7, 8)):
+            output = os.path.join(self.dir, f"stego_{i}.png")
+            PngStegoBackend(True, 0.3, noise_seed=seed).encode(cover, "abc", output)
+            outputs.append(np.array(Image.open(output)))
+        self.assertTrue((outputs[0] == outputs[1]).all())
+        self.assertFalse((outputs[0] == outputs[2]).all())
+
+    def test_noise_ratio(self):
+        """Test czy odsetek zaszumionych pozycji odpowiada 'noise_ratio'"""
+        arr = np.zeros((200, 300, 3), dtype=np.uint8)
+        PngStegoBackend(True, 0.1)._add_lsb_noise(arr, used_bits=600, noise_ratio=0.1, seed=1)
+        flat = arr.reshape(-1)
+        self.assertFalse(flat[:600].any())
+        # połowa wylosowanych bitów to 1 -> ok. 5% jedynek
+        self.assertAlmostEqual(flat[600:].mean(), 0.05, delta=0.005)
+
+    def test_binary_payload(self):
+        """Test danych binarnych (bez UTF-8) przez encode_bytes/decode_bytes"""
+        backend = PngStegoBackend(False, 0.05)
+        payload = bytes(range(256)) * 3
+        cover = make_cover(os.path.join(self.dir, "cover.png"))
+        output = os.path.join(self.dir, "stego.png")
+        backend.encode_bytes(cover, payload, output)
+        self.assertEqual(backend.decode_bytes(output), payload)
+
+    def test_payload_across_chunks(self):
+        """Test payloadu dłuższego niż jedna porcja rozpakowywania bitów"""
+        backend = BmpStegoBackend(False, 0.05)
+        backend.CHUNK_BYTES = 7  # wymusza nierówne granice porcji względem pikseli
+        payload = os.urandom(500)
+        cover = make_cover(os.path.join(self.dir, "cover.bmp"), "RGBA")
+        output = os.path.join(self.dir, "stego.bmp")
+        backend.encode_bytes(cover, memoryview(payload), output)
+        self.assertEqual(backend.decode_bytes(output), payload)
+
+    def test_read_range(self):
+        """Test odczytu fragmentu danych tylko z potrzebnych wierszy"""
+        backend = PngStegoBackend(False, 0.05)
+        payload = os.urandom(1000)
+        cover = make_cover(os.path.join(self.dir, "cover.png"), "RGBA")
+        output = os.path.join(self.dir, "stego.png")
+        backend.encode_bytes(cover, payload, output)
+
+        rows = []
+        read_rows = backend._rows_array
+        backend._rows_array = lambda img, a, b: rows.append((a, b)) or read_rows(img, a, b)
+        for offset, length in ((0, 10), (517, 3), (990, 10), (999, 1), (1000, 0)):
+            self.assertEqual(backend.read_range(output, offset, length), payload[offset : offset + length])
+        self.assertEqual(backend.read_range(output, 900), payload[900:])
+
+        # 3 B od bajtu 517: bity 4168..4191 -> piksele 1389..1397 -> wiersze 21..21
+        self.assertIn((21, 22), rows)
+        with self.assertRaises(ValueError):
+            backend.read_range(output, 995, 10)
+        with self.assertRaises(ValueError):
+            backend.read_range(output, -1, 1)
+
+    def test_too_long(self):
+        """Test wiadomości przekraczającej pojemność"""
+        backend = PngStegoBackend(False, 0.05)
+        cover = make_cover(os.path.join(self.dir, "small.png"), size=(4, 4))
+        with self.assertRaises(ValueError):
+            backend.encode(cover, "x" * 100, os.path.join(self.dir, "out.png"))
+
+    def test_only_lsb_changes(self):
+        """Test czy zmieniane są wyłącznie najmłodsze bity kanałów RGB"""
+        backend = PngStegoBackend(False, 0.05)
+        cover = make_cover(os.path.join(self.dir, "cover.png"), "RGBA")
+        output = os.path.join(self.dir, "stego.png")
+        backend.encode(cover, "x" * 200, output)
+
+        before = np.array(Image.open(cover)).astype(np.int16)
+        after = np.array(Image.open(output)).astype(np.int16)
+        self.assertTrue((np.abs(before - after) <= 1).all())
+        self.assertTrue((before[..., 3] == after[..., 3]).all())
+
+
+class TestMappedBmp(unittest.TestCase):
+    """Testy szybkiej ścieżki BMP (plik zmapowany w pamięci)"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.payload = os.urandom(700)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cover(self, mode: str, size=(61, 47)) -> str:
+        # szerokość 61: wiersze 24-bitowe mają 1 bajt wyrównania
+        return make_cover(os.path.join(self.dir, f"cover_{mode}.bmp"), mode, size)
+
+    def _top_down(self, path: str) -> str:
+        """Ten sam obraz z wierszami od góry (ujemna wysokość)."""
+        with open(path, "rb") as f:
+            data = bytearray(f.read())
+        (offset,) = struct.unpack_from("<I", data, 10)
+        width, height, _, bpp = struct.unpack_from("<iiHH", data, 18)
+        stride = (width * bpp + 31) // 32 * 4
+        rows = [data[offset + i * stride : offset + (i + 1) * stride] for i in range(height)]
+        data[offset:] = b"".join(reversed(rows))
+        struct.pack_into("<i", data, 22, -height)
+        out = os.path.join(self.dir, "top_down.bmp")
+        with open(out, "wb") as f:
+            f.write(data)
+        return out
+
+    def test_same_pixels_as_pillow(self):
+        """Test: te same piksele co ścieżka przez Pillowa, także z szumem"""
+        for mode in ("RGB", "RGBA"):
+            with self.subTest(mode=mode):
+                cover = self._cover(mode)
+                backend = BmpStegoBackend(True, 0.3, noise_seed=5)
+                mapped = os.path.join(self.dir, "mapped.bmp")
+                backend.encode_bytes(cover, self.payload, mapped)
+                with open(cover, "rb") as f:
+                    pillow = backend.encode_bytes(f.read(), self.payload, None)
+
+                self.assertEqual(os.path.getsize(mapped), os.path.getsize(cover))
+                expected = np.array(Image.open(io.BytesIO(pillow)).convert("RGB"))
+                self.assertTrue((np.array(Image.open(mapped).convert("RGB")) == expected).all())
+                self.assertEqual(backend.decode_bytes(mapped), self.payload)
+                self.assertEqual(backend.read_range(mapped, 300, 50), self.payload[300:350])
+
+    def test_top_down_and_in_place(self):
+        """Test: wiersze od góry i zapis w samym nośniku"""
+        cover = self._top_down(self._cover("RGB"))
+        backend = BmpStegoBackend(False, 0.05)
+        self.assertEqual(backend.encode_bytes(cover, self.payload, cover), cover)
+        self.assertEqual(BmpStegoBackend(False, 0.05)._decode_lsb(cover), self.payload)
+        with MappedBmp(cover) as pixels:
+            self.assertEqual(pixels.size, (61, 47))
+
+    def test_fallback(self):
+        """Test: BMP z paletą idzie przez Pillowa"""
+        cover = self._cover("P")
+        with self.assertRaises(ValueError):
+            MappedBmp(cover)
+        backend = BmpStegoBackend(False, 0.05)
+        output = os.path.join(self.dir, "out.bmp")
+        backend.encode_bytes(cover, self.payload, output)
+        self.assertEqual(backend.decode_bytes(output), self.payload)
+
+    def test_too_long_leaves_no_output(self):
+        """Test: za długie dane - błąd przed skopiowaniem nośnika"""
+        output = os.path.join(self.dir, "out.bmp")
+        with self.assertRaises(ValueError):
+            BmpStegoBackend(False, 0.05).encode_bytes(self._cover("RGB", (8, 8)), self.payload, output)
+        self.assertFalse(os.path.exists(output))
+
+
+class TestPngPrefixReader(unittest.TestCase):
+    """Testy odczytu PNG tylko do potrzebnego wiersza"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_rows_as_pillow(self):
+        """Test: wiersze jak z Pillowa dla różnych trybów (gradient, szum i płaskie pasy - różne filtry)"""
+        rng = np.random.default_rng(3)
+        y, x = np.mgrid[0:40, 0:50]
+        rgb = np.dstack(((x * 5) % 256, (y * 3) % 256, (x + y) % 256)).astype(np.uint8)
+        rgb[10:20] = rng.integers(0, 256, (10, 50, 3))
+        rgb[25:30] = 100
+        base = Image.fromarray(rgb)
+        images = {mode: base.convert(mode) for mode in ("RGB", "RGBA", "L", "LA", "P", "1")}
+        images["P"].info["transparency"] = 5
+        images["I;16"] = Image.fromarray(rgb[..., 0].astype(np.uint16) * 257)
+
+        backend = PngStegoBackend(False, 0.05)
+        for mode, img in images.items():
+            with self.subTest(mode=mode):
+                path = os.path.join(self.dir, f"{mode.replace(';', '')}.png")
+                img.save(path)
+                with Image.open(path) as full, PngPrefixReader(path) as reader:
+                    for first, end in ((0, 1), (3, 12), (12, 40)):
+                        expected = backend._rows_array(full, first, end)
+                        self.assertTrue((backend._rows_array(reader, first, end) == expected).all())
+
+    def test_reads_only_prefix(self):
+        """Test: krótka wiadomość w dużym obrazie - czytamy tylko początek pliku"""
+        cover = make_cover(os.path.join(self.dir, "cover.png"), size=(1200, 800))
+        output = os.path.join(self.dir, "stego.png")
+        backend = PngStegoBackend(False, 0.05)
+        backend.encode(cover, "krótko", output)
+
+        with PngPrefixReader(output) as reader:
+            self.assertEqual(backend._decode_lsb_image(reader).decode("utf-8"), "krótko")
+            self.assertLess(reader._file.tell(), 20_000)
+        with open(output, "rb") as f:
+            self.assertEqual(backend.decode(f.read()), "krótko")
+
+    def test_interlaced_fallback(self):
+        """Test: PNG z przeplotem nie jest obsługiwany przez czytnik"""
+        path = make_cover(os.path.join(self.dir, "one.png"), size=(1, 1))
+        with open(path, "rb") as f:
+            data = bytearray(f.read())
+        data[28] = 1  # interlace w IHDR; dla 1x1 dane Adam7 są takie same
+        struct.pack_into(">I", data, 29, zlib.crc32(bytes(data[12:29])))
+        with PngPrefixReader(bytes(data)) as reader:
+            self.assertFalse(reader.supported)
+        self.assertEqual(Image.open(io.BytesIO(data)).size, (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from imagesteganography.core.StegoService import StegoService
+from imagesteganography.utilities import planner
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.cover_index import CoverIndex
+from tests.test_lsb import make_cover
+
+
+class TestPlanner(unittest.TestCase):
+    """Testy doboru nośników do danych"""
+
+    covers = {"a": 800, "b": 1600, "c": 8000, "d": 80000}
+
+    def test_tight(self):
+        """Test: najmniejszy pasujący nośnik, duże zostają wolne"""
+        assignments, unplaced = planner.plan({"x": 90, "y": 150}, self.covers)
+        self.assertEqual({a.payload: a.cover for a in assignments}, {"x": "a", "y": "b"})
+        self.assertEqual(unplaced, [])
+
+    def test_balanced(self):
+        """Test: minimalne największe zapełnienie przy tej samej liczbie przydziałów"""
+        assignments, _ = planner.plan({"x": 90, "y": 150}, self.covers, "balanced")
+        self.assertEqual({a.payload: a.cover for a in assignments}, {"x": "c", "y": "d"})
+
+        # trzy dane - najmniejsze musi zająć 'b', choć zapełnienie jest wtedy wyższe
+        assignments, _ = planner.plan({"x": 90, "y": 150, "z": 190}, self.covers, "balanced")
+        self.assertEqual(sorted(a.cover for a in assignments), ["b", "c", "d"])
+
+    def test_balanced_empty_payloads(self):
+        """Test: same puste dane w strategii 'balanced' (zapełnienie 0)"""
+        assignments, unplaced = planner.plan({"a": 0, "b": 0}, {"x": 800, "y": 1600}, "balanced")
+        self.assertEqual(sorted(a.cover for a in assignments), ["x", "y"])
+        self.assertEqual(unplaced, [])
+
+    def test_unplaced(self):
+        """Test: dane większe od każdego nośnika nie dostają przydziału"""
+        assignments, unplaced = planner.plan({"x": 20000, "y": 5000, "z": 900}, self.covers)
+        self.assertEqual(unplaced, ["x"])
+        self.assertEqual({a.payload: a.cover for a in assignments}, {"y": "d", "z": "c"})
+
+    def test_embed_from_index(self):
+        """Test planu z indeksu i równoległego osadzania"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, size in (("small.png", (16, 16)), ("big.png", (64, 64))):
+                make_cover(os.path.join(tmp, name), size=size)
+            payloads = []
+            for name, size in (("p1.bin", 60), ("p2.bin", 600)):
+                payloads.append(os.path.join(tmp, name))
+                with open(payloads[-1], "wb") as f:
+                    f.write(os.urandom(size))
+
+            service = StegoService()
+            with CoverIndex(os.path.join(tmp, "index.sqlite"), service) as index:
+                index.scan([os.path.join(tmp, "*.png")])
+                assignments, unplaced = planner.plan_from_index(payloads, index, ImageFormat.PNG)
+            self.assertEqual(unplaced, [])
+            planner.assign_outputs(assignments, os.path.join(tmp, "out"))
+            os.makedirs(os.path.join(tmp, "out"))
+
+            results = list(planner.embed(service, assignments, workers=1))
+            self.assertTrue(all(r.ok for r in results))
+            for a in assignments:
+                with open(a.payload, "rb") as f:
+                    self.assertEqual(service.reveal_bytes(a.output, ImageFormat.PNG), f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
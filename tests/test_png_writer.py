@@ -0,0 +1,82 @@
+import io
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from imagesteganography.formats.png_backend import PngStegoBackend
+from imagesteganography.formats.png_writer import ParallelPngWriter
+
+
+def idat_stream(data: bytes) -> bytes:
+    """Sklejone dane wszystkich chunków IDAT."""
+    out, pos = b"", 8
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        if kind == b"IDAT":
+            out += data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+    return out
+
+
+class TestParallelPngWriter(unittest.TestCase):
+    """Testy wielowątkowego zapisu PNG"""
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        y, x = np.mgrid[0:90, 0:70]
+        self.rgb = rng.integers(0, 256, (90, 70, 3), dtype=np.uint8)
+        self.rgb[:40] = np.dstack(((x + y) % 256, (x * 2) % 256, y % 256))[:40]  # gładki fragment
+        self.rgb[60:70] = 42
+        limit = ParallelPngWriter.SEGMENT_BYTES
+        ParallelPngWriter.SEGMENT_BYTES = 1000  # wiele segmentów także w małym obrazie
+        self.addCleanup(setattr, ParallelPngWriter, "SEGMENT_BYTES", limit)
+
+    def _write(self, arr: np.ndarray, threads: int = 3, level: int = 6) -> bytes:
+        buffer = io.BytesIO()
+        ParallelPngWriter(threads, level).write(arr, buffer)
+        return buffer.getvalue()
+
+    def test_valid_png(self):
+        """Test: poprawny strumień zlib (z Adler-32) i te same piksele po odczycie"""
+        rgba = np.dstack((self.rgb, np.arange(90 * 70, dtype=np.uint32).reshape(90, 70).astype(np.uint8)))
+        for arr in (self.rgb, rgba, self.rgb[:1, :1]):
+            for level in (0, 1, 6, 9):
+                with self.subTest(shape=arr.shape, level=level):
+                    data = self._write(arr, level=level)
+                    raw = zlib.decompress(idat_stream(data))
+                    self.assertEqual(len(raw), arr.shape[0] * (1 + arr.shape[1] * arr.shape[2]))
+                    self.assertTrue((np.array(Image.open(io.BytesIO(data))) == arr).all())
+
+    def test_same_output_for_any_thread_count(self):
+        """Test: wynik nie zależy od liczby wątków"""
+        self.assertEqual(self._write(self.rgb, threads=1), self._write(self.rgb, threads=4))
+
+    def test_backend(self):
+        """Test backendu PNG z zapisem wielowątkowym: ścieżka, bajty i strumień"""
+        payload = os.urandom(1500)
+        backend = PngStegoBackend(True, 0.2, noise_seed=3, writer_threads=2, compress_level=9)
+        pillow = PngStegoBackend(True, 0.2, noise_seed=3, writer_threads=0)
+        cover = io.BytesIO()
+        Image.fromarray(self.rgb).save(cover, format="PNG")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "stego.png")
+            self.assertEqual(backend.encode_bytes(cover.getvalue(), payload, output), output)
+            expected = pillow.encode_bytes(cover.getvalue(), payload, None)
+            self.assertTrue((np.array(Image.open(output)) == np.array(Image.open(io.BytesIO(expected)))).all())
+            self.assertEqual(backend.decode_bytes(output), payload)
+
+        self.assertEqual(backend.decode_bytes(backend.encode_bytes(cover.getvalue(), payload, None)), payload)
+        stream = backend.encode_bytes(cover, payload, None)
+        self.assertEqual(stream.tell(), 0)
+        self.assertEqual(backend.decode_bytes(stream), payload)
+        self.assertIsInstance(backend.encode_bytes(self.rgb, payload, None), np.ndarray)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import http.client
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from imagesteganography.core.StegoServer import StegoServer
+from tests.test_lsb import make_cover
+
+
+class TestStegoServer(unittest.TestCase):
+    """Testy serwera HTTP z pulą procesów"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StegoServer(port=0, workers=1, queue_size=1, log_requests=False)
+        cls.server.warm_up()
+        cls.thread = threading.Thread(target=cls.server.httpd.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(make_cover(os.path.join(self.tmp.name, "cover.png")), "rb") as f:
+            self.cover = f.read()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _post(self, path: str, body: bytes, headers: dict | None = None):
+        conn = http.client.HTTPConnection(*self.server.address)
+        conn.request("POST", path, body, headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        return response.status, data
+
+    def test_round_trip(self):
+        """Test /encode, /decode i /capacity"""
+        payload = b"\x00tajne\xff"
+        status, stego = self._post("/encode?format=png&noise=1&seed=1", payload + self.cover,
+                                   {"X-Payload-Length": str(len(payload))})
+        self.assertEqual(status, 200)
+        self.assertEqual(self._post("/decode?format=png", stego), (200, payload))
+
+        status, data = self._post("/capacity?format=png", self.cover)
+        self.assertEqual(json.loads(data)["bits"], 64 * 48 * 3 - 32)
+
+    def test_errors(self):
+        """Test błędów: za długie dane, zły format, nieznany endpoint"""
+        payload = bytes(10000)
+        status, data = self._post("/encode?format=png", payload + self.cover,
+                                  {"X-Payload-Length": str(len(payload))})
+        self.assertEqual(status, 400)
+        self.assertIn("ValueError", json.loads(data)["error"])
+        self.assertEqual(self._post("/decode?format=gif", self.cover)[0], 400)
+        self.assertEqual(self._post("/nope", b"")[0], 404)
+
+    def test_backpressure(self):
+        """Test 503, gdy wszystkie miejsca w kolejce są zajęte"""
+        self.server.acquire_slot()
+        try:
+            status, _ = self._post("/decode?format=png", self.cover)
+            self.assertEqual(status, 503)
+        finally:
+            self.server.release_slot()
+
+    def test_bad_content_length(self):
+        """Test 400 dla nieliczbowego i ujemnego Content-Length (bez czytania ciała)"""
+        for value in ("abc", "-1"):
+            with self.subTest(value=value):
+                conn = http.client.HTTPConnection(*self.server.address)
+                conn.putrequest("POST", "/decode?format=png")
+                conn.putheader("Content-Length", value)
+                conn.endheaders()
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+                self.assertEqual(response.status, 400)
+        self.assertEqual(self.server.in_flight, 0)
+
+
+class TestStegoServerFailures(unittest.TestCase):
+    """Testy awarii puli i przekroczenia czasu"""
+
+    def _post(self, server, path: str, body: bytes, headers: dict | None = None):
+        conn = http.client.HTTPConnection(*server.address)
+        conn.request("POST", path, body, headers or {})
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        return response.status
+
+    def _serve(self, **kwargs) -> StegoServer:
+        server = StegoServer(port=0, workers=1, queue_size=1, log_requests=False, **kwargs)
+        self.addCleanup(server.shutdown)
+        server.warm_up()
+        threading.Thread(target=server.httpd.serve_forever, daemon=True).start()
+        return server
+
+    def _cover(self, size=(64, 48)) -> bytes:
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(make_cover(os.path.join(tmp, "cover.png"), size=size), "rb") as f:
+                return f.read()
+
+    def test_broken_pool_restarted(self):
+        """Test: padnięty proces roboczy - 503, a kolejne żądanie idzie już do nowej puli"""
+        server = self._serve()
+        broken = server.pool
+        for process in multiprocessing.active_children():
+            process.kill()
+            process.join()
+        cover = self._cover()
+        self.assertEqual(self._post(server, "/capacity?format=png", cover), 503)
+        self.assertIsNot(server.pool, broken)
+        self.assertEqual(self._post(server, "/capacity?format=png", cover), 200)
+        self.assertEqual(server.in_flight, 0)
+
+    def test_timeout_keeps_slot(self):
+        """Test: po 504 miejsce w kolejce zwalnia dopiero koniec zadania w puli"""
+        server = self._serve(job_timeout=0.001)
+        cover = self._cover((1500, 1000))  # zapis trwa dłużej niż limit
+        self.assertEqual(self._post(server, "/encode?format=png", b"x" + cover, {"X-Payload-Length": "1"}), 504)
+        self.assertEqual(server.in_flight, 1)
+        self.assertEqual(self._post(server, "/capacity?format=png", b""), 503)
+
+        deadline = time.monotonic() + 30
+        while server.in_flight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(server.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
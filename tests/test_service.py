@@ -0,0 +1,207 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from imagesteganography.core import StegoBatch
+from imagesteganography.core.StegoBatch import HideJob, JobResult, RevealJob, run_jobs
+from imagesteganography.core.StegoService import StegoService
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.StegoBackendFactory import StegoBackendFactory
+from tests.test_jpeg import make_jpeg_cover
+from tests.test_lsb import make_cover
+
+
+class TestInMemory(unittest.TestCase):
+    """Testy kodowania/dekodowania bez plików na dysku"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = StegoService()
+        self.png = make_cover(os.path.join(self.tmp.name, "cover.png"))
+        self.jpg = make_jpeg_cover(os.path.join(self.tmp.name, "cover.jpg"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_bytes(self):
+        """Test bytes -> bytes"""
+        result = self.service.hide_message(self._read(self.png), "abc", ImageFormat.PNG)
+        self.assertIsInstance(result, bytes)
+        self.assertEqual(self.service.reveal_message(result, ImageFormat.PNG), "abc")
+
+    def test_file_like(self):
+        """Test obiekt plikowy -> BytesIO oraz zapis do podanego strumienia"""
+        with open(self.png, "rb") as f:
+            result = self.service.hide_message(f, "abc", ImageFormat.PNG)
+        self.assertIsInstance(result, io.BytesIO)
+        self.assertEqual(self.service.reveal_message(result, ImageFormat.PNG), "abc")
+
+        target = io.BytesIO()
+        self.assertIs(self.service.hide_message(self.png, "xyz", ImageFormat.PNG, target), target)
+        target.seek(0)
+        self.assertEqual(self.service.reveal_message(target, ImageFormat.PNG), "xyz")
+
+    def test_pil_image(self):
+        """Test obraz PIL -> obraz PIL (wejście nie jest modyfikowane)"""
+        cover = Image.open(self.png)
+        before = np.array(cover)
+        result = self.service.hide_message(cover, "abc", ImageFormat.PNG)
+        self.assertIsInstance(result, Image.Image)
+        self.assertTrue((np.array(cover) == before).all())
+        self.assertEqual(self.service.reveal_message(result, ImageFormat.PNG), "abc")
+
+    def test_numpy_array(self):
+        """Test tablica NumPy -> tablica NumPy"""
+        cover = np.array(Image.open(self.png))
+        result = self.service.hide_bytes(cover, b"\x00\xff", ImageFormat.BMP)
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(self.service.reveal_bytes(result, ImageFormat.BMP), b"\x00\xff")
+
+    def test_path_default_output(self):
+        """Test ścieżki bez output_path -> plik *_stego obok wejścia"""
+        result = self.service.hide_message(self.png, "abc", ImageFormat.PNG)
+        self.assertEqual(result, os.path.join(self.tmp.name, "cover_stego.png"))
+
+    def test_jpeg_bytes(self):
+        """Test JPEG: bytes -> bytes"""
+        result = self.service.hide_message(self._read(self.jpg), "abc", ImageFormat.JPEG)
+        self.assertIsInstance(result, bytes)
+        self.assertEqual(self.service.reveal_message(result, ImageFormat.JPEG), "abc")
+
+    def test_jpeg_rejects_pixels(self):
+        """Test JPEG: tablica pikseli nie ma współczynników DCT"""
+        with self.assertRaises(TypeError):
+            self.service.hide_message(np.zeros((8, 8, 3), np.uint8), "abc", ImageFormat.JPEG)
+
+
+class CrashingFactory(StegoBackendFactory):
+    """Fabryka, która zabija proces roboczy dla BMP (symulacja OOM / błędu w C)."""
+
+    @staticmethod
+    def create(fmt, **kwargs):
+        if fmt == ImageFormat.BMP:
+            os._exit(1)
+        return StegoBackendFactory.create(fmt, **kwargs)
+
+
+class FakePool:
+    """
+    Pula na niby: pierwsza po trzech zadaniach pada i kończy je błędem
+    po kolei (co 'delay' s), następne oddają wyniki z opóźnieniem.
+    """
+
+    created: list = []
+    delay = 0.0
+
+    def __init__(self, *args, **kwargs):
+        self.futures: list[Future] = []
+        self.broken = False
+        self.created.append(self)
+
+    def submit(self, fn, index, job):
+        if self.broken:
+            raise BrokenProcessPool("pula padła")
+        future = Future()
+        self.futures.append(future)
+        if self is not self.created[0]:
+            threading.Timer(0.3, self._finish, (future, index, job)).start()
+        elif len(self.futures) == 3:
+            self.broken = True
+            if self.delay:
+                threading.Thread(target=self._fail).start()
+            else:
+                self._fail()
+        return future
+
+    def _finish(self, future: Future, index: int, job) -> None:
+        if future.set_running_or_notify_cancel():
+            future.set_result(JobResult(index, job, True))
+
+    def _fail(self) -> None:
+        for i, future in enumerate(self.futures):
+            if i:
+                time.sleep(self.delay)
+            future.set_exception(BrokenProcessPool("pula padła"))
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        # zadania padniętej puli i tak kończą się błędem (jak w ProcessPoolExecutor)
+        if cancel_futures and not self.broken:
+            for future in self.futures:
+                if future.cancel():
+                    future.set_running_or_notify_cancel()
+
+
+class TestBatch(unittest.TestCase):
+    """Testy równoległego przetwarzania wielu obrazów"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = StegoService()
+        self.covers = [make_cover(os.path.join(self.tmp.name, f"cover{i}.png")) for i in range(5)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _round_trip(self, workers: int):
+        hide = [HideJob(path, f"msg{i}", tag=i) for i, path in enumerate(self.covers)]
+        hide.append(HideJob(self.covers[0], "x" * 10000))  # za długa
+        results = sorted(self.service.hide_many(hide, workers=workers, max_in_flight=2), key=lambda r: r.index)
+
+        self.assertEqual([r.ok for r in results], [True] * 5 + [False])
+        self.assertIn("ValueError", results[-1].error)
+
+        reveal = (RevealJob(r.value, tag=r.job.tag) for r in results if r.ok)
+        revealed = {r.job.tag: r.value for r in self.service.reveal_many(reveal, workers=workers)}
+        self.assertEqual(revealed, {i: f"msg{i}" for i in range(5)})
+
+    def test_inline(self):
+        """Test workers=1 (bez puli procesów)"""
+        self._round_trip(workers=1)
+
+    def test_process_pool(self):
+        """Test puli procesów z ograniczeniem zadań w locie"""
+        self._round_trip(workers=2)
+
+    def test_pool_errors_become_results(self):
+        """Test: nieserializowalne zadanie i padnięty proces nie przerywają przebiegu"""
+        jobs = [
+            HideJob(self.covers[0], "a", os.path.join(self.tmp.name, "a.bmp"), ImageFormat.BMP),  # zabija proces
+            HideJob(self.covers[1], "b", tag=lambda: None),  # nie da się przesłać do puli
+            HideJob(self.covers[2], "c"),
+        ]
+        service = StegoService(CrashingFactory())
+        results = sorted(service.hide_many(jobs, workers=2, max_in_flight=1), key=lambda r: r.index)
+
+        self.assertEqual([r.index for r in results], [0, 1, 2])
+        self.assertIn("BrokenProcessPool", results[0].error)
+        self.assertIn("pickle", results[1].error)
+        self.assertTrue(results[2].ok)
+
+    def test_broken_pool_spares_new_pool(self):
+        """Test: błędy zadań z padniętej puli nie anulują zadań w nowej ani nie tworzą trzeciej puli"""
+        jobs = [HideJob(self.covers[0], f"m{i}") for i in range(6)]
+        for delay, max_in_flight in ((0.1, 3), (0.0, 10)):
+            with self.subTest(delay=delay):
+                FakePool.created, FakePool.delay = [], delay
+                with mock.patch.object(StegoBatch, "ProcessPoolExecutor", FakePool):
+                    results = sorted(run_jobs(jobs, None, workers=2, max_in_flight=max_in_flight), key=lambda r: r.index)
+                self.assertEqual([r.ok for r in results], [False] * 3 + [True] * 3)
+                self.assertTrue(all("BrokenProcessPool" in r.error for r in results[:3]))
+                self.assertEqual(len(FakePool.created), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from imagesteganography.core.StegoBatch import HideJob
+from imagesteganography.core.StegoService import StegoService
+from imagesteganography.formats.png_backend import PngStegoBackend
+from imagesteganography.formats.tiff_backend import TiffStegoBackend
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from imagesteganography.utilities.size_optimizer import optimize_file
+
+
+class TestSizeOptimizer(unittest.TestCase):
+    """Testy optymalizacji rozmiaru wyników PNG/TIFF"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        y, x = np.mgrid[0:120, 0:150]
+        self.rgb = np.dstack(((x + y) % 256, (x * 2) % 256, y % 256)).astype(np.uint8)
+        self.payload = os.urandom(800)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _stego(self, backend, ext: str) -> str:
+        cover = os.path.join(self.dir, f"cover.{ext}")
+        Image.fromarray(self.rgb).save(cover)
+        output = os.path.join(self.dir, f"stego.{ext}")
+        backend.encode_bytes(cover, self.payload, output)
+        return output
+
+    def test_png_and_tiff(self):
+        """Test: mniejszy plik, te same piksele i dane"""
+        for backend, ext in ((PngStegoBackend(True, 0.2, noise_seed=1), "png"), (TiffStegoBackend(True, 0.2, noise_seed=1), "tiff")):
+            with self.subTest(ext=ext):
+                output = self._stego(backend, ext)
+                before, size = np.array(Image.open(output)), os.path.getsize(output)
+
+                result = backend.optimize_output(output, threads=2)
+                self.assertIsNotNone(result.strategy)
+                self.assertEqual((result.original_size, result.size), (size, os.path.getsize(output)))
+                self.assertGreater(result.saved, 0)
+                self.assertTrue((np.array(Image.open(output)) == before).all())
+                self.assertEqual(backend.decode_bytes(output), self.payload)
+
+    def test_changed_pixels_rejected(self):
+        """Test: najmniejszy, ale stratny wynik odrzucony - wygrywa następny zgodny"""
+        output = self._stego(PngStegoBackend(False, 0.05), "png")
+        with open(output, "rb") as f:
+            original = f.read()
+        before = np.array(Image.open(output))
+
+        def lossy(img, pixels, target):
+            Image.fromarray(pixels & 0xF0).save(target, format="PNG", compress_level=9)
+
+        def grayscale(img, pixels, target):
+            img.convert("L").save(target, format="PNG", compress_level=9)
+
+        def lossless(img, pixels, target):
+            img.save(target, format="PNG", compress_level=9)
+
+        sizes = {}
+        for name, strategy in (("lossy", lossy), ("grayscale", grayscale), ("lossless", lossless)):
+            buffer = io.BytesIO()
+            strategy(Image.open(output), before, buffer)
+            sizes[name] = len(buffer.getvalue())
+        self.assertLess(max(sizes["lossy"], sizes["grayscale"]), sizes["lossless"])
+
+        # tylko stratne strategie - plik bez zmian, bez wyjątku
+        result = optimize_file(output, {"lossy": lossy, "grayscale": grayscale})
+        self.assertIsNone(result.strategy)
+        with open(output, "rb") as f:
+            self.assertEqual(f.read(), original)
+
+        result = optimize_file(output, {"lossy": lossy, "grayscale": grayscale, "lossless": lossless})
+        self.assertEqual(result.strategy, "lossless")
+        self.assertEqual(result.size, sizes["lossless"])
+        self.assertTrue((np.array(Image.open(output)) == before).all())
+
+    def test_batch(self):
+        """Test: HideJob(optimize=True) zwraca zaoszczędzone bajty, BMP bez zmian"""
+        jobs = []
+        for ext in ("png", "bmp"):
+            cover = os.path.join(self.dir, f"cover.{ext}")
+            Image.fromarray(self.rgb).save(cover)
+            jobs.append(HideJob(cover, self.payload, os.path.join(self.dir, f"out.{ext}"), optimize=True))
+
+        service = StegoService()
+        results = sorted(service.hide_many(jobs, workers=1), key=lambda r: r.index)
+        self.assertTrue(all(r.ok for r in results))
+        self.assertGreater(results[0].optimization.saved, 0)
+        self.assertEqual(results[1].optimization.saved, 0)
+        self.assertEqual(service.reveal_bytes(results[0].value, ImageFormat.PNG), self.payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import io
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from imagesteganography.formats.tiff_backend import TiffStegoBackend
+from imagesteganography.formats.tiff_stream import StreamedTiff
+from imagesteganography.utilities.image_header import read_header
+
+
+def write_tiff(
+    path: str,
+    arr: np.ndarray,
+    rows_per_strip: int | None = None,
+    tile: tuple[int, int] | None = None,
+    deflate: bool = False,
+    predictor: bool = False,
+    big: bool = False,
+) -> str:
+    """Minimalny zapis TIFF (pasy albo kafle, Deflate, predyktor, BigTIFF) - Pillow tego nie potrafi."""
+    h, w, spp = arr.shape
+    blocks = []
+    if tile:
+        tw, th = tile
+        for y in range(0, h, th):
+            for x in range(0, w, tw):
+                block = np.zeros((th, tw, spp), dtype=np.uint8)
+                part = arr[y : y + th, x : x + tw]
+                block[: part.shape[0], : part.shape[1]] = part
+                blocks.append(block)
+    else:
+        rps = rows_per_strip or h
+        blocks = [arr[y : y + rps] for y in range(0, h, rps)]
+
+    encoded = []
+    for block in blocks:
+        if predictor:
+            diff = block.copy()
+            diff[:, 1:] -= block[:, :-1]
+            block = diff
+        data = block.tobytes()
+        encoded.append(zlib.compress(data) if deflate else data)
+
+    o = "<"
+    off_type, off_fmt, value_size = (16, "Q", 8) if big else (4, "I", 4)
+    out = bytearray(b"II+\x00\x08\x00\x00\x00" + bytes(8) if big else b"II*\x00" + bytes(4))
+    offsets = []
+    for data in encoded:
+        offsets.append(len(out))
+        out += data + bytes(len(data) % 2)
+
+    entries = [
+        (256, 4, [w]), (257, 4, [h]), (258, 3, [8] * spp), (259, 3, [8 if deflate else 1]),
+        (262, 3, [2]), (277, 3, [spp]), (284, 3, [1]),
+    ]
+    if tile:
+        entries += [(322, 4, [tile[0]]), (323, 4, [tile[1]]), (324, off_type, offsets),
+                    (325, off_type, [len(d) for d in encoded])]
+    else:
+        entries += [(273, off_type, offsets), (278, 4, [rows_per_strip or h]),
+                    (279, off_type, [len(d) for d in encoded])]
+    if predictor:
+        entries.append((317, 3, [2]))
+    if spp == 4:
+        entries.append((338, 3, [2]))
+    entries.sort()
+
+    sizes = {3: ("H", 2), 4: ("I", 4), 16: ("Q", 8)}
+    packed = []
+    for tag, typ, values in entries:
+        fmt, size = sizes[typ]
+        data = struct.pack(f"{o}{len(values)}{fmt}", *values)
+        if len(data) > value_size:
+            position = len(out)
+            out += data + bytes(len(data) % 2)
+            data = struct.pack(o + off_fmt, position)
+        packed.append(struct.pack(o + "HH" + off_fmt, tag, typ, len(values)) + data.ljust(value_size, b"\0"))
+
+    ifd = len(out)
+    out += struct.pack(o + ("Q" if big else "H"), len(packed)) + b"".join(packed) + bytes(value_size)
+    struct.pack_into(o + off_fmt, out, 8 if big else 4, ifd)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+class TestStreamedTiff(unittest.TestCase):
+    """Testy strumieniowego LSB w TIFF (pasy i kafle)"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        rng = np.random.default_rng(7)
+        self.rgb = rng.integers(0, 256, (45, 70, 3), dtype=np.uint8)
+        self.payload = os.urandom(900)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _check(self, cover: str, noise: bool = True) -> str:
+        """Osadza strumieniowo i porównuje piksele ze ścieżką przez Pillowa."""
+        backend = TiffStegoBackend(noise, 0.3, noise_seed=4)
+        output = os.path.join(self.dir, "stego.tiff")
+        backend.encode_bytes(cover, self.payload, output)
+        with open(cover, "rb") as f:
+            expected = backend.encode_bytes(f.read(), self.payload, None)
+
+        with Image.open(output) as stego, Image.open(io.BytesIO(expected)) as pillow:
+            mode = pillow.mode
+            self.assertTrue((np.array(stego.convert(mode)) == np.array(pillow)).all())
+        self.assertEqual(backend.decode_bytes(output), self.payload)
+        self.assertEqual(backend.read_range(output, 650, 40), self.payload[650:690])
+        return output
+
+    def test_strips(self):
+        """Test pasów: bez kompresji (dzielone na części) i Deflate z predyktorem"""
+        StreamedTiff.MAX_SEGMENT_BYTES, limit = 1000, StreamedTiff.MAX_SEGMENT_BYTES
+        self.addCleanup(setattr, StreamedTiff, "MAX_SEGMENT_BYTES", limit)
+
+        cover = os.path.join(self.dir, "cover.tiff")
+        Image.fromarray(self.rgb).save(cover)  # Pillow: jeden pas na cały obraz
+        self._check(cover)
+        self._check(write_tiff(os.path.join(self.dir, "deflate.tiff"), self.rgb, 4, deflate=True, predictor=True))
+
+    def test_tiles_rgba_bigtiff(self):
+        """Test kafli (z dopełnieniem na brzegach), RGBA i BigTIFF"""
+        rgba = np.dstack((self.rgb, np.full(self.rgb.shape[:2], 200, np.uint8)))
+        self._check(write_tiff(os.path.join(self.dir, "tiles.tiff"), rgba, tile=(32, 16), deflate=True))
+        big = write_tiff(os.path.join(self.dir, "big.tiff"), self.rgb, tile=(16, 16), big=True)
+        self._check(big)
+        self.assertEqual((read_header(big).width, read_header(big).height), (70, 45))
+
+    def test_reads_only_needed_strips(self):
+        """Test: bez szumu zmieniane są tylko pasy z danymi, odczyt kończy się na nich"""
+        cover = write_tiff(os.path.join(self.dir, "cover.tiff"), self.rgb, 1, deflate=True)
+        output = self._check(cover, noise=False)
+
+        def strips(path):
+            with StreamedTiff(path) as tif, open(path, "rb") as f:
+                return [f.seek(o) and f.read(n) for o, n in zip(tif.offsets, tif.counts)]
+
+        changed = [a != b for a, b in zip(strips(cover), strips(output))]
+        used_rows = -(-(32 + len(self.payload) * 8) // (70 * 3))
+        self.assertEqual(changed, [True] * used_rows + [False] * (45 - used_rows))
+
+        read = []
+        original = StreamedTiff.read_band
+        self.addCleanup(setattr, StreamedTiff, "read_band", original)
+        StreamedTiff.read_band = lambda tif, band: read.append(band) or original(tif, band)
+        # bajty 20..29 to bity 192..271: wiersze (pasy) 0 i 1, po nagłówku z pasa 0
+        TiffStegoBackend(False, 0.05).read_range(output, 20, 10)
+        self.assertEqual(read, [0, 0, 1])
+
+    def test_fallback(self):
+        """Test: TIFF z LZW idzie przez Pillowa"""
+        cover = os.path.join(self.dir, "lzw.tiff")
+        Image.fromarray(self.rgb).save(cover, compression="tiff_lzw")
+        with self.assertRaises(ValueError):
+            StreamedTiff(cover)
+        backend = TiffStegoBackend(False, 0.05)
+        output = os.path.join(self.dir, "out.tiff")
+        backend.encode_bytes(cover, self.payload, output)
+        self.assertEqual(backend.decode_bytes(output), self.payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
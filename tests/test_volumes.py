@@ -0,0 +1,80 @@
+import io
+import os
+import tempfile
+import unittest
+
+from imagesteganography.core.StegoService import StegoService
+from imagesteganography.core.StegoVolumes import VOLUME_HEADER
+from imagesteganography.utilities.ImageFormat import ImageFormat
+from tests.test_lsb import make_cover
+
+
+class TestVolumes(unittest.TestCase):
+    """Testy dzielenia danych na woluminy w kilku nośnikach"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = StegoService()
+        self.covers = [make_cover(os.path.join(self.tmp.name, f"c{i}.png")) for i in range(4)]
+        self.room = self.service.capacity(self.covers[0]) // 8 - VOLUME_HEADER.size
+        self.payload = os.urandom(2 * self.room + 100)  # trzy woluminy
+
+    def split(self, payload=None, workers=1) -> list[str]:
+        results = list(self.service.hide_volumes(payload or self.payload, self.covers, workers=workers))
+        self.assertTrue(all(r.ok for r in results))
+        return [r.value for r in sorted(results, key=lambda r: r.job.tag)]
+
+    def test_round_trip(self):
+        """Test: podział na trzy woluminy i złożenie w odwrotnej kolejności"""
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                volumes = self.split(workers=workers)
+                self.assertEqual(len(volumes), 3)
+                self.assertTrue(volumes[0].endswith("c0_vol1.png"))
+
+                out = io.BytesIO()
+                info = self.service.reveal_volumes(volumes[::-1], out, workers=workers)
+                self.assertEqual(out.getvalue(), self.payload)
+                self.assertEqual((info.count, info.total_size), (3, len(self.payload)))
+
+    def test_payload_file(self):
+        """Test: dane z pliku i wynik do pliku"""
+        src = os.path.join(self.tmp.name, "data.bin")
+        with open(src, "wb") as f:
+            f.write(self.payload)
+        volumes = self.split(src)
+        dst = os.path.join(self.tmp.name, "out.bin")
+        self.service.reveal_volumes(volumes, dst)
+        with open(dst, "rb") as f:
+            self.assertEqual(f.read(), self.payload)
+
+    def test_insufficient_capacity(self):
+        """Test: za mało nośników - błąd przed zapisaniem czegokolwiek"""
+        with self.assertRaises(ValueError):
+            self.service.hide_volumes(os.urandom(5 * self.room), self.covers)
+        self.assertFalse([n for n in os.listdir(self.tmp.name) if "_vol" in n])
+
+    def test_missing_volume(self):
+        """Test: brak woluminu - błąd i usunięty plik wynikowy"""
+        volumes = self.split()
+        dst = os.path.join(self.tmp.name, "out.bin")
+        with self.assertRaisesRegex(ValueError, "Brak woluminów: 2"):
+            self.service.reveal_volumes([volumes[0], volumes[2]], dst)
+        self.assertFalse(os.path.exists(dst))
+
+    def test_mixed_sets(self):
+        """Test: woluminy z różnych zestawów i obraz bez woluminu"""
+        first = self.split()
+        second = self.split(os.urandom(100))
+        with self.assertRaisesRegex(ValueError, "innego zestawu"):
+            self.service.reveal_volumes(first + second, io.BytesIO())
+
+        plain = os.path.join(self.tmp.name, "plain.png")
+        self.service.hide_message(self.covers[3], "zwykła wiadomość", ImageFormat.PNG, plain)
+        with self.assertRaisesRegex(ValueError, "brak nagłówka"):
+            self.service.reveal_volumes(first + [plain], io.BytesIO())
+
+
+if __name__ == "__main__":
+    unittest.main()